@@ -0,0 +1,120 @@
+import html
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List
+
+from Word import Word
+
+try:
+    import zstandard
+except ImportError:  # only needed for packages written by Anki 2.1.50 and later
+    zstandard = None
+
+# Collection files inside a package, newest first. Packages with the compressed
+# collection.anki21b also carry a collection.anki2 that only says to update Anki.
+COMPRESSED_COLLECTION = "collection.anki21b"
+COLLECTIONS = ("collection.anki21", "collection.anki2")
+FIELD_SEPARATOR = "\x1f"
+COPY_BUFFER = 1 << 20
+
+LINE_BREAK = re.compile(r"<br\s*/?>|</div>|</p>|</li>", re.IGNORECASE)
+TAG = re.compile(r"<[^>]*>")
+MEDIA = re.compile(r"\[sound:[^\]]*\]")
+SPACE = re.compile(r"\s+")
+
+
+def field_text(field: str) -> str:
+    """
+    Turns the HTML of a note field into plain text.
+
+    :param field: The field as stored by Anki.
+    :return: The text without tags, entities or sound references, on one line.
+    """
+    text = MEDIA.sub("", field)
+    text = TAG.sub("", LINE_BREAK.sub(" ", text))
+    return SPACE.sub(" ", html.unescape(text)).strip()
+
+
+def note_word(fields: List[str]) -> Word:
+    """
+    Maps the fields of a note onto a word: the first is the term, the second the
+    definition and any others, joined, the notes.
+
+    :param fields: The plain-text fields in the order of the note type.
+    :return: The word.
+    :raises ValueError: If the term or the definition is empty.
+    """
+    if not fields[0]:
+        raise ValueError("empty term")
+    if len(fields) < 2 or not fields[1]:
+        raise ValueError("empty definition")
+    return Word(fields[0], fields[1], " / ".join(field for field in fields[2:] if field))
+
+
+@contextmanager
+def open_collection(file_name: str) -> Iterator[sqlite3.Connection]:
+    """
+    Opens the collection database of an .apkg package read-only. SQLite can only open
+    files, so the collection member (and nothing else; media are never read) is copied
+    to a temporary file a chunk at a time, decompressing it on the way if needed.
+
+    :param file_name: The package.
+    :return: A context manager giving the connection; the copy is deleted on exit.
+    :raises ValueError: If the file holds no collection that can be read.
+    """
+    with zipfile.ZipFile(file_name) as package:
+        names = set(package.namelist())
+        if COMPRESSED_COLLECTION in names:
+            if zstandard is None:
+                raise ValueError("this package was written by a recent Anki; "
+                                 "reading it needs the zstandard module (pip install zstandard)")
+            member = COMPRESSED_COLLECTION
+        else:
+            member = next((name for name in COLLECTIONS if name in names), None)
+            if member is None:
+                raise ValueError("not an Anki package: it holds no collection")
+        handle, path = tempfile.mkstemp(suffix=".anki2")
+        try:
+            with os.fdopen(handle, "wb") as target, package.open(member) as source:
+                if member == COMPRESSED_COLLECTION:
+                    with zstandard.ZstdDecompressor().stream_reader(source) as reader:
+                        shutil.copyfileobj(reader, target, COPY_BUFFER)
+                else:
+                    shutil.copyfileobj(source, target, COPY_BUFFER)
+            conn = sqlite3.connect(f"{Path(path).as_uri()}?mode=ro", uri=True)
+            try:
+                yield conn
+            finally:
+                conn.close()
+        finally:
+            os.remove(path)
+
+
+def count_notes(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+
+
+def read_words(conn: sqlite3.Connection, on_error: Callable[[int, str], None],
+               on_note: Callable[[int], None] = lambda number: None) -> Iterator[Word]:
+    """
+    Streams the notes of a collection as words, in the order they were created.
+
+    :param conn: A collection opened with open_collection.
+    :param on_error: Called with the note number and the reason for every note that is
+                     not a word, e.g. a cloze note with a single field.
+    :param on_note: Called with the number of every note read, for progress.
+    :return: A generator of Word objects.
+    """
+    cursor = conn.execute("SELECT flds FROM notes ORDER BY id")
+    for number, (fields,) in enumerate(cursor, 1):
+        on_note(number)
+        try:
+            yield note_word([field_text(field) for field in fields.split(FIELD_SEPARATOR)])
+        except ValueError as error:
+            on_error(number, str(error))
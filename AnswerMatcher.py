@@ -0,0 +1,126 @@
+import re
+import unicodedata
+
+ALTERNATIVE_SEPARATOR = re.compile(r",\s+|;\s*")
+WHITESPACE = re.compile(r"\s+")
+PARENTHESISED = re.compile(r"\s*\([^()]*\)\s*")
+
+MIN_LENGTH_FOR_TYPOS = 4
+
+
+def normalize(text: str) -> str:
+    """
+    Normalizes an answer for comparison: case, accents and spacing are ignored.
+
+    :param text: The answer.
+    :return: The casefolded text without diacritics and with collapsed whitespace.
+    """
+    if text.isascii():
+        return WHITESPACE.sub(" ", text.lower()).strip()
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return WHITESPACE.sub(" ", stripped.casefold()).strip()
+
+
+def variants(alternative: str) -> set[str]:
+    """
+    Returns the accepted forms of one alternative: as written, and with its parenthesised
+    parts either dropped or kept without the parentheses.
+
+    :param alternative: One alternative of the correct answer.
+    :return: The normalized forms.
+    """
+    forms = {normalize(alternative)}
+    if "(" in alternative:
+        forms.add(normalize(PARENTHESISED.sub(" ", alternative)))
+        forms.add(normalize(alternative.replace("(", " ").replace(")", " ")))
+    forms.discard("")
+    return forms
+
+
+def within_distance(a: str, b: str, limit: int) -> bool:
+    """
+    Returns whether the Levenshtein distance between a and b is at most limit. A common
+    prefix and suffix do not change the distance and are skipped, so answers that differ
+    in one place only compare a few characters. Only the diagonal band of width
+    2 * limit + 1 is computed, and it stops as soon as every cell of a row exceeds the limit.
+
+    :param a: The first string.
+    :param b: The second string.
+    :param limit: The maximum distance.
+    :return: True if a can be turned into b with at most limit edits.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return False
+    start, shortest = 0, min(len(a), len(b))
+    while start < shortest and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < shortest - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) <= limit:
+        return True
+    if limit == 1:
+        return False  # a single edit leaves at most one differing character on either side
+    beyond = limit + 1
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        current = [beyond] * (len(b) + 1)
+        current[0] = i if i <= limit else beyond
+        row_min = current[0]
+        char = a[i - 1]
+        for j in range(low, high + 1):
+            cost = 0 if char == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return False
+        previous = current
+    return previous[len(b)] <= limit
+
+
+class AnswerMatcher:
+    """
+    The accepted answers of one prompt, normalized once so that each check is a set lookup
+    plus, when typos are allowed, a bounded edit distance against each accepted form.
+    """
+
+    def __init__(self, correct_answer: str, typos: int = 1) -> None:
+        """
+        Precompiles the accepted answers.
+
+        :param correct_answer: The correct answer; alternatives are separated by ", " or ";".
+        :param typos: The number of edits tolerated in answers of MIN_LENGTH_FOR_TYPOS or more characters.
+        """
+        self.typos = typos
+        self.accepted: set[str] = set()
+        for alternative in ALTERNATIVE_SEPARATOR.split(correct_answer):
+            self.accepted |= variants(alternative)
+        # Fuzzy forms grouped by length: a form more than typos characters longer or shorter
+        # than the answer cannot be within reach, so only a few groups are compared. Each
+        # group is sorted so that the cost of a check does not depend on the string hash seed.
+        self.fuzzy: dict[int, list[str]] = {}
+        if typos:
+            for form in sorted(self.accepted):
+                if len(form) >= MIN_LENGTH_FOR_TYPOS:
+                    self.fuzzy.setdefault(len(form), []).append(form)
+
+    def matches(self, answer: str) -> bool:
+        """
+        Checks an answer.
+
+        :param answer: The answer given by the user.
+        :return: True if it matches one of the accepted answers.
+        """
+        answer = normalize(answer)
+        if answer in self.accepted:
+            return True
+        return any(within_distance(answer, form, self.typos)
+                   for length in range(len(answer) - self.typos, len(answer) + self.typos + 1)
+                   for form in self.fuzzy.get(length, ()))
@@ -0,0 +1,113 @@
+import queue
+import threading
+from typing import Any, Callable, Optional
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from Database import Database
+from Profiler import PROFILER
+
+
+class AsyncDatabase(QObject):
+    """
+    Runs Database work on a dedicated thread that owns the SQLite connection, so the GUI
+    thread never waits on disk.
+
+    Jobs are callables taking the Database. They run one at a time in the order they were
+    submitted, so a job always sees the effects of every job submitted before it, and their
+    callbacks are delivered on the GUI thread in that same order. Jobs read the objects they
+    write when they run, which lets a job use an id assigned by an earlier, still queued job.
+    A job that raises is reported through failed and, instead of its callback, its errback
+    is called with the exception, so that the caller can undo what it set up for the job.
+    The thread only starts with start(), so that failed can be connected before opening
+    the database can fail; if it does, every job is handed to its errback with that error.
+    """
+
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+    progress = pyqtSignal(int)  # progress of the running job, in thousandths
+
+    def __init__(self, path: str = 'word_lists.db') -> None:
+        super().__init__()
+        self.jobs: queue.Queue = queue.Queue()
+        self.finished.connect(self.deliver)
+        self.thread = threading.Thread(target=self.run, args=(path,), name="database", daemon=True)
+
+    def start(self) -> None:
+        """
+        Opens the database on its thread and starts running jobs, including those queued so far.
+        """
+        self.thread.start()
+
+    def run(self, path: str) -> None:
+        db = None
+        try:
+            db = Database(path)
+        except Exception as error:
+            open_error = error
+            self.failed.emit(f"Could not open {path}: {error}")
+        while True:
+            job, callback, errback = self.jobs.get()
+            try:
+                if job is None:
+                    break
+                if db is None:
+                    # Already reported once; the caller still gets to undo its state.
+                    if errback is not None:
+                        self.finished.emit(errback, open_error)
+                    continue
+                result = job(db)
+            except Exception as error:
+                self.failed.emit(f"{type(error).__name__}: {error}")
+                if errback is not None:
+                    self.finished.emit(errback, error)
+            else:
+                if callback is not None:
+                    self.finished.emit(callback, result)
+            finally:
+                self.jobs.task_done()
+        if db is not None:
+            db.conn.close()
+
+    def deliver(self, callback: Callable[[Any], None], result: Any) -> None:
+        if PROFILER.enabled:
+            with PROFILER.timed(f"ui.callback.{getattr(callback, '__qualname__', 'job')}"):
+                callback(result)
+        else:
+            callback(result)
+
+    def submit(self, job: Callable[[Database], Any], callback: Optional[Callable[[Any], None]] = None,
+               errback: Optional[Callable[[Exception], None]] = None) -> None:
+        """
+        Queues a job for the database thread.
+
+        :param job: Called with the Database on the database thread.
+        :param callback: Called with the job's result on the GUI thread.
+        :param errback: Called with the exception on the GUI thread if the job raises.
+        """
+        self.jobs.put((job, callback, errback))
+
+    def call(self, method: str, *args, callback: Optional[Callable[[Any], None]] = None,
+             errback: Optional[Callable[[Exception], None]] = None) -> None:
+        """
+        Queues a call of a Database method with arguments evaluated now.
+
+        :param method: The name of the Database method.
+        :param callback: Called with the method's result on the GUI thread.
+        :param errback: Called with the exception on the GUI thread if the method raises.
+        """
+        self.submit(lambda db: getattr(db, method)(*args), callback, errback)
+
+    def wait(self) -> None:
+        """
+        Blocks until every queued job has run.
+        """
+        self.jobs.join()
+
+    def close(self) -> None:
+        """
+        Runs the remaining jobs, then closes the connection and stops the thread.
+        """
+        self.jobs.put((None, None, None))
+        if self.thread.ident is not None:
+            self.thread.join()
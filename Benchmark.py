@@ -0,0 +1,606 @@
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import sys
+import time
+import tracemalloc
+import zipfile
+
+import Exporter
+import Importer
+import Migrations
+from AnswerMatcher import AnswerMatcher
+from Database import Database, nocase
+from Duplicates import term_key
+from Scheduler import SCHEDULERS
+from Word import Word
+
+
+# Word counts of the --size presets; each preset sizes every benchmark's dataset.
+SIZES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+
+RESULTS = {}  # metric name -> total seconds, filled by the benchmarks for --save and --compare
+
+
+def record(name, seconds):
+    RESULTS[name] = seconds
+    return seconds
+
+
+def generate_database(path, list_count, words_per_list, seed=0, schema_version=Migrations.SCHEMA_VERSION):
+    """
+    Fills a fresh database file with synthetic word lists. The same arguments always
+    produce the same file, so runs on different machines or commits are comparable.
+
+    :param path: The database file to create.
+    :param list_count: The number of word lists.
+    :param words_per_list: The number of words in every list.
+    :param seed: The random seed for the selected flags and notes.
+    :param schema_version: The schema version to create, to benchmark older layouts.
+    """
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    Migrations.migrate(conn, schema_version)
+    keyed = schema_version >= Migrations.MIGRATIONS.index(Migrations.add_term_keys) + 1
+    with conn:
+        for list_number in range(list_count):
+            cursor = conn.execute('INSERT INTO word_lists (title) VALUES (?)', (f"List {list_number}",))
+            list_id = cursor.lastrowid
+            rows = ((list_id, rng.random() < 0.1, f"term{list_number}_{i}", f"definition {i}",
+                     f"note {i}" if rng.random() < 0.2 else "") for i in range(words_per_list))
+            if keyed:
+                conn.executemany(
+                    'INSERT INTO words (list_id, selected, term, definition, notes, term_key) VALUES (?, ?, ?, ?, ?, ?)',
+                    (row + (term_key(row[2]),) for row in rows)
+                )
+            else:
+                conn.executemany(
+                    'INSERT INTO words (list_id, selected, term, definition, notes) VALUES (?, ?, ?, ?, ?)', rows
+                )
+    conn.close()
+
+
+def time_call(function, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def load_per_list(db):
+    # The previous loader: one query per list.
+    lists = db.conn.execute('SELECT id, title FROM word_lists').fetchall()
+    return [db.load_words(list_id) for list_id, _ in lists]
+
+
+def bench_startup(total_words, list_counts):
+    print(f"Startup load of {total_words} words")
+    print(f"{'lists':>8} {'per-list (s)':>14} {'bulk (s)':>10} {'titles (s)':>12}")
+    for list_count in list_counts:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.db")
+            generate_database(path, list_count, max(1, total_words // list_count))
+            db = Database(path)
+            per_list = time_call(lambda: load_per_list(db))
+            bulk = time_call(db.load_word_lists)
+            titles = time_call(db.load_word_list_titles)
+            db.conn.close()
+        record(f"startup.per_list[lists={list_count},words={total_words}]", per_list)
+        record(f"startup.bulk[lists={list_count},words={total_words}]", bulk)
+        record(f"startup.titles[lists={list_count},words={total_words}]", titles)
+        print(f"{list_count:>8} {per_list:>14.4f} {bulk:>10.4f} {titles:>12.4f}")
+
+
+def bench_import(word_count, per_row_limit=10_000):
+    # Committing every row is slow enough that it is only timed on the first
+    # per_row_limit words; both columns are per word.
+    print(f"Import of {word_count} words")
+    with tempfile.TemporaryDirectory() as directory:
+        db = Database(os.path.join(directory, "bench.db"))
+        list_id = db.add_word_list("Import")
+        words = [Word(f"term{i}", f"definition {i}") for i in range(word_count)]
+        sample = words[:per_row_limit]
+        per_row = time_call(lambda: [db.add_word(list_id, word.selected, word.term, word.definition, word.notes)
+                                     for word in sample], repeat=3) / len(sample)
+        bulk = time_call(lambda: db.import_word_list(db.add_word_list("Import"), words), repeat=3) / word_count
+        db.conn.close()
+    record(f"import.per_row[words={len(sample)}]", per_row * len(sample))
+    record(f"import.bulk[words={word_count}]", bulk * word_count)
+    print(f"{'per-row (us/word)':>18} {'bulk (us/word)':>15}")
+    print(f"{per_row * 1e6:>18.2f} {bulk * 1e6:>15.2f}")
+
+
+def bench_bulk_import(word_count, file_count=500):
+    # The same corpus imported with more and more parsing processes; the single writer
+    # bounds the speedup, so the parse and write shares are printed too.
+    print(f"Bulk import of {file_count} files with {word_count} words")
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = os.path.join(directory, "corpus")
+        os.mkdir(corpus)
+        rng = random.Random(0)
+        for number in range(file_count):
+            with open(os.path.join(corpus, f"lesson {number:03}.txt"), "w", encoding="utf-8") as file:
+                for i in range(max(1, word_count // file_count)):
+                    notes = f" (note {i})" if rng.random() < 0.2 else ""
+                    file.write(f"term{number}_{i} - definition {i}{notes}\n")
+        file_names = Importer.expand_sources([corpus])
+        cores = os.cpu_count() or 1
+        print(f"{'workers':>8} {'time (s)':>9} {'speedup':>8} {'words/s':>10} {'parse cpu (s)':>14}")
+        baseline = None
+        for workers in sorted({1, 2, 4, 8, cores} & set(range(1, max(2, cores) + 1))):
+            path = os.path.join(directory, f"bench{workers}.db")
+            db = Database(path)
+            result = Importer.import_files(db, file_names, workers=workers)
+            db.conn.close()
+            os.remove(path)
+            baseline = baseline or result.seconds
+            record(f"bulk_import[workers={workers},files={file_count},words={word_count}]", result.seconds)
+            print(f"{workers:>8} {result.seconds:>9.2f} {baseline / result.seconds:>7.2f}x "
+                  f"{result.rows / result.seconds:>10,.0f} {sum(f.parse_seconds for f in result.files):>14.2f}")
+
+
+def write_anki_package(file_name, card_count, directory):
+    # A minimal legacy package: the notes table of a collection.anki2, plus a media file
+    # the importer must not read.
+    path = os.path.join(directory, "collection.anki2")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, guid TEXT, mid INTEGER, mod INTEGER, usn INTEGER, "
+                 "tags TEXT, flds TEXT, sfld TEXT, csum INTEGER, flags INTEGER, data TEXT)")
+    with conn:
+        conn.executemany("INSERT INTO notes VALUES (?, '', 1, 0, 0, '', ?, '', 0, 0, '')",
+                         ((i, f"term {i}\x1fdefinition <b>{i}</b><br>second line\x1fnote {i}")
+                          for i in range(1, card_count + 1)))
+    conn.close()
+    with zipfile.ZipFile(file_name, "w", zipfile.ZIP_DEFLATED) as package:
+        package.write(path, "collection.anki2")
+        package.writestr("media", '{"0": "image.jpg"}')
+        package.writestr("0", os.urandom(1 << 20))
+    os.remove(path)
+
+
+def bench_anki_import(card_count):
+    print(f"Anki package import of {card_count} cards")
+    with tempfile.TemporaryDirectory() as directory:
+        package = os.path.join(directory, "deck.apkg")
+        write_anki_package(package, card_count, directory)
+        db = Database(os.path.join(directory, "bench.db"))
+        elapsed, peak = traced_call(lambda: Importer.import_file(db, db.add_word_list("Deck"), package))
+        db.conn.close()
+    record(f"anki_import[cards={card_count}]", elapsed)
+    print(f"{'time (s)':>9} {'cards/s':>10} {'peak Python memory (MiB)':>25}")
+    print(f"{elapsed:>9.2f} {card_count / elapsed:>10,.0f} {peak / 2 ** 20:>25.1f}")
+
+
+def bench_schema(word_count, list_count=1_000):
+    # Queries by list_id before and after upgrading a version 1 database in place.
+    print(f"Schema upgrade on {word_count} words in {list_count} lists")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        generate_database(path, list_count, max(1, word_count // list_count), schema_version=1)
+        list_ids = list(range(1, list_count + 1, max(1, list_count // 20)))
+
+        conn = sqlite3.connect(path)
+        before_load = time_call(lambda: [conn.execute('SELECT * FROM words WHERE list_id = ?', (i,)).fetchall()
+                                         for i in list_ids]) / len(list_ids)
+        start = time.perf_counter()
+        with conn:
+            conn.execute('DELETE FROM word_lists WHERE id = ?', (list_ids[0],))
+            conn.execute('DELETE FROM words WHERE list_id = ?', (list_ids[0],))
+        before_delete = time.perf_counter() - start
+        conn.close()
+
+        start = time.perf_counter()
+        db = Database(path)
+        migration = time.perf_counter() - start
+        after_load = time_call(lambda: [db.load_words(i) for i in list_ids]) / len(list_ids)
+        start = time.perf_counter()
+        db.delete_word_list(list_ids[1])
+        after_delete = time.perf_counter() - start
+        db.conn.close()
+    record(f"schema.migration[words={word_count}]", migration)
+    record(f"schema.load_one_list[words={word_count}]", after_load)
+    print(f"{'':>16} {'v1 (s)':>10} {'v2 (s)':>10}")
+    print(f"{'load one list':>16} {before_load:>10.4f} {after_load:>10.4f}")
+    print(f"{'delete a list':>16} {before_delete:>10.4f} {after_delete:>10.4f}")
+    print(f"{'migration':>16} {'':>10} {migration:>10.4f}")
+
+
+def bench_selection(toggles):
+    print(f"Toggling the selection of {toggles} words")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        generate_database(path, 1, toggles)
+        db = Database(path)
+        words = db.load_words(1)
+        start = time.perf_counter()
+        for word in words:
+            word.selected = not word.selected
+            db.update_word(word.id, word.selected, word.term, word.definition, word.notes)
+        per_row = time.perf_counter() - start
+        start = time.perf_counter()
+        for word in words:
+            word.selected = not word.selected
+        db.update_words(words)
+        coalesced = time.perf_counter() - start
+        start = time.perf_counter()
+        db.set_words_selected(1, True)
+        set_based = time.perf_counter() - start
+        db.conn.close()
+    record(f"selection.per_row[toggles={toggles}]", per_row)
+    record(f"selection.coalesced[toggles={toggles}]", coalesced)
+    record(f"selection.set_based[toggles={toggles}]", set_based)
+    print(f"{'per-row (s)':>12} {'coalesced (s)':>14} {'set-based (s)':>14}")
+    print(f"{per_row:>12.4f} {coalesced:>14.4f} {set_based:>14.4f}")
+
+
+def bench_study(cards, questions=100_000, seed=0):
+    print(f"Picking {questions} cards from a deck of {cards}")
+    print(f"{'scheduler':>10} {'per question (us)':>18}")
+    for name, scheduler_class in SCHEDULERS.items():
+        rng = random.Random(seed)
+        scheduler = scheduler_class([Word(f"term{i}", f"definition {i}") for i in range(cards)])
+        asked = 0
+        start = time.perf_counter()
+        for asked in range(1, questions + 1):
+            word = scheduler.next_word()
+            if word is None:
+                break
+            scheduler.answer(word, rng.random() < 0.8)
+        elapsed = time.perf_counter() - start
+        record(f"study.{name}[cards={cards},questions={asked}]", elapsed)
+        print(f"{name:>10} {elapsed / asked * 1e6:>18.2f}")
+
+
+def bench_matcher(alternatives=50, checks=2_000):
+    print(f"Checking answers against a card with {alternatives} alternatives")
+    answer = ", ".join(f"alternative number {i} (optional)" for i in range(alternatives))
+    start = time.perf_counter()
+    matcher = AnswerMatcher(answer)
+    compile_time = time.perf_counter() - start
+    print(f"{'answer':>10} {'per check (us)':>15}")
+    for label, given in (("exact", "Alternative Number 7"), ("typo", "alternative numbr 7"), ("wrong", "something else")):
+        elapsed = time_call(lambda: [matcher.matches(given) for _ in range(checks)])
+        record(f"matcher.{label}[checks={checks}]", elapsed)
+        print(f"{label:>10} {elapsed / checks * 1e6:>15.2f}")
+    print(f"{'compile':>10} {compile_time * 1e6:>15.2f}")
+
+
+def bench_search(word_count, list_count=1_000):
+    print(f"Search across {word_count} words")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        generate_database(path, list_count, max(1, word_count // list_count))
+        db = Database(path)
+        print(f"{'query':>16} {'time (ms)':>10} {'results':>8}")
+        for query in ("term5_12", "term999", "definition 4", "te", "nothing here"):
+            results = []
+            elapsed = time_call(lambda: results.append(db.search(query)))
+            record(f"search[{query!r},words={word_count}]", elapsed)
+            print(f"{query:>16} {elapsed * 1000:>10.2f} {len(results[-1]):>8}")
+        db.conn.close()
+
+
+def bench_sorting(word_count):
+    print(f"Sorted and filtered pages of one list of {word_count} words")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        generate_database(path, 1, word_count)
+        db = Database(path)
+        page = 200  # WordTableModel.PAGE_SIZE, not imported as it needs PyQt6
+        deep = db.query_words(1, "term", after=None, limit=int(word_count * 0.9))[-1]
+        runs = [
+            ("load all + sort in Python",
+             lambda: sorted(db.load_words(1), key=lambda word: (nocase(word.term), word.id))[:page]),
+            ("first page by term", lambda: db.query_words(1, "term", limit=page)),
+            ("deep page by term", lambda: db.query_words(1, "term", after=(deep.term, deep.id), limit=page)),
+            ("first page by definition desc", lambda: db.query_words(1, "definition", True, limit=page)),
+            ("prefix filter by term", lambda: db.query_words(1, "term", prefix="term0_12", limit=page)),
+            ("selected filter by id", lambda: db.query_words(1, selected=True, limit=page)),
+        ]
+        print(f"{'query':>30} {'time (ms)':>10}")
+        for name, run in runs:
+            elapsed = time_call(run, repeat=1 if name.startswith("load") else 5)
+            record(f"sorting[{name},words={word_count}]", elapsed)
+            print(f"{name:>30} {elapsed * 1000:>10.2f}")
+        db.conn.close()
+
+
+def bench_cache(word_count, list_count=50):
+    print(f"Word list cache over {list_count} lists of {word_count // list_count} words")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        generate_database(path, list_count, max(1, word_count // list_count))
+        db = Database(path, cache_words=word_count // 2)
+        runs = [
+            ("load from the database", lambda: db.load_word_list(1, columnar=True)),
+            ("copy from the cache", lambda: db.cache.copy_words(1)),
+            ("update_word, 1 list cached", lambda: db.update_word(2, True, "term", "definition", "")),
+        ]
+        print(f"{'operation':>34} {'time (ms)':>10}")
+        for name, run in runs:
+            elapsed = time_call(run)
+            record(f"cache[{name},words={word_count}]", elapsed)
+            print(f"{name:>34} {elapsed * 1000:>10.2f}")
+        # Lists drawn with a skewed popularity, as users return to a few lists most often.
+        rng = random.Random(0)
+        db.cache.clear()
+        for _ in range(2_000):
+            db.cache.get(min(list_count, int(rng.paretovariate(1.2))))
+        stats = db.cache.stats()
+        print(f"skewed opens: {stats['hit_rate']:.0%} hits, {stats['evictions']} evictions, "
+              f"{stats['lists']} lists cached")
+        db.conn.close()
+
+
+def bench_changes(list_count):
+    # The cost of noticing another instance's writes: a poll when nothing changed, and
+    # one after the other instance edited a word.
+    print(f"Change detection over {list_count} lists")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        generate_database(path, list_count, 10)
+        db, other = Database(path), Database(path)
+        idle = time_call(db.take_changes)
+
+        def changed():
+            other.update_word(5, True, "term", "definition", "")
+            return db.take_changes()
+        after_write = time_call(changed) - time_call(lambda: other.update_word(5, True, "term", "definition", ""))
+        found = changed()
+        record(f"changes.idle[lists={list_count}]", idle)
+        record(f"changes.after_write[lists={list_count}]", after_write)
+        print(f"{'idle poll (us)':>15} {'after a write (ms)':>19} {'lists reported':>15}")
+        print(f"{idle * 1e6:>15.1f} {after_write * 1000:>19.2f} {len(found[0]):>15}")
+        db.conn.close()
+        other.conn.close()
+
+
+def traced_call(function):
+    # (seconds, peak bytes allocated by Python) of one call; tracing slows the call down,
+    # so it is timed in a separate untraced run.
+    elapsed = time_call(function, repeat=1)
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def export_fetchall(db, list_id, file_name):
+    # The previous exporter: the whole list in memory, one write per row.
+    words = db.conn.execute("SELECT term, definition, notes FROM words WHERE list_id=?", (list_id,)).fetchall()
+    with open(file_name, 'w', encoding='utf-8') as file:
+        for term, definition, notes in words:
+            file.write(Exporter.format_line(term, definition, notes))
+
+
+def bench_export(word_count, list_count=10):
+    print(f"Export of {word_count} words in {list_count} lists")
+    with tempfile.TemporaryDirectory() as directory:
+        generate_database(os.path.join(directory, "bench.db"), list_count, max(1, word_count // list_count))
+        db = Database(os.path.join(directory, "bench.db"))
+        runs = [("fetchall txt (one list)", lambda: export_fetchall(db, 1, os.path.join(directory, "old.txt")))]
+        for name in ("words.txt", "words.csv", "words.jsonl", "words.csv.gz"):
+            runs.append((f"{name} (one list)", lambda name=name: Exporter.export_file(db, 1, os.path.join(directory, name))))
+        for name in ("all.zip", "all.jsonl.gz"):
+            runs.append((f"{name} (all lists)", lambda name=name: Exporter.export_all(db, os.path.join(directory, name))))
+        print(f"{'export':>26} {'time (s)':>10} {'words/s':>12} {'peak MiB':>10}")
+        for label, run in runs:
+            elapsed, peak = traced_call(run)
+            words = word_count if "all lists" in label else word_count // list_count
+            record(f"export.{label.split(' (')[0]}[words={words}]", elapsed)
+            print(f"{label:>26} {elapsed:>10.4f} {words / elapsed:>12.0f} {peak / 2 ** 20:>10.2f}")
+        db.conn.close()
+
+
+def bench_delete(word_count, list_count=100):
+    print(f"Deleting from {word_count} words in {list_count} lists")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        generate_database(path, list_count, max(1, word_count // list_count))
+        db = Database(path)
+        word_ids = [row[0] for row in db.conn.execute('SELECT id FROM words WHERE list_id = 2 LIMIT 100')]
+        start = time.perf_counter()
+        for word_id in word_ids:
+            db.delete_word(word_id)
+        words = (time.perf_counter() - start) / len(word_ids)
+        start = time.perf_counter()
+        db.delete_word_list(1)
+        whole_list = time.perf_counter() - start
+        db.conn.close()
+    record(f"delete.words[words={word_count},deleted={len(word_ids)}]", words * len(word_ids))
+    record(f"delete.list[words={word_count}]", whole_list)
+    print(f"{'one word (ms)':>14} {'one list (s)':>13}")
+    print(f"{words * 1000:>14.3f} {whole_list:>13.4f}")
+
+
+def bench_dialogs(opens=50, words=1_000):
+    # Needs PyQt6; runs on the offscreen platform so no display is required. "per-dialog
+    # style" repeats what every constructor used to do: reload icon.png and set the whole
+    # stylesheet on the dialog.
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PyQt6.QtGui import QIcon
+        from PyQt6.QtWidgets import QApplication
+    except ImportError:
+        print("Dialog opening skipped: PyQt6 is not installed")
+        return
+    import Style
+    from AsyncDatabase import AsyncDatabase
+    from LearningMode import LearningMode
+    from Main import AddWordListDialog, EditWordDialog, WordListEditor
+    from WordList import WordList
+    from WriteBehind import WriteBehind
+
+    app = QApplication.instance() or QApplication([])
+    Style.apply_style(app)
+    print(f"Opening dialogs ({opens} times each)")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        generate_database(path, 1, words)
+        db = AsyncDatabase(path)
+        db.start()
+        writes = WriteBehind(db)
+        word_list = WordList("List 0", [], 1)
+        deck = [Word(f"term{i}", f"definition {i}") for i in range(words)]
+        dialogs = {
+            "EditWordDialog": lambda: EditWordDialog(deck[0]),
+            "AddWordListDialog": lambda: AddWordListDialog(),
+            "LearningMode": lambda: LearningMode(deck),
+            "WordListEditor": lambda: WordListEditor(word_list, db, writes),
+        }
+
+        def per_dialog_style(dialog):
+            dialog.setWindowIcon(QIcon(Style.asset_path("icon.png")))
+            dialog.setStyleSheet(Style.STYLESHEET)
+            return dialog
+
+        print(f"{'dialog':>18} {'shared style (ms)':>18} {'per-dialog style (ms)':>22}")
+        for name, create in dialogs.items():
+            shared = time_call(lambda: [create().deleteLater() for _ in range(opens)]) / opens
+            styled = time_call(lambda: [per_dialog_style(create()).deleteLater() for _ in range(opens)]) / opens
+            app.processEvents()
+            record(f"dialogs.{name}[opens={opens}]", shared * opens)
+            print(f"{name:>18} {shared * 1000:>18.3f} {styled * 1000:>22.3f}")
+        db.close()
+
+
+class UnslottedWord:
+    # The layout Word had before __slots__: the same seven attributes in a __dict__.
+    def __init__(self, term, definition, notes="", selected=False):
+        self.id = None
+        self._term = term
+        self._definition = definition
+        self._selected = selected
+        self._notes = notes
+        self.result = 0
+        self.dirty = False
+
+
+def bench_memory(word_count):
+    print(f"Memory held by {word_count} loaded words")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        generate_database(path, max(1, word_count // 1_000), min(word_count, 1_000))
+        db = Database(path)
+
+        def unslotted():
+            words = []
+            for word_id, selected, term, definition, notes in db.conn.execute(
+                    'SELECT id, selected, term, definition, notes FROM words'):
+                word = UnslottedWord(term, definition, notes, bool(selected))
+                word.id = word_id
+                words.append(word)
+            return words
+
+        loaders = (("objects with __dict__", unslotted),
+                   ("slotted Word", db.load_word_lists),
+                   ("WordColumns", lambda: db.load_word_lists(columnar=True)))
+        print(f"{'representation':>22} {'MiB':>8} {'bytes/word':>11} {'load (s)':>9}")
+        baseline = None
+        for label, load in loaders:
+            elapsed = time_call(load, repeat=1)
+            tracemalloc.start()
+            words = load()
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del words
+            baseline = baseline or size
+            record(f"memory.{label.split()[0]}_load[words={word_count}]", elapsed)
+            print(f"{label:>22} {size / 2 ** 20:>8.1f} {size / word_count:>11.0f} {elapsed:>9.3f}"
+                  f"  ({baseline / size:.1f}x smaller)")
+        db.conn.close()
+
+
+def save_baseline(file_name):
+    with open(file_name, "w", encoding="utf-8") as file:
+        json.dump({"python": sys.version.split()[0], "sqlite": sqlite3.sqlite_version, "results": RESULTS},
+                  file, indent=2, sort_keys=True)
+
+
+def compare_baseline(file_name, threshold, noise=0.001):
+    """
+    Prints every metric next to its baseline value and flags the ones that got slower by
+    more than threshold; metrics missing on either side are skipped.
+
+    :param file_name: A file written by --save.
+    :param threshold: The tolerated slowdown, e.g. 0.2 for 20%.
+    :param noise: Slowdowns of fewer seconds than this are never flagged.
+    :return: The names of the regressed metrics.
+    """
+    with open(file_name, encoding="utf-8") as file:
+        baseline = json.load(file)["results"]
+    regressions = []
+    print(f"Compared with {file_name} (threshold {threshold:.0%})")
+    print(f"{'metric':<60} {'baseline':>12} {'now':>12} {'change':>8}")
+    for name in sorted(RESULTS.keys() & baseline.keys()):
+        before, now = baseline[name], RESULTS[name]
+        change = now / before - 1 if before else 0.0
+        flag = ""
+        if change > threshold and now - before > noise:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<60} {before:>12.4g} {now:>12.4g} {change:>+8.0%}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless benchmarks for the word list database.")
+    parser.add_argument("--words", type=int, default=100_000)
+    parser.add_argument("--lists", type=int, nargs="+", default=[10, 100, 1_000, 10_000])
+    parser.add_argument("--import-words", type=int, default=10_000)
+    parser.add_argument("--schema-words", type=int, default=1_000_000)
+    parser.add_argument("--toggles", type=int, default=500)
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--search-words", type=int, default=2_000_000)
+    parser.add_argument("--export-words", type=int, default=1_000_000)
+    parser.add_argument("--delete-words", type=int, default=100_000)
+    parser.add_argument("--memory-words", type=int, default=1_000_000)
+    parser.add_argument("--sort-words", type=int, default=500_000)
+    parser.add_argument("--cache-words", type=int, default=1_000_000)
+    parser.add_argument("--bulk-words", type=int, default=200_000)
+    parser.add_argument("--anki-cards", type=int, default=200_000)
+    parser.add_argument("--size", choices=SIZES, help="use this many words for every dataset")
+    parser.add_argument("--only", nargs="+", help="run only these benchmarks")
+    parser.add_argument("--save", metavar="FILE", help="write the results to a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare the results with a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown flagged by --compare")
+    parser.add_argument("--noise", type=float, default=0.001, help="seconds of slowdown never flagged")
+    args = parser.parse_args()
+    if args.size:
+        size = SIZES[args.size]
+        args.words = args.import_words = args.schema_words = args.search_words = size
+        args.export_words = args.delete_words = args.memory_words = args.sort_words = args.cache_words = args.bulk_words = args.anki_cards = args.cards = size
+        args.lists = [count for count in args.lists if count <= size]
+
+    benchmarks = {
+        "startup": lambda: bench_startup(args.words, args.lists),
+        "import": lambda: bench_import(args.import_words),
+        "bulk_import": lambda: bench_bulk_import(args.bulk_words),
+        "anki_import": lambda: bench_anki_import(args.anki_cards),
+        "schema": lambda: bench_schema(args.schema_words),
+        "selection": lambda: bench_selection(args.toggles),
+        "delete": lambda: bench_delete(args.delete_words),
+        "study": lambda: bench_study(args.cards),
+        "matcher": bench_matcher,
+        "search": lambda: bench_search(args.search_words),
+        "export": lambda: bench_export(args.export_words),
+        "sorting": lambda: bench_sorting(args.sort_words),
+        "cache": lambda: bench_cache(args.cache_words),
+        "changes": lambda: bench_changes(10_000),
+        "dialogs": bench_dialogs,
+        "memory": lambda: bench_memory(args.memory_words),
+    }
+    for name, benchmark in benchmarks.items():
+        if args.only is None or name in args.only:
+            benchmark()
+            print()
+    if args.save:
+        save_baseline(args.save)
+    if args.compare and compare_baseline(args.compare, args.threshold, args.noise):
+        sys.exit(1)
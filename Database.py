@@ -1,87 +1,568 @@
+import re
 import sqlite3
+import string
+import time
+from functools import wraps
+from itertools import groupby, islice
+from operator import itemgetter
+
+import Migrations
+from AnswerMatcher import normalize
+from Duplicates import KEEP, MERGE, merge_text, term_key
+from Profiler import PROFILER
 from Word import Word
+from WordColumns import WordColumns
 from WordList import WordList
+from WordListCache import MAX_BYTES, MAX_WORDS, WordListCache
+
+
+BATCH_SIZE = 5000
+SEARCH_CANDIDATES = 2000
+SORT_COLUMNS = ('id', 'term', 'definition')
+# Several instances of the app may share the file: a writer waits up to BUSY_TIMEOUT
+# seconds for the lock, and a write that still finds it locked is retried as a whole.
+BUSY_TIMEOUT = 5.0
+LOCK_RETRIES = 4
+RETRY_DELAY = 0.1
+
+
+def contains_text(text, needle):
+    # Case-insensitive substring test, shared by SQL (as a registered function) and Python.
+    return needle.casefold() in (text or "").casefold()
+
+
+def search_expression(query):
+    # Every word of the query must match a token in any column; the last one may still be
+    # being typed, so it matches as a prefix.
+    tokens = [f'"{token}"' for token in re.findall(r'\w+', query)]
+    if tokens and not query[-1].isspace():
+        tokens[-1] += '*'
+    return ' '.join(tokens)
+
+
+def search_rank(needle, term, word_id):
+    # Exact terms first, then terms starting with the query, then terms containing it,
+    # then matches found only in the definition or notes; shorter terms first within each.
+    term = normalize(term)
+    if term == needle:
+        group = 0
+    elif term.startswith(needle):
+        group = 1
+    elif needle in term:
+        group = 2
+    else:
+        group = 3
+    return group, len(term), word_id
+
+
+NOCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def nocase(text):
+    # The key SQLite's NOCASE collation compares: ASCII letters folded, everything else as is.
+    return text.translate(NOCASE)
+
+
+def like_prefix(prefix):
+    # A LIKE pattern matching values that start with prefix, taken literally.
+    return re.sub(r'([\\%_])', r'\\\1', prefix) + '%'
+
+
+def retry_when_locked(method):
+    # Runs a write again, after a growing pause, when another connection kept the database
+    # locked beyond the busy timeout; `with self.conn` has rolled the failed attempt back.
+    # Writes called from another write run once, as the outermost one is retried whole.
+    @wraps(method)
+    def retrying(self, *args, **kwargs):
+        if self.writing:
+            return method(self, *args, **kwargs)
+        self.writing = True
+        try:
+            for attempt in range(LOCK_RETRIES):
+                try:
+                    return method(self, *args, **kwargs)
+                except sqlite3.OperationalError as error:
+                    if 'locked' not in str(error) or attempt == LOCK_RETRIES - 1:
+                        raise
+                    time.sleep(RETRY_DELAY * 2 ** attempt)
+        finally:
+            self.writing = False
+    return retrying
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
 
 
 class Database:
-    def __init__(self):
-        self.conn = sqlite3.connect('word_lists.db')
-        self.create_tables()
-
-    def create_tables(self):
-        with self.conn:
-            self.conn.execute('''CREATE TABLE IF NOT EXISTS word_lists (
-                id INTEGER PRIMARY KEY,
-                title TEXT NOT NULL
-            )''')
-            self.conn.execute('''CREATE TABLE IF NOT EXISTS words (
-                id INTEGER PRIMARY KEY,
-                list_id INTEGER NOT NULL,
-                selected BOOLEAN NOT NULL,
-                term TEXT NOT NULL,
-                definition TEXT NOT NULL,
-                notes TEXT,
-                FOREIGN KEY (list_id) REFERENCES word_lists (id)
-            )''')
+    def __init__(self, path='word_lists.db', cache_words=MAX_WORDS, cache_bytes=MAX_BYTES):
+        # Implicit transactions start with BEGIN IMMEDIATE: a write takes the lock (waiting
+        # for it if needed) before it reads anything, so it never fails halfway through
+        # because another instance committed in between.
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level='IMMEDIATE')
+        self.writing = False
+        Migrations.migrate(self.conn)
+        self.configure()
+        # Whole lists by id, kept in step with every write below.
+        self.cache = WordListCache(self, cache_words, cache_bytes)
+        # What other connections changed: data_version moves when one of them commits,
+        # and the list revisions tell which lists it touched.
+        self.data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        self.revisions = dict(self.conn.execute('SELECT id, revision FROM word_lists'))
+        self.changed_lists = set()
+        self.deleted_lists = set()
+        PROFILER.instrument(self)
+
+    def configure(self):
+        # Pragmas are per connection (journal_mode is stored in the file); they cannot be
+        # changed inside a transaction, so they are set after the migrations ran.
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+        self.conn.execute('PRAGMA cache_size = -16000')
+        self.conn.execute('PRAGMA temp_store = MEMORY')
+        self.conn.create_function('contains_text', 2, contains_text, deterministic=True)
+        self.conn.create_function('term_key', 1, term_key, deterministic=True)
+        self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS staged_words '
+                          '(list_id, selected, term, definition, notes, term_key)')
 
+    def begin_write(self):
+        # Starts the write transaction now instead of at the first INSERT, UPDATE or
+        # DELETE, so that nothing read before the first write can change under it.
+        if not self.conn.in_transaction:
+            self.conn.execute('BEGIN IMMEDIATE')
+
+    @retry_when_locked
     def add_word_list(self, title):
         with self.conn:
             cursor = self.conn.execute('INSERT INTO word_lists (title) VALUES (?)', (title,))
             return cursor.lastrowid
 
+    @retry_when_locked
     def update_word_list(self, list_id, title):
         with self.conn:
             self.conn.execute('UPDATE word_lists SET title = ? WHERE id = ?', (title, list_id))
+        self.cache.retitle(list_id, title)
 
+    @retry_when_locked
     def delete_word_list(self, list_id):
         with self.conn:
             self.conn.execute('DELETE FROM word_lists WHERE id = ?', (list_id,))
-            self.conn.execute('DELETE FROM words WHERE list_id = ?', (list_id,))
+        self.cache.invalidate(list_id)
 
+    @retry_when_locked
     def add_word(self, list_id, selected, term, definition, notes):
         with self.conn:
             cursor = self.conn.execute(
-                'INSERT INTO words (list_id, selected, term, definition, notes) VALUES (?, ?, ?, ?, ?)',
-                (list_id, selected, term, definition, notes)
+                'INSERT INTO words (list_id, selected, term, definition, notes, term_key) VALUES (?, ?, ?, ?, ?, ?)',
+                (list_id, selected, term, definition, notes, term_key(term))
             )
-            return cursor.lastrowid
+        self.cache.word_added(list_id, (cursor.lastrowid, bool(selected), term, definition, notes))
+        return cursor.lastrowid
+
+    @retry_when_locked
+    def add_words(self, list_id, words, duplicates=KEEP, keys=None):
+        # The whole iterable goes in one transaction, as executemany batches. Without
+        # AUTOINCREMENT SQLite numbers the rows of one statement consecutively, so the
+        # ids of a batch are the ones ending at last_insert_rowid(). With SKIP or MERGE,
+        # words whose term is already in the database (or earlier in the iterable) are
+        # dropped or merged into the existing word; only inserted words get an id.
+        # keys may hold the words' term keys, computed in advance by import workers.
+        # Each batch is staged in a temp table and copied into words by one statement, so
+        # the FTS trigger runs inside a single statement; row by row it costs about five
+        # times as much, as FTS5 writes out its pending index data after every statement.
+        ids = []
+        key_batches = batched(keys, BATCH_SIZE) if keys is not None else None
+        with self.conn:
+            self.begin_write()  # before the first word is read, so a retry starts from it
+            for batch in batched(words, BATCH_SIZE):
+                keys = next(key_batches) if key_batches else [term_key(word.term) for word in batch]
+                if duplicates != KEEP:
+                    batch, keys = self.resolve_duplicates(batch, keys, duplicates == MERGE)
+                    if not batch:
+                        continue
+                self.conn.executemany(
+                    'INSERT INTO temp.staged_words VALUES (?, ?, ?, ?, ?, ?)',
+                    [(list_id, word.selected, word.term, word.definition, word.notes, key)
+                     for word, key in zip(batch, keys)]
+                )
+                self.conn.execute('INSERT INTO words (list_id, selected, term, definition, notes, term_key) '
+                                  'SELECT * FROM temp.staged_words ORDER BY rowid')
+                self.conn.execute('DELETE FROM temp.staged_words')
+                last_id = self.conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+                for word_id, word in enumerate(batch, last_id - len(batch) + 1):
+                    word.id = word_id
+                    ids.append(word_id)
+        # Merged words may belong to any list.
+        if duplicates == MERGE:
+            self.cache.clear()
+        else:
+            self.cache.invalidate(list_id)
+        return ids
+
+    @retry_when_locked
+    def create_word_list(self, title, words, duplicates=KEEP, keys=None):
+        # A new list with its words in one transaction: the INSERT opens it and add_words
+        # commits it, or rolls both back, so a failed import leaves no half-filled list.
+        with self.conn:
+            list_id = self.conn.execute('INSERT INTO word_lists (title) VALUES (?)', (title,)).lastrowid
+            ids = self.add_words(list_id, words, duplicates, keys)
+        return list_id, ids
+
+    def resolve_duplicates(self, batch, keys, merge):
+        # Looks the batch's term keys up in the index and keeps the words that are new.
+        existing = {}
+        for key_batch in batched(set(keys), BATCH_SIZE):
+            cursor = self.conn.execute(
+                f'SELECT term_key, id, definition, notes FROM words WHERE term_key IN ({", ".join("?" * len(key_batch))})'
+                ' ORDER BY id DESC',
+                key_batch
+            )
+            existing.update((row[0], list(row[1:])) for row in cursor)
+        new_words, merged = {}, {}
+        for word, key in zip(batch, keys):
+            if key in existing:
+                if merge:
+                    row = existing[key]
+                    row[1] = merge_text(row[1], word.definition)
+                    row[2] = merge_text(row[2], word.notes)
+                    merged[row[0]] = row
+            elif key in new_words:
+                if merge:
+                    first = new_words[key]
+                    first.definition = merge_text(first.definition, word.definition)
+                    first.notes = merge_text(first.notes, word.notes)
+            else:
+                new_words[key] = word
+        if merged:
+            self.conn.executemany('UPDATE words SET definition = ?, notes = ? WHERE id = ?',
+                                  [(definition, notes, word_id) for word_id, definition, notes in merged.values()])
+        return list(new_words.values()), list(new_words)
+
+    def find_term(self, term):
+        # The titles of the lists that already contain term, compared by its normalized form.
+        with self.conn:
+            cursor = self.conn.execute(
+                'SELECT DISTINCT l.title FROM words w JOIN word_lists l ON l.id = w.list_id WHERE w.term_key = ?',
+                (term_key(term),)
+            )
+            return [row[0] for row in cursor.fetchall()]
 
+    @retry_when_locked
     def update_word(self, word_id, selected, term, definition, notes):
         with self.conn:
             self.conn.execute(
-                'UPDATE words SET selected = ?, term = ?, definition = ?, notes = ? WHERE id = ?',
-                (selected, term, definition, notes, word_id)
+                'UPDATE words SET selected = ?, term = ?, definition = ?, notes = ?, term_key = ? WHERE id = ?',
+                (selected, term, definition, notes, term_key(term), word_id)
+            )
+        self.cache.words_changed([(word_id, bool(selected), term, definition, notes)])
+
+    @retry_when_locked
+    def update_words(self, words):
+        # Coalesced writes: every word in one transaction, with the values it has now.
+        rows = [(word.id, word.selected, word.term, word.definition, word.notes) for word in words]
+        with self.conn:
+            self.conn.executemany(
+                'UPDATE words SET selected = ?, term = ?, definition = ?, notes = ?, term_key = ? WHERE id = ?',
+                [(selected, term, definition, notes, term_key(term), word_id)
+                 for word_id, selected, term, definition, notes in rows]
+            )
+        self.cache.words_changed(rows)
+
+    def duplicate_groups(self):
+        # (term_key, whether one list holds several copies, number of copies, the terms)
+        # for every normalized term stored more than once, most copies first.
+        with self.conn:
+            cursor = self.conn.execute(
+                '''SELECT term_key, COUNT(DISTINCT list_id) < COUNT(*), COUNT(*), group_concat(DISTINCT term)
+                   FROM words GROUP BY term_key HAVING COUNT(*) > 1 ORDER BY COUNT(*) DESC'''
             )
+            return cursor.fetchall()
 
+    def distinct_terms(self):
+        # One (id, term) per normalized term, streamed for the near-duplicate pass.
+        cursor = self.conn.execute('SELECT MIN(id), term FROM words GROUP BY term_key')
+        yield from cursor
+
+    @retry_when_locked
+    def merge_duplicates(self, across_lists=False):
+        # Within each list, folds later copies of a term into the first one (merging their
+        # definitions and notes, keeping it selected if any copy was) and deletes them.
+        # across_lists folds every copy into the earliest one in any list instead, and
+        # deletes the lists this leaves empty (e.g. the second import of the same file).
+        group_by = 'term_key' if across_lists else 'list_id, term_key'
+        with self.conn:
+            self.begin_write()
+            cursor = self.conn.execute(
+                f'''SELECT w.list_id, w.term_key, w.id, w.selected, w.definition, w.notes FROM words w
+                   JOIN (SELECT {group_by} FROM words GROUP BY {group_by} HAVING COUNT(*) > 1) d
+                   USING ({group_by})
+                   ORDER BY {"" if across_lists else "w.list_id, "}w.term_key, w.id'''
+            )
+            keepers, removed, emptied, group, kept = [], [], set(), None, None
+            for list_id, key, word_id, selected, definition, notes in cursor.fetchall():
+                if (key if across_lists else (list_id, key)) != group:
+                    group = key if across_lists else (list_id, key)
+                    kept = [word_id, bool(selected), definition, notes]
+                    keepers.append(kept)
+                    continue
+                kept[1] = kept[1] or bool(selected)
+                kept[2] = merge_text(kept[2], definition)
+                kept[3] = merge_text(kept[3], notes)
+                removed.append(word_id)
+                emptied.add(list_id)
+            self.conn.executemany('UPDATE words SET selected = ?, definition = ?, notes = ? WHERE id = ?',
+                                  [(selected, definition, notes, word_id) for word_id, selected, definition, notes in keepers])
+            for batch in batched(removed, BATCH_SIZE):
+                self.conn.execute(f'DELETE FROM words WHERE id IN ({", ".join("?" * len(batch))})', batch)
+            if across_lists:
+                for batch in batched(emptied, BATCH_SIZE):
+                    self.conn.execute(
+                        f'''DELETE FROM word_lists WHERE id IN ({", ".join("?" * len(batch))})
+                           AND NOT EXISTS (SELECT 1 FROM words WHERE list_id = word_lists.id)''',
+                        batch
+                    )
+        if removed:
+            self.cache.clear()
+        return len(removed)
+
+    @retry_when_locked
+    def set_words_selected(self, list_id, selected, word_ids=None):
+        # The whole list when word_ids is None, otherwise only those words.
+        self.cache.invalidate(list_id)
+        with self.conn:
+            if word_ids is None:
+                self.conn.execute('UPDATE words SET selected = ? WHERE list_id = ?', (selected, list_id))
+                return
+            for batch in batched(word_ids, BATCH_SIZE):
+                self.conn.execute(
+                    f'UPDATE words SET selected = ? WHERE id IN ({", ".join("?" * len(batch))})',
+                    (selected, *batch)
+                )
+
+    @retry_when_locked
+    def invert_words_selected(self, list_id):
+        self.cache.invalidate(list_id)
+        with self.conn:
+            self.conn.execute('UPDATE words SET selected = NOT selected WHERE list_id = ?', (list_id,))
+
+    @retry_when_locked
+    def select_matching_words(self, list_id, text):
+        # Adds the words whose term or definition contains text to the selection; the
+        # words already selected stay selected.
+        self.cache.invalidate(list_id)
+        with self.conn:
+            self.conn.execute(
+                'UPDATE words SET selected = 1 '
+                'WHERE list_id = ? AND NOT selected AND (contains_text(term, ?) OR contains_text(definition, ?))',
+                (list_id, text, text)
+            )
+
+    @retry_when_locked
     def delete_word(self, word_id):
         with self.conn:
             self.conn.execute('DELETE FROM words WHERE id = ?', (word_id,))
+        self.cache.word_deleted(word_id)
+
+    def detect_changes(self):
+        # One pragma when no other connection committed since the last call; otherwise
+        # one pass over word_lists, collecting the lists whose revision moved and
+        # dropping them from the cache. Lists this connection changed in the meantime
+        # are reported as well, which only costs their reload.
+        version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        if version == self.data_version:
+            return
+        self.data_version = version
+        revisions = dict(self.conn.execute('SELECT id, revision FROM word_lists'))
+        for list_id, revision in revisions.items():
+            if self.revisions.get(list_id) != revision:
+                self.changed_lists.add(list_id)
+                self.cache.invalidate(list_id)
+        for list_id in self.revisions.keys() - revisions.keys():
+            self.deleted_lists.add(list_id)
+            self.changed_lists.discard(list_id)
+            self.cache.invalidate(list_id)
+        self.revisions = revisions
+
+    def take_changes(self):
+        # ({list id: title} of the lists changed or added by other connections, [deleted
+        # list ids]) since the last call, or None when there are none.
+        self.detect_changes()
+        if not self.changed_lists and not self.deleted_lists:
+            return None
+        changed, deleted = sorted(self.changed_lists), sorted(self.deleted_lists)
+        self.changed_lists.clear()
+        self.deleted_lists.clear()
+        titles = {}
+        with self.conn:
+            for batch in batched(changed, BATCH_SIZE):
+                titles.update(self.conn.execute(
+                    f'SELECT id, title FROM word_lists WHERE id IN ({", ".join("?" * len(batch))})', batch
+                ))
+        return titles, deleted
 
-    def load_word_lists(self):
+    def load_word_lists(self, columnar=False):
+        # Two statements regardless of the number of lists: the titles, then a single
+        # pass over the words table grouped into their lists by list_id. With columnar,
+        # each list keeps its words in a WordColumns store instead of Word objects.
         word_lists = []
+        by_id = {}
         with self.conn:
-            cursor = self.conn.execute('SELECT id, title FROM word_lists')
-            for row in cursor.fetchall():
-                word_list = WordList(row[1], self.load_words(row[0]), row[0])
+            for list_id, title in self.conn.execute('SELECT id, title FROM word_lists'):
+                word_list = WordList(title, [], list_id)
                 word_lists.append(word_list)
+                by_id[list_id] = word_list
+            if columnar:
+                # Ordered by list, so each list's store is built from one run of rows.
+                cursor = self.conn.execute('SELECT list_id, id, selected, term, definition, notes FROM words '
+                                           'ORDER BY list_id, id')
+                for list_id, rows in groupby(cursor, key=itemgetter(0)):
+                    if list_id in by_id:
+                        by_id[list_id].words = WordColumns.from_rows(row[1:] for row in rows)
+                return word_lists
+            cursor = self.conn.execute('SELECT list_id, id, selected, term, definition, notes FROM words')
+            for row in cursor:
+                word_list = by_id.get(row[0])
+                if word_list is not None:
+                    word_list.words.append(self.make_word(row[1:]))
         return word_lists
 
-    def load_words(self, list_id):
-        words = []
+    def load_word_list_titles(self):
+        # Only ids and titles; the words are paged from the database when a list is opened.
+        with self.conn:
+            cursor = self.conn.execute('SELECT id, title FROM word_lists')
+            return [WordList(title, [], list_id) for list_id, title in cursor.fetchall()]
+
+    def load_word_list(self, list_id, columnar=False):
+        # One list with all its words in id order, or None if there is no such list.
+        with self.conn:
+            row = self.conn.execute('SELECT title FROM word_lists WHERE id = ?', (list_id,)).fetchone()
+            if row is None:
+                return None
+            cursor = self.conn.execute(
+                'SELECT id, selected, term, definition, notes FROM words WHERE list_id = ? ORDER BY id', (list_id,)
+            )
+            words = WordColumns.from_rows(cursor) if columnar else [self.make_word(row) for row in cursor]
+            return WordList(row[0], words, list_id)
+
+    def load_words(self, list_id, selected_only=False, columnar=False):
+        query = 'SELECT id, selected, term, definition, notes FROM words WHERE list_id = ?'
+        if selected_only:
+            query += ' AND selected'
+        with self.conn:
+            cursor = self.conn.execute(query, (list_id,))
+            if columnar:
+                return WordColumns.from_rows(cursor)
+            return [self.make_word(row) for row in cursor]
+
+    def query_words(self, list_id, order='id', descending=False, after=None, selected=None, prefix='',
+                    limit=BATCH_SIZE):
+        # One page of a list, sorted and filtered in SQL. Sorting by term or definition is
+        # case-insensitive (ASCII, as SQLite's NOCASE) with the id breaking ties; `after` is
+        # the (sort value, id) of the last row of the previous page. The bounds are written
+        # as a range on the sort column plus a tie-break, so every page is an index range
+        # scan rather than a walk from the start of the list. `prefix` filters terms,
+        # `selected` keeps only selected (True) or unselected (False) words.
+        if order not in SORT_COLUMNS:
+            raise ValueError(f"cannot sort words by {order!r}")
+        column = 'id' if order == 'id' else f'{order} COLLATE NOCASE'
+        direction, beyond = ('DESC', '<') if descending else ('ASC', '>')
+        conditions, parameters = ['list_id = ?'], [list_id]
+        if after is not None:
+            value, word_id = after
+            if order == 'id':
+                conditions.append(f'id {beyond} ?')
+                parameters.append(word_id)
+            else:
+                conditions.append(f'{column} {beyond}= ? AND ({column} {beyond} ? OR id {beyond} ?)')
+                parameters += [value, value, word_id]
+        if prefix:
+            conditions.append("term LIKE ? ESCAPE '\\'")
+            parameters.append(like_prefix(prefix))
+        if selected is not None:
+            conditions.append('selected = ?')
+            parameters.append(bool(selected))
+        order_by = 'id' if order == 'id' else f'{column} {direction}, id'
+        with self.conn:
+            cursor = self.conn.execute(
+                f'SELECT id, selected, term, definition, notes FROM words WHERE {" AND ".join(conditions)} '
+                f'ORDER BY {order_by} {direction} LIMIT ?',
+                parameters + [limit]
+            )
+            return [self.make_word(row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def make_word(row):
+        word_id, selected, term, definition, notes = row
+        word = Word(term, definition, notes, bool(selected))
+        word.id = word_id
+        return word
+
+    @retry_when_locked
+    def save_reviews(self, reviews):
+        # A batch from the review log: the answers and each word's latest scheduling state.
+        with self.conn:
+            self.conn.executemany(
+                'INSERT INTO reviews (word_id, scheduler, correct, reviewed_at) VALUES (?, ?, ?, ?)',
+                [(review.word_id, review.scheduler, review.correct, review.reviewed_at) for review in reviews]
+            )
+            self.conn.executemany(
+                '''INSERT OR REPLACE INTO word_progress
+                   (word_id, scheduler, result, box, easiness, repetitions, interval, due, mastered)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                [(review.word_id, review.scheduler, *review.state) for review in reviews]
+            )
+
+    def load_progress(self, list_id, scheduler):
+        # The saved state of every word of the list, keyed by word id, in one indexed query.
+        with self.conn:
+            cursor = self.conn.execute(
+                '''SELECT p.word_id, p.result, p.box, p.easiness, p.repetitions, p.interval, p.due, p.mastered
+                   FROM words w JOIN word_progress p ON p.word_id = w.id AND p.scheduler = ?
+                   WHERE w.list_id = ?''',
+                (scheduler, list_id)
+            )
+            return {row[0]: row[1:] for row in cursor}
+
+    def search(self, query, limit=50, offset=0):
+        # The index finds up to SEARCH_CANDIDATES matches without scoring them, in no
+        # particular order, which keeps broad queries such as a single letter cheap. So that
+        # the best matches are among the candidates even then, words whose term equals the
+        # query (by term_key) or starts with it (by the NOCASE term index) are looked up
+        # first. Only candidates are ranked, so results end at SEARCH_CANDIDATES.
+        if offset + limit > SEARCH_CANDIDATES:
+            raise ValueError(f"search results are ranked among the first {SEARCH_CANDIDATES} matches; "
+                             f"offset {offset} with limit {limit} goes beyond them")
+        expression = search_expression(query)
+        if not expression:
+            return []
+        prefix = query.strip()
+        select = ('SELECT w.id, w.selected, w.term, w.definition, w.notes, l.id, l.title '
+                  'FROM words w JOIN word_lists l ON l.id = w.list_id')
         with self.conn:
-            cursor = self.conn.execute('SELECT id, selected, term, definition, notes FROM words WHERE list_id = ?', (list_id,))
-            for row in cursor.fetchall():
-                word = Word(row[2], row[3], row[4])
-                word.id = row[0]
-                word.selected = bool(row[1])
-                words.append(word)
-        return words
+            rows = {}
+            for sql, parameters in (
+                (f'{select} WHERE w.term_key = ? LIMIT ?', (term_key(query),)),
+                (f'{select} WHERE w.term COLLATE NOCASE >= ? AND w.term COLLATE NOCASE < ? LIMIT ?',
+                 (prefix, prefix + '\U0010ffff')),
+                ('SELECT w.id, w.selected, w.term, w.definition, w.notes, l.id, l.title '
+                 'FROM (SELECT rowid FROM words_fts WHERE words_fts MATCH ? LIMIT ?) AS hits '
+                 'JOIN words w ON w.id = hits.rowid JOIN word_lists l ON l.id = w.list_id', (expression,)),
+            ):
+                for row in self.conn.execute(sql, (*parameters, SEARCH_CANDIDATES - len(rows))):
+                    rows.setdefault(row[0], row)
+                if len(rows) >= SEARCH_CANDIDATES:
+                    break
+        needle = normalize(query)
+        ranked = sorted(rows.values(), key=lambda row: search_rank(needle, row[2], row[0]))
+        return [(row[5], row[6], self.make_word(row[:5])) for row in ranked[offset:offset + limit]]
 
     def import_word_list(self, word_list_id, words):
-        for word in words:
-            self.add_word(word_list_id, word.selected, word.term, word.definition, word.notes)
+        return self.add_words(word_list_id, words)
 
     def export_word_list(self, word_list_id):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT term, definition, notes FROM words WHERE list_id=?", (word_list_id,))
-        return cursor.fetchall()
+        # The cursor itself, so exports stream rows instead of holding the list in memory.
+        return self.conn.execute("SELECT term, definition, notes FROM words WHERE list_id=? ORDER BY id",
+                                 (word_list_id,))
@@ -0,0 +1,129 @@
+import argparse
+import hashlib
+import zlib
+from collections import defaultdict
+from typing import Iterable, Iterator
+
+from AnswerMatcher import ALTERNATIVE_SEPARATOR, normalize
+
+# What an import does with a word whose term already exists somewhere in the database.
+KEEP, SKIP, MERGE = "keep", "skip", "merge"
+POLICIES = (KEEP, SKIP, MERGE)
+
+MINHASH_PERMUTATIONS = 32
+MINHASH_BANDS = 8
+MERSENNE_PRIME = (1 << 61) - 1
+# (a, b) of each universal hash function (a * x + b) mod MERSENNE_PRIME.
+PERMUTATIONS = [((2 * i + 1) * 0x9E3779B97F4A7C15 % MERSENNE_PRIME, (i + 1) * 0xBF58476D1CE4E5B9 % MERSENNE_PRIME)
+                for i in range(MINHASH_PERMUTATIONS)]
+
+
+def term_key(term: str) -> int:
+    """
+    Returns the value stored in words.term_key: a 64-bit hash of the normalized term, so
+    that terms differing only in case, accents or spacing collide.
+
+    :param term: The term.
+    :return: A signed 64-bit integer.
+    """
+    digest = hashlib.blake2b(normalize(term).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def merge_text(existing: str, new: str) -> str:
+    """
+    Appends the alternatives of new that existing does not already contain.
+
+    :param existing: The current definition or notes.
+    :param new: The incoming definition or notes.
+    :return: The merged text.
+    """
+    existing = existing or ""
+    known = {normalize(part) for part in ALTERNATIVE_SEPARATOR.split(existing) if part.strip()}
+    added = [part.strip() for part in ALTERNATIVE_SEPARATOR.split(new or "")
+             if part.strip() and normalize(part) not in known]
+    return ", ".join(([existing] if existing else []) + added)
+
+
+def trigrams(text: str) -> set[str]:
+    text = f"  {normalize(text)} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def minhash(text: str) -> tuple[int, ...]:
+    """
+    Returns the MinHash signature of the character trigrams of text.
+
+    :param text: The text.
+    :return: MINHASH_PERMUTATIONS minimum hash values.
+    """
+    hashes = [zlib.crc32(gram.encode("utf-8")) for gram in trigrams(text)]
+    return tuple(min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in PERMUTATIONS)
+
+
+def near_duplicates(rows: Iterable[tuple[int, str]], threshold: float = 0.8) -> Iterator[tuple[int, int, float]]:
+    """
+    Finds pairs of similar texts with MinHash and locality-sensitive hashing: signatures
+    are cut into MINHASH_BANDS bands and only texts sharing a band are compared, so the
+    work grows with the number of rows rather than the number of pairs.
+
+    :param rows: (id, text) pairs.
+    :param threshold: The minimum estimated Jaccard similarity of the trigram sets.
+    :return: (id, id, similarity) for every similar pair, lower id first.
+    """
+    signatures = {}
+    buckets = defaultdict(list)
+    width = MINHASH_PERMUTATIONS // MINHASH_BANDS
+    for row_id, text in rows:
+        signature = minhash(text)
+        signatures[row_id] = signature
+        for band in range(MINHASH_BANDS):
+            buckets[band, signature[band * width:(band + 1) * width]].append(row_id)
+    seen = set()
+    for bucket in buckets.values():
+        for i, first in enumerate(bucket):
+            for second in bucket[i + 1:]:
+                pair = (min(first, second), max(first, second))
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                a, b = signatures[pair[0]], signatures[pair[1]]
+                similarity = sum(x == y for x, y in zip(a, b)) / MINHASH_PERMUTATIONS
+                if similarity >= threshold:
+                    yield pair[0], pair[1], similarity
+
+
+def report(db, near: bool = False, threshold: float = 0.8) -> None:
+    groups = db.duplicate_groups()
+    same_list = sum(1 for group in groups if group[1])
+    extra = sum(group[2] - 1 for group in groups)
+    print(f"{len(groups)} terms occur more than once ({same_list} within a single list), "
+          f"{extra} redundant words in total")
+    for key, _, count, terms in groups[:20]:
+        print(f"  {count} x {terms}")
+    if near:
+        terms = dict(db.distinct_terms())
+        pairs = list(near_duplicates(terms.items(), threshold))
+        print(f"{len(pairs)} pairs of near-duplicate terms (similarity >= {threshold})")
+        for first, second, similarity in pairs[:20]:
+            print(f"  {terms[first]} ~ {terms[second]} ({similarity:.2f})")
+
+
+if __name__ == "__main__":
+    from Database import Database
+
+    parser = argparse.ArgumentParser(description="Report or merge duplicate words in the word list database.")
+    parser.add_argument("command", choices=("report", "merge"))
+    parser.add_argument("--db", default="word_lists.db")
+    parser.add_argument("--near", action="store_true", help="also report near-duplicate terms")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--across-lists", action="store_true",
+                        help="merge copies in different lists too, deleting the lists left empty")
+    args = parser.parse_args()
+    database = Database(args.db)
+    if args.command == "report":
+        report(database, args.near, args.threshold)
+    else:
+        merged = database.merge_duplicates(args.across_lists)
+        where = "of their term" if args.across_lists else "in their list"
+        print(f"Merged {merged} duplicate words into the first copy {where}")
@@ -0,0 +1,175 @@
+import csv
+import gzip
+import io
+import json
+import os
+import re
+import tempfile
+import zipfile
+from typing import Callable, Iterable, Optional, TextIO, Tuple
+
+from Database import Database
+
+FORMATS = ("txt", "csv", "jsonl")
+ARCHIVES = ("zip", "gz")
+
+WRITE_BUFFER = 1 << 16
+UNSAFE_FILE_NAME = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+Row = Tuple[str, str, str]  # (term, definition, notes)
+
+encode = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def detect_format(file_name: str) -> Tuple[str, Optional[str]]:
+    """
+    Derives the export format and the archive type from a file name, e.g. "words.csv.gz"
+    gives ("csv", "gz") and "all.zip" gives ("txt", "zip").
+
+    :param file_name: The file to write.
+    :return: (one of FORMATS, one of ARCHIVES or None).
+    """
+    base, extension = os.path.splitext(file_name.lower())
+    archive = extension.lstrip(".") if extension.lstrip(".") in ARCHIVES else None
+    if archive:
+        base, extension = os.path.splitext(base)
+    file_format = extension.lstrip(".")
+    return (file_format if file_format in FORMATS else "txt"), archive
+
+
+def format_line(term: str, definition: str, notes: str) -> str:
+    if notes:
+        return f"{term} - {definition} ({notes})\n"
+    return f"{term} - {definition}\n"
+
+
+def write_rows(file: TextIO, rows: Iterable[Row], file_format: str, title: Optional[str] = None) -> int:
+    """
+    Writes words to a text stream one row at a time, so nothing is held in memory beyond
+    the stream's buffer.
+
+    :param file: The stream, opened with newline="".
+    :param rows: (term, definition, notes) tuples, typically a database cursor.
+    :param file_format: One of FORMATS.
+    :param title: When given, every CSV and JSON Lines row starts with the list title, so
+                  several lists can share one stream.
+    :return: The number of rows written.
+    """
+    count = 0
+    if file_format == "txt":
+        if title is not None:
+            raise ValueError("the txt format cannot hold several lists in one file")
+        for count, (term, definition, notes) in enumerate(rows, 1):
+            file.write(format_line(term, definition, notes))
+    elif file_format == "csv":
+        writer = csv.writer(file, lineterminator="\n")
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row if title is None else (title, *row))
+    elif file_format == "jsonl":
+        # Same output as json.dumps of a dict per row, without building the dicts.
+        prefix = "{" if title is None else f'{{"list": {encode(title)}, '
+        for count, (term, definition, notes) in enumerate(rows, 1):
+            file.write(f'{prefix}"term": {encode(term)}, "definition": {encode(definition)}, '
+                       f'"notes": {encode(notes or "")}}}\n')
+    else:
+        raise ValueError(f"unknown export format {file_format!r}")
+    return count
+
+
+def open_text(file_name: str, archive: Optional[str]) -> TextIO:
+    if archive == "gz":
+        return io.TextIOWrapper(gzip.open(file_name, "wb", compresslevel=6), encoding="utf-8", newline="")
+    return open(file_name, "w", encoding="utf-8", newline="", buffering=WRITE_BUFFER)
+
+
+def export_file(db: Database, list_id: int, file_name: str, file_format: Optional[str] = None) -> int:
+    """
+    Streams one word list into a file; a ".gz" suffix compresses it on the fly.
+
+    :param db: The database to read from.
+    :param list_id: The id of the word list.
+    :param file_name: The file to write.
+    :param file_format: One of FORMATS; detected from the extension when omitted.
+    :return: The number of exported words.
+    """
+    detected, archive = detect_format(file_name)
+    if archive == "zip":
+        raise ValueError("use export_all to write zip archives")
+    with open_text(file_name, archive) as file:
+        return write_rows(file, db.export_word_list(list_id), file_format or detected)
+
+
+def member_names(titles: Iterable[str], extension: str) -> Iterable[str]:
+    # File names inside the zip archive: the sanitized title, numbered when titles repeat.
+    used = set()
+    for title in titles:
+        stem = UNSAFE_FILE_NAME.sub("_", title).strip(" .") or "word list"
+        name, number = f"{stem}.{extension}", 1
+        while name.lower() in used:
+            number += 1
+            name = f"{stem} ({number}).{extension}"
+        used.add(name.lower())
+        yield name
+
+
+def export_all(db: Database, file_name: str, file_format: Optional[str] = None,
+               progress: Optional[Callable[[int, int], None]] = None,
+               cancelled: Optional[Callable[[], bool]] = None) -> Optional[int]:
+    """
+    Streams every word list into one archive. A zip archive holds one file per list; a gzip
+    archive is a single CSV or JSON Lines stream whose rows carry the list title. The archive
+    is written next to file_name and renamed over it once complete, so a cancelled or failed
+    export leaves no partial file behind (and an existing file untouched).
+
+    :param db: The database to read from.
+    :param file_name: The archive to write, ending in ".zip" or ".gz".
+    :param file_format: One of FORMATS; detected from the name (e.g. "all.jsonl.gz") when omitted.
+    :param progress: Called with (lists done, total lists) after every list.
+    :param cancelled: Polled after every list; the export stops when it returns True.
+    :return: The number of exported words, or None when the export was cancelled.
+    """
+    detected, archive = detect_format(file_name)
+    file_format = file_format or detected
+    if archive not in ARCHIVES:
+        raise ValueError("export_all writes a .zip or .gz archive")
+    if archive == "gz" and file_format == "txt":
+        raise ValueError("a gzip archive of all lists needs the csv or jsonl format")
+    handle, part_name = tempfile.mkstemp(suffix=".part", prefix=os.path.basename(file_name) + ".",
+                                         dir=os.path.dirname(os.path.abspath(file_name)))
+    os.close(handle)
+    try:
+        count = write_archive(db, part_name, archive, file_format, progress, cancelled)
+        if count is not None:
+            os.replace(part_name, file_name)
+        return count
+    finally:
+        if os.path.exists(part_name):
+            os.remove(part_name)
+
+
+def write_archive(db: Database, file_name: str, archive: str, file_format: str,
+                  progress: Optional[Callable[[int, int], None]],
+                  cancelled: Optional[Callable[[], bool]]) -> Optional[int]:
+    # The body of export_all; returns None when cancelled before the last list was written.
+    word_lists = db.load_word_list_titles()
+    count = 0
+    if archive == "zip":
+        with zipfile.ZipFile(file_name, "w", zipfile.ZIP_DEFLATED, compresslevel=6) as archive_file:
+            names = member_names((word_list.title for word_list in word_lists), file_format)
+            for done, (word_list, name) in enumerate(zip(word_lists, names), 1):
+                with archive_file.open(name, "w", force_zip64=True) as member, \
+                        io.TextIOWrapper(member, encoding="utf-8", newline="") as file:
+                    count += write_rows(file, db.export_word_list(word_list.id), file_format)
+                if progress:
+                    progress(done, len(word_lists))
+                if done < len(word_lists) and cancelled and cancelled():
+                    return None
+    else:
+        with open_text(file_name, archive) as file:
+            for done, word_list in enumerate(word_lists, 1):
+                count += write_rows(file, db.export_word_list(word_list.id), file_format, word_list.title)
+                if progress:
+                    progress(done, len(word_lists))
+                if done < len(word_lists) and cancelled and cancelled():
+                    return None
+    return count
@@ -0,0 +1,458 @@
+import argparse
+import csv
+import glob
+import multiprocessing
+import os
+import sqlite3
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+import AnkiPackage
+from Database import BATCH_SIZE, Database, batched
+from Duplicates import KEEP, POLICIES, term_key
+from Word import Word
+
+MAX_REPORTED_ERRORS = 100
+
+# "quizlet" is Quizlet's export (term and definition separated by a tab or a comma, one
+# card per line); it is stored as .txt and recognized by its contents.
+FORMATS = ("txt", "csv", "tsv", "quizlet", "apkg")
+SNIFF_LINES = 20
+# Column names that mark the first row of a CSV/TSV file as a header rather than a word.
+TERM_HEADERS = {"term", "word", "front", "question"}
+DEFINITION_HEADERS = {"definition", "meaning", "translation", "back", "answer"}
+
+
+class ImportResult:
+    """
+    Summarizes a finished (or cancelled) import.
+    """
+
+    def __init__(self) -> None:
+        self.rows = 0
+        self.errors: List[Tuple[int, str]] = []  # (line number, reason), capped at MAX_REPORTED_ERRORS
+        self.error_count = 0
+        self.duplicates = 0  # words skipped or merged under the duplicate policy
+        self.cancelled = False
+
+    def add_error(self, line_number: int, reason: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_number, reason))
+
+
+class FileImport(ImportResult):
+    """
+    One file of a bulk import: parsed by a worker process, then written as a new list.
+    """
+
+    def __init__(self, file_name: str) -> None:
+        super().__init__()
+        self.file_name = file_name
+        self.title = os.path.splitext(os.path.basename(file_name))[0]
+        self.list_id: Optional[int] = None
+        self.size = 0
+        self.parse_seconds = 0.0
+        self.failure: Optional[str] = None  # why the file was not imported at all
+        self.words: List[Tuple[str, str, str]] = []  # (term, definition, notes), until written
+        self.keys: List[int] = []  # the term keys of words
+
+
+class BulkImportResult:
+    """
+    Summarizes an import of many files.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self.files: List[FileImport] = []
+        self.seconds = 0.0
+        self.cancelled = False
+
+    @property
+    def rows(self) -> int:
+        return sum(file.rows for file in self.files)
+
+    @property
+    def size(self) -> int:
+        return sum(file.size for file in self.files)
+
+    @property
+    def failed(self) -> List[FileImport]:
+        return [file for file in self.files if file.failure]
+
+    def summary(self) -> str:
+        lines = [f"{'file':<40} {'words':>8} {'duplicates':>10} {'errors':>7}"]
+        for file in self.files:
+            name = os.path.basename(file.file_name)[-40:]
+            if file.failure:
+                lines.append(f"{name:<40} failed: {file.failure}")
+                continue
+            lines.append(f"{name:<40} {file.rows:>8} {file.duplicates:>10} {file.error_count:>7}")
+            lines.extend(f"    line {line_number}: {reason}" for line_number, reason in file.errors[:5])
+        seconds = max(self.seconds, 1e-9)
+        lines.append("")
+        lines.append(f"{len(self.files) - len(self.failed)} of {len(self.files)} files imported"
+                     f"{' (cancelled)' if self.cancelled else ''}: {self.rows} words, "
+                     f"{sum(file.error_count for file in self.files)} malformed lines, in {self.seconds:.2f} s "
+                     f"with {self.workers} worker{'s' if self.workers != 1 else ''}")
+        lines.append(f"{self.rows / seconds:,.0f} words/s, {len(self.files) / seconds:.1f} files/s, "
+                     f"{self.size / seconds / 2 ** 20:.2f} MiB/s")
+        return "\n".join(lines)
+
+
+class ByteCounter:
+    """
+    Decodes a binary file line by line while keeping track of how many bytes were read.
+    A line that is not valid UTF-8 is reported and read as an empty line, so that one bad
+    byte costs one line rather than the whole file and later line numbers stay right.
+    """
+
+    def __init__(self, file, on_error: Callable[[int, str], None] = lambda line_number, reason: None) -> None:
+        self.file = file
+        self.on_error = on_error
+        self.position = 0
+
+    def __iter__(self) -> Iterator[str]:
+        for line_number, raw in enumerate(self.file, 1):
+            if self.position == 0 and raw.startswith(b"\xef\xbb\xbf"):
+                raw_text = raw[3:]
+            else:
+                raw_text = raw
+            self.position += len(raw)
+            try:
+                text = raw_text.decode("utf-8")
+            except UnicodeDecodeError as error:
+                self.on_error(line_number, f"not valid UTF-8 ({error.reason} at byte {error.start + 1})")
+                text = ""
+            yield text
+
+
+def detect_format(file_name: str) -> str:
+    extension = os.path.splitext(file_name)[1].lower().lstrip(".")
+    return extension if extension in FORMATS else "txt"
+
+
+def guess_format(file_name: str) -> str:
+    """
+    Like detect_format, but tells a Quizlet export from the "Term - Definition" format by
+    looking at the first lines of a text file.
+
+    :param file_name: The file to import.
+    :return: One of FORMATS.
+    """
+    file_format = detect_format(file_name)
+    if file_format != "txt":
+        return file_format
+    with open(file_name, "rb") as file:
+        lines = [line for line in islice(ByteCounter(file), SNIFF_LINES * 5) if line.strip()][:SNIFF_LINES]
+    # Most lines decide, so that a stray malformed line does not.
+    tabbed = sum("\t" in line for line in lines)
+    dashed = sum(" - " in line for line in lines)
+    if tabbed * 2 > len(lines) or (dashed * 2 <= len(lines) and sum("," in line for line in lines) * 2 > len(lines)):
+        return "quizlet"
+    return "txt"
+
+
+def parse_line(line: str) -> Word:
+    """
+    Parses one "Term - Definition (Notes)" line.
+
+    :param line: The line without its line ending.
+    :return: The parsed word.
+    :raises ValueError: If the line is not in the expected format.
+    """
+    term, separator, definition = line.partition(" - ")
+    term = term.strip()
+    definition = definition.strip()
+    if not separator:
+        raise ValueError("missing ' - ' between term and definition")
+    if not term:
+        raise ValueError("empty term")
+    notes = ""
+    if definition.endswith(")"):
+        head, bracket, tail = definition[:-1].rpartition(" (")
+        if bracket:
+            definition, notes = head, tail
+    if not definition:
+        raise ValueError("empty definition")
+    return Word(term, definition, notes)
+
+
+def parse_export_line(line: str) -> Word:
+    """
+    Parses one card of a Quizlet export: the term, a tab (or a comma when the line has no
+    tab) and the definition, which may contain further separators.
+
+    :param line: The line without its line ending.
+    :return: The parsed word.
+    :raises ValueError: If the line is not in the expected format.
+    """
+    term, separator, definition = line.partition("\t" if "\t" in line else ",")
+    term, definition = term.strip(), definition.strip()
+    if not separator:
+        raise ValueError("missing tab or comma between term and definition")
+    if not term:
+        raise ValueError("empty term")
+    if not definition:
+        raise ValueError("empty definition")
+    return Word(term, definition)
+
+
+def parse_row(row: List[str]) -> Word:
+    """
+    Parses one CSV/TSV row of term, definition and optional notes.
+
+    :param row: The fields of the row.
+    :return: The parsed word.
+    :raises ValueError: If the row does not have the expected fields.
+    """
+    if len(row) not in (2, 3):
+        raise ValueError(f"expected 2 or 3 fields, found {len(row)}")
+    term, definition = row[0].strip(), row[1].strip()
+    if not term:
+        raise ValueError("empty term")
+    if not definition:
+        raise ValueError("empty definition")
+    return Word(term, definition, row[2].strip() if len(row) == 3 else "")
+
+
+def is_header(row: List[str]) -> bool:
+    """
+    Tells a header row such as "term,definition,notes" from a word.
+
+    :param row: The first non-empty row of a CSV/TSV file.
+    :return: True if its first two fields are known column names.
+    """
+    return (len(row) >= 2 and row[0].strip().lower() in TERM_HEADERS
+            and row[1].strip().lower() in DEFINITION_HEADERS)
+
+
+def parse_words(lines: Iterable[str], file_format: str, result: ImportResult) -> Iterator[Word]:
+    """
+    Lazily parses words from an iterable of lines; malformed lines are recorded in result.
+
+    :param lines: The decoded lines of the file.
+    :param file_format: One of FORMATS.
+    :param result: Collects the line numbers and reasons of malformed lines.
+    :return: A generator of Word objects.
+    """
+    if file_format in ("txt", "quizlet"):
+        parse = parse_line if file_format == "txt" else parse_export_line
+        for line_number, line in enumerate(lines, 1):
+            line = line.rstrip("\r\n")
+            if not line.strip():
+                continue
+            try:
+                yield parse(line)
+            except ValueError as error:
+                result.add_error(line_number, str(error))
+        return
+
+    reader = csv.reader(lines, delimiter="\t" if file_format == "tsv" else ",")
+    first = True
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as error:
+            result.add_error(reader.line_num, str(error))
+            continue
+        if not any(field.strip() for field in row):
+            continue
+        if first:
+            first = False
+            if is_header(row):
+                continue
+        try:
+            yield parse_row(row)
+        except ValueError as error:
+            result.add_error(reader.line_num, str(error))
+
+
+@contextmanager
+def open_words(file_name: str, file_format: str, result: ImportResult):
+    """
+    Opens a file as a stream of words, whatever its format.
+
+    :param file_name: The file to read.
+    :param file_format: One of FORMATS.
+    :param result: Collects the malformed lines (for Anki packages, notes by number).
+    :return: A context manager giving the words as a generator and a function returning
+             (units read, total units) for progress: bytes for text files, notes for
+             Anki packages.
+    """
+    if file_format == "apkg":
+        with AnkiPackage.open_collection(file_name) as conn:
+            total = AnkiPackage.count_notes(conn)
+            read = [0]
+            yield (AnkiPackage.read_words(conn, result.add_error, lambda number: read.__setitem__(0, number)),
+                   lambda: (read[0], total))
+        return
+    total = os.path.getsize(file_name)
+    with open(file_name, "rb") as file:
+        counter = ByteCounter(file, result.add_error)
+        yield parse_words(counter, file_format, result), lambda: (counter.position, total)
+
+
+def import_file(db: Database, list_id: int, file_name: str, file_format: Optional[str] = None,
+                chunk_size: int = BATCH_SIZE,
+                progress: Optional[Callable[[int, int], None]] = None,
+                cancelled: Optional[Callable[[], bool]] = None,
+                duplicates: str = KEEP) -> ImportResult:
+    """
+    Streams a word list file into an existing list, one chunk of rows per transaction,
+    so memory use does not grow with the size of the file. Anki packages are read from
+    their collection database a row at a time.
+
+    :param db: The database to write to.
+    :param list_id: The id of the word list receiving the words.
+    :param file_name: The file to import.
+    :param file_format: One of FORMATS; guessed from the name and contents when omitted.
+    :param chunk_size: The number of words inserted per transaction.
+    :param progress: Called with (units read, total units) after every chunk.
+    :param cancelled: Polled after every chunk; the import stops when it returns True.
+    :param duplicates: One of Duplicates.POLICIES, for words whose term is already stored.
+    :return: The number of imported rows and the malformed lines.
+    """
+    result = ImportResult()
+    file_format = file_format or guess_format(file_name)
+    with open_words(file_name, file_format, result) as (words, position):
+        for chunk in batched(words, chunk_size):
+            inserted = db.add_words(list_id, chunk, duplicates)
+            result.rows += len(inserted)
+            result.duplicates += len(chunk) - len(inserted)
+            if progress:
+                progress(*position())
+            if cancelled and cancelled():
+                result.cancelled = True
+                break
+        total = position()[1]
+    if progress and not result.cancelled:
+        progress(total, total)
+    return result
+
+
+def expand_sources(sources: Iterable[str]) -> List[str]:
+    """
+    Lists the files to import: every word list file directly in a directory, the files
+    matching a glob pattern such as "course/**/*.txt", or a file itself.
+
+    :param sources: Directories, patterns and file names.
+    :return: The files, sorted within each source, without repeats.
+    """
+    files = []
+    for source in sources:
+        if os.path.isdir(source):
+            found = sorted(os.path.join(source, name) for name in os.listdir(source)
+                           if os.path.splitext(name)[1].lower().lstrip(".") in FORMATS)
+        elif any(character in source for character in "*?["):
+            found = sorted(glob.glob(source, recursive=True))
+        else:
+            found = [source]
+        files.extend(name for name in found if os.path.isfile(name) or name == source)
+    return list(dict.fromkeys(files))
+
+
+def parse_file(file_name: str) -> FileImport:
+    """
+    Reads and parses a whole file, including the term keys, so that the writer only has
+    to insert. Runs in the worker processes of import_files.
+
+    :param file_name: The file to parse.
+    :return: The parsed words, or the reason the file could not be read.
+    """
+    parsed = FileImport(file_name)
+    start = time.perf_counter()
+    try:
+        parsed.size = os.path.getsize(file_name)
+        with open_words(file_name, guess_format(file_name), parsed) as (words, _):
+            for word in words:
+                parsed.words.append((word.term, word.definition, word.notes))
+                parsed.keys.append(term_key(word.term))
+    except (OSError, ValueError, zipfile.BadZipFile, sqlite3.Error) as error:
+        parsed.failure = str(error)
+        parsed.words, parsed.keys = [], []
+    else:
+        if not parsed.words:
+            parsed.failure = "no words found"
+    parsed.parse_seconds = time.perf_counter() - start
+    return parsed
+
+
+def parse_ahead(executor: Executor, file_names: List[str], window: int) -> Iterator[FileImport]:
+    # Yields the parsed files in order while at most window files are parsed or waiting,
+    # so memory stays bounded when the writer is slower than the workers.
+    names = iter(file_names)
+    pending = deque(executor.submit(parse_file, name) for name in islice(names, window))
+    while pending:
+        parsed = pending.popleft().result()
+        for name in islice(names, 1):
+            pending.append(executor.submit(parse_file, name))
+        yield parsed
+
+
+def import_files(db: Database, file_names: List[str], duplicates: str = KEEP, workers: Optional[int] = None,
+                 progress: Optional[Callable[[int, int], None]] = None,
+                 cancelled: Optional[Callable[[], bool]] = None) -> BulkImportResult:
+    """
+    Imports every file as a new list titled after the file name. Worker processes parse
+    the files in parallel; this process is the only writer and commits each file with its
+    list in one transaction, so a failure never leaves a half-imported list.
+
+    :param db: The database to write to.
+    :param file_names: The files to import, e.g. from expand_sources.
+    :param duplicates: One of Duplicates.POLICIES, for words whose term is already stored.
+    :param workers: The number of parsing processes; all cores when omitted. With 1 the
+                    files are parsed in this process.
+    :param progress: Called with (files done, total files) after every file.
+    :param cancelled: Polled after every file; the import stops when it returns True.
+    :return: Per-file word counts and errors, and the overall throughput.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(file_names)))
+    result = BulkImportResult(workers)
+    start = time.perf_counter()
+    executor = None
+    if workers == 1:
+        parsed_files = map(parse_file, file_names)
+    else:
+        # Spawned, not forked: the caller may be a threaded GUI process.
+        executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        parsed_files = parse_ahead(executor, file_names, 2 * workers)
+    try:
+        for done, parsed in enumerate(parsed_files, 1):
+            if parsed.failure is None:
+                words = [Word(term, definition, notes) for term, definition, notes in parsed.words]
+                parsed.list_id, ids = db.create_word_list(parsed.title, words, duplicates, parsed.keys)
+                parsed.rows = len(ids)
+                parsed.duplicates = len(words) - len(ids)
+            parsed.words, parsed.keys = [], []
+            result.files.append(parsed)
+            if progress:
+                progress(done, len(file_names))
+            if cancelled and cancelled():
+                result.cancelled = done < len(file_names)
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        result.seconds = time.perf_counter() - start
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import word list files, one new list per file.")
+    parser.add_argument("sources", nargs="+", help="directories, glob patterns or files")
+    parser.add_argument("--db", default="word_lists.db")
+    parser.add_argument("--workers", type=int, help="parsing processes (default: all cores)")
+    parser.add_argument("--duplicates", choices=POLICIES, default=KEEP)
+    args = parser.parse_args()
+    database = Database(args.db)
+    print(import_files(database, expand_sources(args.sources), args.duplicates, args.workers).summary())
+    database.conn.close()
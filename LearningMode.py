@@ -1,19 +1,18 @@
-import random
-
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox, QProgressBar
 
+from Profiler import PROFILER
+from ReviewLog import ReviewLog
+from Scheduler import Scheduler, ClassicScheduler
+from StudySession import StudySession
 from Word import Word
-from Style import setColours
 
 class LearningMode(QDialog):
-    def __init__(self, words: list[Word]):
+    @PROFILER.profiled("ui.LearningMode.open")
+    def __init__(self, words: list[Word], scheduler_class: type[Scheduler] = ClassicScheduler,
+                 progress: dict[int, tuple] = None, review_log: ReviewLog = None):
         super().__init__()
         self.setWindowTitle("Learning Mode")
-        self.words = words.copy()
-        self.current_word_index = -1
-        self.correct_answer = ""
-        self.correct_answers = 0
-        self.total_questions = 0
+        self.session = StudySession(words, scheduler_class, progress, review_log)
 
         self.layout = QVBoxLayout()
 
@@ -43,58 +42,37 @@ class LearningMode(QDialog):
         self.layout.addWidget(self.progress_bar)
 
         self.setLayout(self.layout)
-        self.new_session()
-
-        setColours(self)
+        self.start_session()
 
-    def new_session(self):
-        self.correct_answers = 0
-        self.total_questions = 0
-        for word in self.words:
-            word.result = 0
-        self.progress_bar.setMaximum(len(self.words))
-        self.progress_bar.setValue(0)
+    def start_session(self):
+        self.progress_bar.setMaximum(self.session.scheduler.total)
+        self.update_progress()
         self.new_word()
 
     def new_word(self):
-        if not self.words:
+        question = self.session.next_question()
+        if question is None:
             self.end_learning()
             return
-
-        self.current_word_index = random.randint(0, len(self.words) - 1)
-        word = self.words[self.current_word_index]
-        if word.result < 4:
-            self.prompt_label.setText(f"Define: {word.term}")
-            self.correct_answer = word.definition
-        else:
-            self.prompt_label.setText(f"What is the term for: {word.definition}")
-            self.correct_answer = word.term
-
+        self.prompt_label.setText(question.prompt)
         self.answer_input.clear()
-        self.total_questions += 1
 
     def check_answer(self):
-        user_answer = self.answer_input.text()
-        if user_answer.strip().lower() in [ans.strip().lower() for ans in self.correct_answer.split(", ")]:
+        if self.session.check(self.answer_input.text()):
             self.correct_response()
         else:
             self.incorrect_response()
 
     def correct_response(self):
-        self.correct_answers += 1
-        word = self.words[self.current_word_index]
-        word.result += 1 if word.result % 4 != 0 else 4
-        if word.result == 8:
-            self.words.pop(self.current_word_index)
-            self.update_progress()
+        self.session.answer(True)
+        self.update_progress()
         self.new_word()
 
     def incorrect_response(self):
-        word = self.words[self.current_word_index]
         msg_box = QMessageBox(self)
         msg_box.setWindowTitle("Incorrect Answer")
         msg_box.setText(
-            f"{self.prompt_label.text()}\nCorrect answer: {self.correct_answer}\nYour answer: {self.answer_input.text()}\n"
+            f"{self.prompt_label.text()}\nCorrect answer: {self.session.current.answer}\nYour answer: {self.answer_input.text()}\n"
         )
         msg_box.setStandardButtons(QMessageBox.StandardButton.Ok | QMessageBox.StandardButton.Ignore)
         ret = msg_box.exec()
@@ -102,21 +80,22 @@ class LearningMode(QDialog):
         if ret == QMessageBox.StandardButton.Ignore:
             self.correct_response()
         else:
-            if word.result % 4 == 0:
-                word.result += 1
-            elif word.result % 4 != 1:
-                word.result -= 1
+            self.session.answer(False)
             self.new_word()
 
     def update_progress(self):
-        self.progress_bar.setValue(self.progress_bar.value() + 1)
+        self.progress_bar.setValue(self.session.scheduler.mastered)
+
+    def done(self, result):
+        self.session.flush()
+        super().done(result)
 
     def end_learning(self):
-        accuracy = self.correct_answers / self.total_questions if self.total_questions > 0 else 0
+        session = self.session
         msg_box = QMessageBox(self)
         msg_box.setWindowTitle("Session Statistics")
         msg_box.setText(
-            f"Session Statistics:\nCorrect Answers: {self.correct_answers}\nTotal Questions: {self.total_questions}\nAccuracy: {accuracy:.2%}"
+            f"Session Statistics:\nCorrect Answers: {session.correct_answers}\nTotal Questions: {session.total_questions}\nAccuracy: {session.accuracy:.2%}"
         )
         msg_box.setStandardButtons(QMessageBox.StandardButton.Ok)
         msg_box.exec()
@@ -1,22 +1,38 @@
 import sys
-from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtGui import QIcon, QPixmap
-from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget, QLabel, QTreeWidget, QTreeWidgetItem, \
-    QPushButton, QDialog, QLineEdit, QCheckBox, QHBoxLayout, QFileDialog, QSpacerItem, QSizePolicy
-
-from Database import Database
+import threading
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QShortcut, QKeySequence
+from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget, QLabel, QTreeView, QPushButton, QDialog, \
+    QLineEdit, QHBoxLayout, QFileDialog, QSpacerItem, QSizePolicy, QMessageBox, QProgressDialog, QComboBox, QInputDialog, \
+    QPlainTextEdit
+
+import Exporter
+import Importer
+from AsyncDatabase import AsyncDatabase
+from Duplicates import POLICIES
 from LearningMode import LearningMode
+from Profiler import PROFILER, ENV_VAR, FILE_ENV_VAR
+from ReviewLog import ReviewLog
+from Scheduler import SCHEDULERS
+from SearchResultsModel import SearchResultsModel
 from Word import Word
 from WordList import WordList
-from Style import setColours
+from WordListsModel import WordListsModel, LIST_EDIT_COLUMN
+from WordTableModel import WordTableModel, EditButtonDelegate, EDIT_COLUMN
+from WriteBehind import WriteBehind
+from Style import apply_style, pixmap
+
+SEARCH_DELAY_MS = 150
+CHANGE_POLL_MS = 1000  # how often to look for changes made by other instances of the app
+SEARCH_LIMIT = 100
 
 
 class EditWordListDialog(QDialog):
-    def __init__(self, word_list: WordList, tree_item: QTreeWidgetItem):
+    @PROFILER.profiled("ui.EditWordListDialog.open")
+    def __init__(self, word_list: WordList):
         super().__init__()
         self.setWindowTitle("Edit Word List Title")
         self.word_list = word_list
-        self.tree_item = tree_item
 
         self.layout = QVBoxLayout()
 
@@ -29,20 +45,17 @@ class EditWordListDialog(QDialog):
 
         self.setLayout(self.layout)
 
-        setColours(self)
-
     def save(self):
         self.word_list.title = self.title_edit.text()
-        self.tree_item.setText(0, self.word_list.title)
         self.accept()
 
 
 class EditWordDialog(QDialog):
-    def __init__(self, word: Word, tree_item: QTreeWidgetItem):
+    @PROFILER.profiled("ui.EditWordDialog.open")
+    def __init__(self, word: Word):
         super().__init__()
         self.setWindowTitle("Edit Word")
         self.word = word
-        self.tree_item = tree_item
 
         self.layout = QVBoxLayout()
 
@@ -63,25 +76,18 @@ class EditWordDialog(QDialog):
 
         self.setLayout(self.layout)
 
-        setColours(self)
-
     def save(self):
         self.word.term = self.term_edit.text()
         self.word.definition = self.definition_edit.text()
         self.word.notes = self.notes_edit.text()
-
-        self.tree_item.setText(1, self.word.term)
-        self.tree_item.setText(2, self.word.definition)
-        self.tree_item.setText(3, self.word.notes)
-
         self.accept()
 
 class AddWordDialog(QDialog):
-    def __init__(self, word_list: WordList, db: Database):
+    @PROFILER.profiled("ui.AddWordDialog.open")
+    def __init__(self, model: WordTableModel):
         super().__init__()
         self.setWindowTitle("Add Word")
-        self.word_list = word_list
-        self.db = db
+        self.model = model
         self.current_word = Word("new", "newly added word")
 
         self.layout = QVBoxLayout()
@@ -107,22 +113,40 @@ class AddWordDialog(QDialog):
 
         self.setLayout(self.layout)
 
-        setColours(self)
-
     def save(self):
-        self.current_word.term = self.term_edit.text()
-        self.current_word.definition = self.definition_edit.text()
-        self.current_word.notes = self.notes_edit.text()
-        self.current_word.id = self.db.add_word(self.word_list.id, self.current_word.selected, self.current_word.term, self.current_word.definition, self.current_word.notes)
-        self.word_list.words.append(self.current_word)
-        self.accept()
+        self.check_duplicate(close=True)
 
     def next(self):
-        self.current_word.term = self.term_edit.text()
-        self.current_word.definition = self.definition_edit.text()
-        self.current_word.notes = self.notes_edit.text()
-        self.current_word.id = self.db.add_word(self.word_list.id, self.current_word.selected, self.current_word.term, self.current_word.definition, self.current_word.notes)
-        self.word_list.words.append(self.current_word)
+        self.check_duplicate(close=False)
+
+    def check_duplicate(self, close):
+        # Looks the term up on the database thread and only adds the word once the user
+        # has seen which lists already contain it. The buttons stay disabled meanwhile, so
+        # the word cannot be edited or submitted twice before the answer arrives.
+        word = self.current_word
+        word.term = self.term_edit.text()
+        word.definition = self.definition_edit.text()
+        word.notes = self.notes_edit.text()
+        self.set_buttons_enabled(False)
+        self.model.db.call('find_term', word.term,
+                           callback=lambda titles: self.add_checked(word, titles, close),
+                           errback=lambda error: self.set_buttons_enabled(True))
+
+    def set_buttons_enabled(self, enabled):
+        self.next_button.setEnabled(enabled)
+        self.save_button.setEnabled(enabled)
+
+    def add_checked(self, word, titles, close):
+        self.set_buttons_enabled(True)
+        if titles:
+            answer = QMessageBox.question(self, "Add Word",
+                                          f"\"{word.term}\" is already in: {', '.join(titles)}.\nAdd it anyway?")
+            if answer != QMessageBox.StandardButton.Yes:
+                return
+        self.model.add_word(word)
+        if close:
+            self.accept()
+            return
         self.term_edit.clear()
         self.definition_edit.clear()
         self.notes_edit.clear()
@@ -131,21 +155,65 @@ class AddWordDialog(QDialog):
 
 
 class WordListEditor(QDialog):
-    def __init__(self, word_list: WordList, db: Database):
+    list_deleted = pyqtSignal(int)  # the open list turned out to be deleted by another instance
+
+    @PROFILER.profiled("ui.WordListEditor.open")
+    def __init__(self, word_list: WordList, db: AsyncDatabase, writes: WriteBehind):
         super().__init__()
         self.setWindowTitle(word_list.title)
         self.setGeometry(200, 200, 600, 400)
         self.word_list = word_list
         self.db = db
+        self.writes = writes
 
         self.layout = QVBoxLayout()
 
-        self.tree = QTreeWidget()
-        self.tree.setColumnCount(5)
-        self.tree.setHeaderLabels(["Selected", "Term", "Definition", "Notes", "Edit"])
-        self.populate_tree()
+        self.model = WordTableModel(word_list, db, writes)
+        self.edit_delegate = EditButtonDelegate(self)
+        self.edit_delegate.clicked.connect(lambda index: self.edit_word(index.row()))
+
+        self.tree = QTreeView()
+        self.tree.setRootIsDecorated(False)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setModel(self.model)
+        self.tree.setItemDelegateForColumn(EDIT_COLUMN, self.edit_delegate)
+        # Clicking a header sorts in the database; a third click goes back to the list order.
+        self.tree.header().setSortIndicatorClearable(True)
+        self.tree.header().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.tree.setSortingEnabled(True)
+
+        filter_layout = QHBoxLayout()
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter terms...")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(SEARCH_DELAY_MS)
+        self.filter_timer.timeout.connect(self.apply_filter)
+        self.filter_edit.textChanged.connect(lambda _: self.filter_timer.start())
+        filter_layout.addWidget(self.filter_edit)
+        self.selected_filter_combo = QComboBox()
+        for text, selected in (("All words", None), ("Selected", True), ("Unselected", False)):
+            self.selected_filter_combo.addItem(text, selected)
+        self.selected_filter_combo.currentIndexChanged.connect(lambda _: self.apply_filter())
+        filter_layout.addWidget(self.selected_filter_combo)
+        self.layout.addLayout(filter_layout)
         self.layout.addWidget(self.tree)
 
+        selection_layout = QHBoxLayout()
+        for text, action in (("Select All", lambda: self.model.select_all(True)),
+                             ("Select None", lambda: self.model.select_all(False)),
+                             ("Invert", self.model.invert_selection)):
+            button = QPushButton(text)
+            button.clicked.connect(action)
+            selection_layout.addWidget(button)
+        self.select_matching_edit = QLineEdit()
+        self.select_matching_edit.setPlaceholderText("Select matching...")
+        self.select_matching_edit.returnPressed.connect(
+            lambda: self.model.select_matching(self.select_matching_edit.text()))
+        selection_layout.addWidget(self.select_matching_edit)
+        self.layout.addLayout(selection_layout)
+
         self.add_word_button = QPushButton("Add Word")
         self.add_word_button.clicked.connect(self.add_word)
         self.layout.addWidget(self.add_word_button)
@@ -154,68 +222,67 @@ class WordListEditor(QDialog):
         self.delete_word_button.clicked.connect(self.delete_word)
         self.layout.addWidget(self.delete_word_button)
 
+        learning_layout = QHBoxLayout()
         self.start_learning_button = QPushButton("Start Learning Mode")
         self.start_learning_button.clicked.connect(self.start_learning_mode)
-        self.layout.addWidget(self.start_learning_button)
+        learning_layout.addWidget(self.start_learning_button)
+        self.scheduler_combo = QComboBox()
+        self.scheduler_combo.addItems(SCHEDULERS.keys())
+        self.scheduler_combo.setToolTip("How the next word is chosen")
+        learning_layout.addWidget(self.scheduler_combo)
+        self.layout.addLayout(learning_layout)
 
         self.setLayout(self.layout)
         self.add_word_button.setFocus()
 
-        setColours(self)
-
-    def populate_tree(self):
-        self.tree.clear()
-        for word in self.word_list.words:
-            item = QTreeWidgetItem(["", word.term, word.definition, word.notes, ""])
-            self.tree.addTopLevelItem(item)
-            checkbox = QCheckBox()
-            checkbox.setChecked(word.selected)
-            checkbox.stateChanged.connect(lambda state, w=word: self.update_word_selection(w, state))
-            self.tree.setItemWidget(item, 0, checkbox)
-
-            edit_button = QPushButton()
-            edit_button.setObjectName("editButton")
-            edit_button.setIcon(QIcon("edit_icon.png"))
-            edit_button.setFixedSize(24, 24)
-            edit_button.setIconSize(QSize(16, 16))
-            edit_button.clicked.connect(lambda _, i=item, w=word: self.edit_word(i, w))
-            self.tree.setItemWidget(item, 4, edit_button)
-        self.tree.setCurrentItem(None)
-
-    def update_word_selection(self, word, state):
-        if not word.selected:
-            word.selected = True
-        else:
-            word.selected = False
-        self.db.update_word(word.id, word.selected, word.term, word.definition, word.notes)
+    def apply_filter(self):
+        self.filter_timer.stop()
+        self.model.set_filter(self.filter_edit.text(), self.selected_filter_combo.currentData())
 
     def add_word(self):
-        dialog = AddWordDialog(self.word_list, self.db)
+        dialog = AddWordDialog(self.model)
         dialog.exec()
-        self.populate_tree()
 
-    def edit_word(self, item, word):
-        dialog = EditWordDialog(word, item)
+    def edit_word(self, row):
+        word = self.model.word(row)
+        dialog = EditWordDialog(word)
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            item.setText(1, word.term)
-            item.setText(2, word.definition)
-            item.setText(3, word.notes)
-            self.db.update_word(word.id, word.selected, word.term, word.definition, word.notes)
+            self.model.update_word(word)
 
     def delete_word(self):
-        selected_item = self.tree.currentItem()
-        if selected_item:
-            selected_index = self.tree.indexOfTopLevelItem(selected_item)
-            selected_word = self.word_list.words[selected_index]
-            self.db.delete_word(selected_word.id)
-            del self.word_list.words[selected_index]
-            self.populate_tree()
+        index = self.tree.currentIndex()
+        if index.isValid():
+            self.model.remove_word(index.row())
+
+    def done(self, result):
+        self.writes.flush()
+        super().done(result)
 
     def start_learning_mode(self):
-        selected_words = [word for word in self.word_list.words if word.selected]
-        if not selected_words:
-            selected_words = self.word_list.words
-        dialog = LearningMode(selected_words)
+        self.start_learning_button.setEnabled(False)
+        self.writes.flush()
+        scheduler_class = SCHEDULERS[self.scheduler_combo.currentText()]
+
+        def load(db):
+            # Copies from the cache, so studying the same list again skips the query.
+            words = (db.cache.copy_words(self.word_list.id, selected_only=True)
+                     or db.cache.copy_words(self.word_list.id))
+            return words, db.load_progress(self.word_list.id, scheduler_class.name)
+
+        self.db.submit(load, callback=lambda loaded: self.words_to_learn_loaded(scheduler_class, *loaded),
+                       errback=lambda error: self.start_learning_button.setEnabled(True))
+
+    def words_to_learn_loaded(self, scheduler_class, words, progress):
+        self.start_learning_button.setEnabled(True)
+        if words is None:
+            # Deleted by another instance before the change poll noticed.
+            QMessageBox.warning(self, "Word List Deleted",
+                                "This word list was deleted in another window of the app.")
+            self.list_deleted.emit(self.word_list.id)
+            self.reject()
+            return
+        review_log = ReviewLog(lambda reviews: self.db.submit(lambda db: db.save_reviews(reviews)))
+        dialog = LearningMode(words, scheduler_class, progress, review_log)
         dialog.exec()
 
 
@@ -238,8 +305,6 @@ class AddWordListDialog(QDialog):
 
         self.setLayout(self.layout)
 
-        setColours(self)
-
     def add_word_list(self):
         self.title = self.title_edit.text()
         if self.title:
@@ -248,16 +313,83 @@ class AddWordListDialog(QDialog):
             self.reject()
 
 
+class ProfilerDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Performance")
+        self.setGeometry(150, 150, 800, 500)
+
+        layout = QVBoxLayout()
+        self.report_view = QPlainTextEdit()
+        self.report_view.setReadOnly(True)
+        self.report_view.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        layout.addWidget(self.report_view)
+
+        button_layout = QHBoxLayout()
+        for text, slot in (("Refresh", self.refresh), ("Reset", self.reset), ("Export...", self.export)):
+            button = QPushButton(text)
+            button.clicked.connect(slot)
+            button_layout.addWidget(button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+        self.refresh()
+
+    def refresh(self):
+        if PROFILER.enabled:
+            self.report_view.setPlainText(PROFILER.report())
+        else:
+            self.report_view.setPlainText(f"Instrumentation is off. Start the app with {ENV_VAR}=<slow ms> "
+                                          f"(and optionally {FILE_ENV_VAR}=<file>) to turn it on.")
+        # The cache counters are always kept; they live on the database thread.
+        if self.parent() is not None:
+            self.parent().db.submit(lambda db: db.cache.stats(), callback=self.show_cache_stats)
+
+    def show_cache_stats(self, stats):
+        self.report_view.appendPlainText(
+            f"\nWord list cache: {stats['lists']} lists, {stats['words']} of {stats['max_words']} words, "
+            f"{stats['bytes'] / 2 ** 20:.1f} of {stats['max_bytes'] / 2 ** 20:.0f} MiB\n"
+            f"  {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate), "
+            f"{stats['evictions']} evictions, {stats['invalidations']} invalidations, "
+            f"{stats['oversized']} lists over budget")
+
+    def reset(self):
+        PROFILER.reset()
+        self.refresh()
+
+    def export(self):
+        file_name, _ = QFileDialog.getSaveFileName(self, "Export Performance Data", "profile.json",
+                                                   "JSON Files (*.json);;All Files (*)")
+        if file_name:
+            PROFILER.export(file_name)
+
+
 class Quizlet(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Study Buddy")
         self.setGeometry(100, 100, 300, 400)
 
-        self.db = Database()
-        self.word_lists = self.load_word_lists()
+        self.db = AsyncDatabase()
+        self.db.failed.connect(self.database_failed)
+        self.db.start()
+        self.writes = WriteBehind(self.db)
+        self.model = WordListsModel([])
+        self.search_db = None
+        self.search_generation = 0
+        self.editor = None
+        self.polling = False
 
         self.initUI()
+        self.load_word_lists()
+
+        self.change_timer = QTimer(self)
+        self.change_timer.setInterval(CHANGE_POLL_MS)
+        self.change_timer.timeout.connect(self.poll_changes)
+        self.change_timer.start()
+
+        self.profiler_shortcut = QShortcut(QKeySequence("Ctrl+Shift+P"), self)
+        self.profiler_shortcut.activated.connect(lambda: ProfilerDialog(self).exec())
 
     def initUI(self):
         central_widget = QWidget()
@@ -268,15 +400,37 @@ class Quizlet(QMainWindow):
         self.title_label = QLabel("Word Lists")
         layout.addWidget(self.title_label)
 
-        self.tree = QTreeWidget()
-        self.tree.setColumnCount(2)
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Search all lists...")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.search)
+        self.search_edit.textChanged.connect(lambda _: self.search_timer.start())
+        layout.addWidget(self.search_edit)
+
+        self.search_model = SearchResultsModel()
+        self.search_view = QTreeView()
+        self.search_view.setRootIsDecorated(False)
+        self.search_view.setUniformRowHeights(True)
+        self.search_view.setModel(self.search_model)
+        self.search_view.doubleClicked.connect(self.open_search_result)
+        self.search_view.hide()
+        layout.addWidget(self.search_view)
+
+        self.edit_delegate = EditButtonDelegate(self)
+        self.edit_delegate.clicked.connect(lambda index: self.edit_list(self.model.word_list(index.row())))
+
+        self.tree = QTreeView()
+        self.tree.setRootIsDecorated(False)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setModel(self.model)
+        self.tree.setItemDelegateForColumn(LIST_EDIT_COLUMN, self.edit_delegate)
         self.tree.setColumnWidth(0, 200)
         self.tree.setColumnWidth(1, 30)
-        self.tree.setHeaderLabels(["Title", "Edit"])
         layout.addWidget(self.tree)
 
-        self.populate_tree()
-
         self.add_list_button = QPushButton("Add Word List")
         self.add_list_button.clicked.connect(self.add_word_list)
         layout.addWidget(self.add_list_button)
@@ -293,114 +447,324 @@ class Quizlet(QMainWindow):
         self.import_button.setSizePolicy(QSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding))
         import_layout.addWidget(self.import_button)
 
+        self.import_folder_button = QPushButton("Import Folder")
+        self.import_folder_button.clicked.connect(self.import_folder)
+        self.import_folder_button.setToolTip("Imports every .txt, .csv, .tsv and .apkg file in a folder as its own list")
+        import_layout.addWidget(self.import_folder_button)
+
         self.import_info_label = QLabel()
-        self.import_info_label.setPixmap(QPixmap("info.png").scaled(16, 16, Qt.AspectRatioMode.KeepAspectRatio))
-        self.import_info_label.setToolTip("The file should be formatted as follows:\nTerm - Definition (Optional Notes)")
+        self.import_info_label.setPixmap(pixmap("info.png", 16))
+        self.import_info_label.setToolTip("The file should be formatted as follows:\nTerm - Definition (Optional Notes)\n"
+                                          "CSV and TSV files need Term, Definition and optional Notes columns.\n"
+                                          "Quizlet exports (tab or comma between term and definition) and "
+                                          "Anki .apkg decks are recognized too.")
         import_layout.addWidget(self.import_info_label)
 
         layout.addLayout(import_layout)
 
+        export_layout = QHBoxLayout()
+
         self.export_button = QPushButton("Export Word List")
         self.export_button.clicked.connect(self.export_word_list)
-        layout.addWidget(self.export_button)
-
-        self.tree.itemDoubleClicked.connect(self.open_list)
+        export_layout.addWidget(self.export_button)
 
-        central_widget.setLayout(layout)
+        self.export_all_button = QPushButton("Export All")
+        self.export_all_button.clicked.connect(self.export_all_word_lists)
+        export_layout.addWidget(self.export_all_button)
 
-        setColours(self)
+        layout.addLayout(export_layout)
 
-    def populate_tree(self):
-        self.tree.clear()
-        for word_list in self.word_lists:
-            item = QTreeWidgetItem([word_list.title, ""])
-            self.tree.addTopLevelItem(item)
+        self.tree.doubleClicked.connect(self.open_list)
 
-            edit_button = QPushButton()
-            edit_button.setObjectName("editButton")
-            edit_button.setIcon(QIcon("edit_icon.png"))
-            edit_button.setFixedSize(24, 24)
-            edit_button.setIconSize(QSize(16, 16))
-            edit_button.clicked.connect(lambda _, i=item, wl=word_list: self.edit_list(i, wl))
-            self.tree.setItemWidget(item, 1, edit_button)
+        central_widget.setLayout(layout)
 
+    @PROFILER.profiled("ui.load_word_lists")
     def load_word_lists(self):
-        return self.db.load_word_lists()
+        self.db.call('load_word_list_titles', callback=self.model.extend)
+
+    def database_failed(self, message):
+        QMessageBox.critical(self, "Database Error", message)
+
+    def closeEvent(self, event):
+        self.writes.flush()
+        self.db.close()
+        if self.search_db is not None:
+            self.search_db.close()
+        super().closeEvent(event)
 
     def add_word_list(self):
         dialog = AddWordListDialog(self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             new_word_list = WordList(dialog.title, [])
-            new_word_list.id = self.db.add_word_list(new_word_list.title)
-            self.word_lists.append(new_word_list)
-            self.populate_tree()
+            self.db.submit(lambda db: setattr(new_word_list, 'id', db.add_word_list(new_word_list.title)))
+            self.model.append(new_word_list)
 
-    def edit_list(self, item, word_list):
-        dialog = EditWordListDialog(word_list, item)
+    def edit_list(self, word_list):
+        dialog = EditWordListDialog(word_list)
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.db.update_word_list(word_list.id, word_list.title)
-            self.populate_tree()
+            title = word_list.title
+            self.db.submit(lambda db: db.update_word_list(word_list.id, title))
 
     def delete_list(self):
-        selected_item = self.tree.currentItem()
-        if selected_item:
-            selected_index = self.tree.indexOfTopLevelItem(selected_item)
-            selected_list = self.word_lists[selected_index]
-            self.db.delete_word_list(selected_list.id)
-            del self.word_lists[selected_index]
-            self.populate_tree()
-
-    def open_list(self, item):
-        selected_index = self.tree.indexOfTopLevelItem(item)
-        selected_list = self.word_lists[selected_index]
-        dialog = WordListEditor(selected_list, self.db)
-        dialog.exec()
+        index = self.tree.currentIndex()
+        if index.isValid():
+            word_list = self.model.word_list(index.row())
+            self.db.submit(lambda db: db.delete_word_list(word_list.id))
+            self.model.remove(index.row())
+
+    def open_list(self, index):
+        self.open_word_list(self.model.word_list(index.row()))
+
+    def open_word_list(self, word_list):
+        self.editor = WordListEditor(word_list, self.db, self.writes)
+        self.editor.list_deleted.connect(self.word_list_deleted)
+        self.editor.exec()
+        self.editor = None
+
+    def word_list_deleted(self, list_id):
+        row = self.model.find(list_id)
+        if row is not None:
+            self.model.remove(row)
+
+    def poll_changes(self):
+        # Usually a single PRAGMA on the database thread; skipped while one is queued.
+        if self.polling:
+            return
+        self.polling = True
+
+        def take_changes(db):
+            changes = db.take_changes()
+            if changes is None:
+                return None
+            titles, deleted = changes
+            return titles, deleted, {list_id: WordList(title, [], list_id) for list_id, title in titles.items()}
+
+        self.db.submit(take_changes, callback=self.apply_changes,
+                       errback=lambda error: setattr(self, 'polling', False))
+
+    def apply_changes(self, changes):
+        # Lists changed by another instance: renamed rows refresh, new lists are appended,
+        # deleted ones removed, and an open editor re-reads the rows it shows.
+        self.polling = False
+        if changes is None:
+            return
+        titles, deleted, new_lists = changes
+        for list_id, title in titles.items():
+            row = self.model.find(list_id)
+            if row is None:
+                self.model.append(new_lists[list_id])
+            elif self.model.word_list(row).title != title:
+                self.model.word_list(row).title = title
+        rows = (self.model.find(list_id) for list_id in deleted)
+        for row in sorted((row for row in rows if row is not None), reverse=True):
+            self.model.remove(row)
+
+        if self.editor is None:
+            return
+        list_id = self.editor.word_list.id
+        if list_id in deleted:
+            QMessageBox.warning(self.editor, "Word List Deleted",
+                                "This word list was deleted in another window of the app.")
+            self.editor.reject()
+        elif list_id in titles:
+            self.editor.setWindowTitle(titles[list_id])
+            self.editor.model.refresh()
+
+    def search(self):
+        # Searches run on their own connection so that they never queue behind writes. Each
+        # query gets a new generation; queued queries that are already stale are skipped and
+        # stale results are dropped.
+        query = self.search_edit.text().strip()
+        self.search_generation += 1
+        generation = self.search_generation
+        if not query:
+            self.search_view.hide()
+            self.tree.show()
+            return
+        if self.search_db is None:
+            self.search_db = AsyncDatabase()
+            self.search_db.failed.connect(self.database_failed)
+            self.search_db.start()
+        self.search_db.submit(
+            lambda db: db.search(query, SEARCH_LIMIT) if generation == self.search_generation else None,
+            callback=lambda results: self.search_finished(generation, results)
+        )
+
+    def search_finished(self, generation, results):
+        if generation != self.search_generation or results is None:
+            return
+        self.search_model.set_results(results)
+        self.tree.hide()
+        self.search_view.show()
+
+    def open_search_result(self, index):
+        list_id = self.search_model.list_id(index.row())
+        for word_list in self.model.word_lists:
+            if word_list.id == list_id:
+                self.open_word_list(word_list)
+                return
 
     def import_word_list(self):
-        file_name, _ = QFileDialog.getOpenFileName(self, "Import Word List", "", "Text Files (*.txt);;All Files (*)")
-        if file_name:
-            with open(file_name, 'r', encoding='utf-8') as file:
-                lines = file.readlines()
-                words = []
-                for line in lines:
-                    parts = line.strip().split(' - ')
-                    term = parts[0]
-                    definition, notes = '', ''
-                    if len(parts) > 1:
-                        if '(' in parts[1] and parts[1].endswith(')'):
-                            definition, notes = parts[1].rsplit(' (', 1)
-                            notes = notes[:-1]
-                        else:
-                            definition = parts[1]
-                    words.append(Word(term, definition, notes))
-
-                dialog = AddWordListDialog(self)
-                if dialog.exec() == QDialog.DialogCode.Accepted:
-                    new_word_list = WordList(dialog.title, words)
-                    new_word_list.id = self.db.add_word_list(new_word_list.title)
-                    self.db.import_word_list(new_word_list.id, words)
-                    self.word_lists.append(new_word_list)
-                    self.populate_tree()
+        file_name, _ = QFileDialog.getOpenFileName(self, "Import Word List", "",
+                                                   "Word Lists (*.txt *.csv *.tsv *.apkg);;Text Files (*.txt);;"
+                                                   "CSV Files (*.csv);;TSV Files (*.tsv);;Anki Decks (*.apkg);;"
+                                                   "All Files (*)")
+        if not file_name:
+            return
+        dialog = AddWordListDialog(self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+
+        title = dialog.title
+        policy, ok = QInputDialog.getItem(self, "Import Word List", "Words whose term already exists:",
+                                          POLICIES, 0, False)
+        if not ok:
+            return
+        progress_dialog = QProgressDialog("Importing words...", "Cancel", 0, 1000, self)
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(500)
+        self.db.progress.connect(progress_dialog.setValue)
+        cancel = threading.Event()
+        progress_dialog.canceled.connect(cancel.set)
+
+        def import_file(db):
+            list_id = db.add_word_list(title)
+            try:
+                result = Importer.import_file(
+                    db, list_id, file_name,
+                    progress=lambda done, total: self.db.progress.emit(done * 1000 // total if total else 1000),
+                    cancelled=cancel.is_set,
+                    duplicates=policy
+                )
+            except Exception:
+                # The chunks written so far are committed; drop them with the list.
+                db.delete_word_list(list_id)
+                raise
+            if result.cancelled:
+                db.delete_word_list(list_id)
+            return WordList(title, [], list_id), result
+
+        def close_progress(*_):
+            self.db.progress.disconnect(progress_dialog.setValue)
+            progress_dialog.close()
+
+        def imported(outcome):
+            word_list, result = outcome
+            close_progress()
+            if result.cancelled:
+                return
+            self.model.append(word_list)
+            if result.duplicates:
+                QMessageBox.information(self, "Import Word List",
+                                        f"{result.duplicates} words were already in the database ({policy}).")
+            if result.error_count:
+                lines = "\n".join(f"Line {line_number}: {reason}" for line_number, reason in result.errors[:20])
+                QMessageBox.warning(self, "Import Word List",
+                                    f"Imported {result.rows} words. {result.error_count} malformed lines were skipped:\n{lines}")
+
+        self.db.submit(import_file, callback=imported, errback=close_progress)
+
+    def import_folder(self):
+        directory = QFileDialog.getExistingDirectory(self, "Import Folder")
+        if not directory:
+            return
+        file_names = Importer.expand_sources([directory])
+        if not file_names:
+            QMessageBox.information(self, "Import Folder", "The folder has no .txt, .csv, .tsv or .apkg files.")
+            return
+        policy, ok = QInputDialog.getItem(self, "Import Folder", "Words whose term already exists:",
+                                          POLICIES, 0, False)
+        if not ok:
+            return
+        progress_dialog = QProgressDialog(f"Importing {len(file_names)} files...", "Cancel", 0, 1000, self)
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(500)
+        self.db.progress.connect(progress_dialog.setValue)
+        cancel = threading.Event()
+        progress_dialog.canceled.connect(cancel.set)
+
+        def import_files(db):
+            # Files already written stay imported when the import is cancelled.
+            result = Importer.import_files(
+                db, file_names, policy,
+                progress=lambda done, total: self.db.progress.emit(done * 1000 // total),
+                cancelled=cancel.is_set
+            )
+            return [WordList(file.title, [], file.list_id) for file in result.files if file.list_id], result
+
+        def close_progress(*_):
+            self.db.progress.disconnect(progress_dialog.setValue)
+            progress_dialog.close()
+
+        def imported(outcome):
+            word_lists, result = outcome
+            close_progress()
+            self.model.extend(word_lists)
+            box = QMessageBox(QMessageBox.Icon.Information, "Import Folder",
+                              f"Imported {result.rows} words into {len(word_lists)} lists"
+                              f"{' before the import was cancelled' if result.cancelled else ''}. "
+                              f"{len(result.failed)} files could not be imported.", parent=self)
+            box.setDetailedText(result.summary())
+            box.exec()
+
+        self.db.submit(import_files, callback=imported, errback=close_progress)
 
     def export_word_list(self):
-        selected_item = self.tree.currentItem()
-        if selected_item:
-            selected_index = self.tree.indexOfTopLevelItem(selected_item)
-            selected_list = self.word_lists[selected_index]
+        index = self.tree.currentIndex()
+        if index.isValid():
+            selected_list = self.model.word_list(index.row())
 
-            file_name, _ = QFileDialog.getSaveFileName(self, "Export Word List", "", "Text Files (*.txt);;All Files (*)")
+            file_name, _ = QFileDialog.getSaveFileName(self, "Export Word List", "",
+                                                       "Text Files (*.txt);;CSV Files (*.csv);;JSON Lines (*.jsonl);;"
+                                                       "Compressed (*.txt.gz *.csv.gz *.jsonl.gz);;All Files (*)")
             if file_name:
-                words = self.db.export_word_list(selected_list.id)
-                with open(file_name, 'w', encoding='utf-8') as file:
-                    for term, definition, notes in words:
-                        if notes:
-                            file.write(f"{term} - {definition} ({notes})\n")
-                        else:
-                            file.write(f"{term} - {definition}\n")
+                self.db.submit(lambda db: Exporter.export_file(db, selected_list.id, file_name))
+
+    def export_all_word_lists(self):
+        file_name, _ = QFileDialog.getSaveFileName(self, "Export All Word Lists", "",
+                                                   "Zip Archives (*.zip);;Compressed CSV (*.csv.gz);;"
+                                                   "Compressed JSON Lines (*.jsonl.gz)")
+        if not file_name:
+            return
+        file_format, archive = Exporter.detect_format(file_name)
+        if archive is None:
+            file_name += ".zip"
+        elif archive == "gz" and file_format == "txt":
+            QMessageBox.warning(self, "Export All Word Lists", "Compressed exports of all lists must be .csv.gz or .jsonl.gz.")
+            return
+
+        progress_dialog = QProgressDialog("Exporting word lists...", "Cancel", 0, 1000, self)
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(500)
+        self.db.progress.connect(progress_dialog.setValue)
+        cancel = threading.Event()
+        progress_dialog.canceled.connect(cancel.set)
+
+        def export_all(db):
+            return Exporter.export_all(
+                db, file_name,
+                progress=lambda done, total: self.db.progress.emit(done * 1000 // total if total else 1000),
+                cancelled=cancel.is_set
+            )
+
+        def close_progress(*_):
+            self.db.progress.disconnect(progress_dialog.setValue)
+            progress_dialog.close()
+
+        def exported(count):
+            close_progress()
+            # None: cancelled, and nothing was written.
+            if count is None:
+                QMessageBox.information(self, "Export All Word Lists", "The export was cancelled; no file was written.")
+            else:
+                QMessageBox.information(self, "Export All Word Lists", f"Exported {count} words to {file_name}.")
+
+        self.db.submit(export_all, callback=exported, errback=close_progress)
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    apply_style(app)
     window = Quizlet()
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
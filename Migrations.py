@@ -0,0 +1,175 @@
+import sqlite3
+
+from Duplicates import term_key
+
+# Each migration upgrades the schema by one version; PRAGMA user_version records the
+# version a database file is at. Append new migrations, never edit released ones.
+
+
+def create_tables(conn: sqlite3.Connection) -> None:
+    conn.execute('''CREATE TABLE IF NOT EXISTS word_lists (
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL
+    )''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS words (
+        id INTEGER PRIMARY KEY,
+        list_id INTEGER NOT NULL,
+        selected BOOLEAN NOT NULL,
+        term TEXT NOT NULL,
+        definition TEXT NOT NULL,
+        notes TEXT,
+        FOREIGN KEY (list_id) REFERENCES word_lists (id)
+    )''')
+
+
+def cascade_and_index_words(conn: sqlite3.Connection) -> None:
+    # SQLite cannot change a foreign key in place, so the table is rebuilt. Words whose
+    # list no longer exists are unreachable and would now violate the constraint.
+    conn.execute('''CREATE TABLE words_v2 (
+        id INTEGER PRIMARY KEY,
+        list_id INTEGER NOT NULL REFERENCES word_lists (id) ON DELETE CASCADE,
+        selected BOOLEAN NOT NULL,
+        term TEXT NOT NULL,
+        definition TEXT NOT NULL,
+        notes TEXT
+    )''')
+    conn.execute('''INSERT INTO words_v2 (id, list_id, selected, term, definition, notes)
+        SELECT id, list_id, selected, term, definition, notes FROM words
+        WHERE list_id IN (SELECT id FROM word_lists)''')
+    conn.execute('DROP TABLE words')
+    conn.execute('ALTER TABLE words_v2 RENAME TO words')
+    conn.execute('CREATE INDEX words_list_id ON words (list_id)')
+
+
+def create_study_progress(conn: sqlite3.Connection) -> None:
+    conn.execute('''CREATE TABLE reviews (
+        id INTEGER PRIMARY KEY,
+        word_id INTEGER NOT NULL REFERENCES words (id) ON DELETE CASCADE,
+        scheduler TEXT NOT NULL,
+        correct BOOLEAN NOT NULL,
+        reviewed_at REAL NOT NULL
+    )''')
+    conn.execute('CREATE INDEX reviews_word_id ON reviews (word_id)')
+    conn.execute('''CREATE TABLE word_progress (
+        word_id INTEGER NOT NULL REFERENCES words (id) ON DELETE CASCADE,
+        scheduler TEXT NOT NULL,
+        result INTEGER NOT NULL,
+        box INTEGER NOT NULL,
+        easiness REAL NOT NULL,
+        repetitions INTEGER NOT NULL,
+        interval INTEGER NOT NULL,
+        due INTEGER NOT NULL,
+        mastered BOOLEAN NOT NULL,
+        PRIMARY KEY (word_id, scheduler)
+    ) WITHOUT ROWID''')
+
+
+def create_search_index(conn: sqlite3.Connection) -> None:
+    # External-content FTS5 index over the text columns, kept in sync by triggers.
+    # Naming the columns in the update trigger only spares statements that do not set
+    # them; Database writes every column, so reindex_changed_text adds a WHEN clause.
+    conn.execute('''CREATE VIRTUAL TABLE words_fts USING fts5(
+        term, definition, notes,
+        content='words', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )''')
+    conn.execute('''CREATE TRIGGER words_fts_insert AFTER INSERT ON words BEGIN
+        INSERT INTO words_fts (rowid, term, definition, notes) VALUES (new.id, new.term, new.definition, new.notes);
+    END''')
+    conn.execute('''CREATE TRIGGER words_fts_delete AFTER DELETE ON words BEGIN
+        INSERT INTO words_fts (words_fts, rowid, term, definition, notes)
+        VALUES ('delete', old.id, old.term, old.definition, old.notes);
+    END''')
+    conn.execute('''CREATE TRIGGER words_fts_update AFTER UPDATE OF term, definition, notes ON words BEGIN
+        INSERT INTO words_fts (words_fts, rowid, term, definition, notes)
+        VALUES ('delete', old.id, old.term, old.definition, old.notes);
+        INSERT INTO words_fts (rowid, term, definition, notes) VALUES (new.id, new.term, new.definition, new.notes);
+    END''')
+    conn.execute("INSERT INTO words_fts (words_fts) VALUES ('rebuild')")
+
+
+def add_term_keys(conn: sqlite3.Connection) -> None:
+    # A hash of the normalized term, indexed for duplicate detection. It is computed in
+    # Python, so Database fills it in on every insert and update of a term.
+    conn.execute('ALTER TABLE words ADD COLUMN term_key INTEGER')
+    conn.create_function('term_key', 1, term_key, deterministic=True)
+    conn.execute('UPDATE words SET term_key = term_key(term)')
+    conn.execute('CREATE INDEX words_term_key ON words (term_key)')
+
+
+def index_sort_columns(conn: sqlite3.Connection) -> None:
+    # Case-insensitive indexes for paging through a list sorted by term or definition; the
+    # rowid stored in each entry breaks ties, so (value, id) keysets are index ranges.
+    conn.execute('CREATE INDEX words_list_term ON words (list_id, term COLLATE NOCASE)')
+    conn.execute('CREATE INDEX words_list_definition ON words (list_id, definition COLLATE NOCASE)')
+
+
+def add_list_revisions(conn: sqlite3.Connection) -> None:
+    # A counter per list, bumped by every change to the list or its words from any
+    # connection, so another instance of the app can tell which lists to reload.
+    conn.execute('ALTER TABLE word_lists ADD COLUMN revision INTEGER NOT NULL DEFAULT 0')
+    conn.execute('''CREATE TRIGGER words_revision_insert AFTER INSERT ON words BEGIN
+        UPDATE word_lists SET revision = revision + 1 WHERE id = new.list_id;
+    END''')
+    conn.execute('''CREATE TRIGGER words_revision_update AFTER UPDATE ON words BEGIN
+        UPDATE word_lists SET revision = revision + 1 WHERE id IN (old.list_id, new.list_id);
+    END''')
+    conn.execute('''CREATE TRIGGER words_revision_delete AFTER DELETE ON words BEGIN
+        UPDATE word_lists SET revision = revision + 1 WHERE id = old.list_id;
+    END''')
+    conn.execute('''CREATE TRIGGER word_lists_revision AFTER UPDATE OF title ON word_lists BEGIN
+        UPDATE word_lists SET revision = revision + 1 WHERE id = new.id;
+    END''')
+
+
+def reindex_changed_text(conn: sqlite3.Connection) -> None:
+    # Updates set every column of a word, so without the WHEN clause a selection toggle
+    # deleted and re-inserted the word's FTS row. The plain NOCASE term index serves
+    # search's prefix lookup across all lists, which words_list_term cannot.
+    conn.execute('DROP TRIGGER words_fts_update')
+    conn.execute('''CREATE TRIGGER words_fts_update AFTER UPDATE OF term, definition, notes ON words
+        WHEN old.term IS NOT new.term OR old.definition IS NOT new.definition OR old.notes IS NOT new.notes
+    BEGIN
+        INSERT INTO words_fts (words_fts, rowid, term, definition, notes)
+        VALUES ('delete', old.id, old.term, old.definition, old.notes);
+        INSERT INTO words_fts (rowid, term, definition, notes) VALUES (new.id, new.term, new.definition, new.notes);
+    END''')
+    conn.execute('CREATE INDEX words_term ON words (term COLLATE NOCASE)')
+
+
+MIGRATIONS = [
+    create_tables,
+    cascade_and_index_words,
+    create_study_progress,
+    create_search_index,
+    add_term_keys,
+    index_sort_columns,
+    add_list_revisions,
+    reindex_changed_text,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(conn: sqlite3.Connection, target: int = SCHEMA_VERSION) -> int:
+    """
+    Upgrades the database in place, one transaction per version.
+
+    :param conn: The connection to upgrade; foreign keys must not be enforced yet.
+    :param target: The version to stop at.
+    :return: The version the database was at before the upgrade.
+    """
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(f"word list database has schema version {version}, "
+                           f"this version of the app only supports up to {SCHEMA_VERSION}")
+    for next_version in range(version + 1, target + 1):
+        with conn:
+            # IMMEDIATE takes the write lock at once, so instances started together upgrade
+            # one after the other; the version is read again under the lock.
+            conn.execute('BEGIN IMMEDIATE')
+            if conn.execute('PRAGMA user_version').fetchone()[0] >= next_version:
+                continue
+            MIGRATIONS[next_version - 1](conn)
+            conn.execute(f'PRAGMA user_version = {next_version}')
+    return version
@@ -0,0 +1,203 @@
+import atexit
+import bisect
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+# QUIZLET_PROFILE turns instrumentation on; its value is the slow-operation threshold in
+# milliseconds ("1" logs nearly everything, "" or "0" leaves it off). When
+# QUIZLET_PROFILE_FILE is also set, the numbers are written there when the app exits.
+ENV_VAR = "QUIZLET_PROFILE"
+FILE_ENV_VAR = "QUIZLET_PROFILE_FILE"
+
+BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000)  # upper bounds of the latency histogram
+SLOW_LOG_SIZE = 200
+
+
+class Stats:
+    """
+    Call count, latency histogram and rows touched of one instrumented operation.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, seconds: float, rows: int) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.rows += rows
+        self.histogram[bisect.bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+
+    def as_dict(self) -> dict:
+        labels = [f"<={bound}ms" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {"count": self.count, "total_ms": self.total * 1000, "max_ms": self.max * 1000,
+                "mean_ms": self.total * 1000 / self.count if self.count else 0.0, "rows": self.rows,
+                "histogram": dict(zip(labels, self.histogram))}
+
+
+class Profiler:
+    """
+    Opt-in timing of Database methods and UI actions. When disabled, instrument, trace and
+    profiled leave everything untouched, so the only cost is the enabled check at setup.
+    """
+
+    def __init__(self, slow_ms: Optional[float] = None) -> None:
+        """
+        Initializes a profiler.
+
+        :param slow_ms: Operations slower than this many milliseconds go to the slow log;
+                        None disables the profiler.
+        """
+        self.enabled = slow_ms is not None
+        self.slow_seconds = (slow_ms or 0) / 1000
+        self.stats: dict[str, Stats] = {}
+        self.slow_log: deque = deque(maxlen=SLOW_LOG_SIZE)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    @classmethod
+    def from_environment(cls) -> "Profiler":
+        value = os.environ.get(ENV_VAR, "").strip()
+        if value in ("", "0"):
+            return cls()
+        try:
+            return cls(float(value))
+        except ValueError:
+            return cls(100.0)
+
+    def record(self, name: str, seconds: float, rows: int = 0, statements: tuple = ()) -> None:
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = Stats()
+            stats.add(seconds, rows)
+            if seconds >= self.slow_seconds:
+                self.slow_log.append({"at": time.time(), "operation": name, "ms": seconds * 1000,
+                                      "rows": rows, "sql": list(statements)})
+
+    def enter(self) -> int:
+        # Operations nest (a Database method may call another); the SQL traced on this
+        # thread is kept until the outermost one finishes.
+        local = self.local.__dict__
+        local["depth"] = local.get("depth", 0) + 1
+        return len(local.setdefault("statements", []))
+
+    def leave(self, start_index: int) -> tuple:
+        local = self.local.__dict__
+        executed = tuple(local["statements"][start_index:])
+        local["depth"] -= 1
+        if not local["depth"]:
+            local["statements"].clear()
+        return executed
+
+    @contextmanager
+    def timed(self, name: str):
+        start_index = self.enter()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.record(name, elapsed, statements=self.leave(start_index))
+
+    def wrap(self, function: Callable, name: str, conn=None) -> Callable:
+        """
+        Returns function timed under name. With a connection, the rows it changed and the
+        rows in a returned list are counted, and the SQL it ran is kept for the slow log.
+
+        :param function: The function to wrap.
+        :param name: The operation name in the statistics.
+        :param conn: The sqlite3 connection the function uses, if any.
+        :return: The wrapped function.
+        """
+        @functools.wraps(function)
+        def timed_function(*args, **kwargs):
+            start_index = self.enter()
+            changes = conn.total_changes if conn is not None else 0
+            start = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                rows = conn.total_changes - changes if conn is not None else 0
+                executed = self.leave(start_index)
+            if isinstance(result, (list, dict)):
+                rows += len(result)
+            self.record(name, elapsed, rows, executed)
+            return result
+        return timed_function
+
+    def instrument(self, database) -> None:
+        """
+        Times every public method of a Database instance and traces its SQL.
+
+        :param database: The Database to instrument.
+        """
+        if not self.enabled:
+            return
+        database.conn.set_trace_callback(self.trace)
+        for name in dir(type(database)):
+            # Static helpers run once per row and would only add overhead.
+            if name.startswith("_") or isinstance(inspect.getattr_static(database, name), staticmethod):
+                continue
+            attribute = getattr(database, name)
+            if callable(attribute) and not isinstance(attribute, type):
+                setattr(database, name, self.wrap(attribute, f"db.{name}", database.conn))
+
+    def trace(self, statement: str) -> None:
+        # SQLite's trace callback: the statement with its parameters bound, as it starts.
+        statements = self.local.__dict__.setdefault("statements", [])
+        if self.local.__dict__.get("depth") and len(statements) < 1000:
+            statements.append(statement)
+
+    def profiled(self, name: str) -> Callable[[Callable], Callable]:
+        # Decorator for UI methods; returns the function itself when profiling is off.
+        def decorate(function):
+            return self.wrap(function, name) if self.enabled else function
+        return decorate
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {"slow_ms": self.slow_seconds * 1000,
+                    "operations": {name: stats.as_dict() for name, stats in sorted(self.stats.items())},
+                    "slow_log": list(self.slow_log)}
+
+    def report(self) -> str:
+        snapshot = self.snapshot()
+        lines = [f"{'operation':<36} {'calls':>7} {'mean ms':>9} {'max ms':>9} {'total ms':>10} {'rows':>9}"]
+        for name, stats in sorted(snapshot["operations"].items(), key=lambda item: -item[1]["total_ms"]):
+            lines.append(f"{name:<36} {stats['count']:>7} {stats['mean_ms']:>9.2f} {stats['max_ms']:>9.2f} "
+                         f"{stats['total_ms']:>10.1f} {stats['rows']:>9}")
+        lines.append("")
+        lines.append(f"Slow operations (>= {snapshot['slow_ms']:g} ms), newest last:")
+        for entry in snapshot["slow_log"][-50:]:
+            lines.append(f"  {time.strftime('%H:%M:%S', time.localtime(entry['at']))} {entry['operation']} "
+                         f"{entry['ms']:.1f} ms, {entry['rows']} rows")
+            lines.extend(f"      {statement[:300]}" for statement in entry["sql"][:10])
+        return "\n".join(lines)
+
+    def export(self, file_name: str) -> None:
+        with open(file_name, "w", encoding="utf-8") as file:
+            json.dump(self.snapshot(), file, indent=2)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.stats.clear()
+            self.slow_log.clear()
+
+
+PROFILER = Profiler.from_environment()
+
+if PROFILER.enabled and os.environ.get(FILE_ENV_VAR):
+    atexit.register(PROFILER.export, os.environ[FILE_ENV_VAR])
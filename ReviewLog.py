@@ -0,0 +1,51 @@
+import time
+from typing import Callable, NamedTuple
+
+FLUSH_SIZE = 50
+
+
+class Review(NamedTuple):
+    word_id: int
+    scheduler: str
+    correct: bool
+    reviewed_at: float
+    state: tuple  # (result, box, easiness, repetitions, interval, due, mastered)
+
+
+class ReviewLog:
+    """
+    Append-only, in-memory log of answers that is handed to a writer in batches, so that
+    answering a question never waits for a commit.
+    """
+
+    def __init__(self, writer: Callable[[list[Review]], None], flush_size: int = FLUSH_SIZE) -> None:
+        """
+        Initializes a new, empty log.
+
+        :param writer: Receives each batch of reviews, e.g. to save them on the database thread.
+        :param flush_size: The number of reviews that triggers a flush.
+        """
+        self.writer = writer
+        self.flush_size = flush_size
+        self.pending: list[Review] = []
+
+    def record(self, word_id: int, scheduler: str, correct: bool, state: tuple) -> None:
+        """
+        Appends a review, flushing when the batch is full.
+
+        :param word_id: The database id of the reviewed word.
+        :param scheduler: The name of the scheduler that asked it.
+        :param correct: Whether the answer was correct.
+        :param state: The word's scheduling state after the answer.
+        """
+        self.pending.append(Review(word_id, scheduler, correct, time.time(), state))
+        if len(self.pending) >= self.flush_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Hands every pending review to the writer.
+        """
+        if self.pending:
+            batch, self.pending = self.pending, []
+            self.writer(batch)
@@ -0,0 +1,281 @@
+import heapq
+import random
+from typing import Optional
+
+from Word import Word
+
+
+class Scheduler:
+    """
+    Decides which word a learning session asks next and when a word is mastered.
+    """
+
+    name = ""
+
+    def __init__(self, words: list[Word], progress: Optional[dict[int, tuple]] = None) -> None:
+        """
+        Initializes a new session over the given words.
+
+        :param words: The words to learn.
+        :param progress: Saved states by word id, as returned by state(); once every word
+                         is mastered the session starts over instead.
+        """
+        self.total = len(words)
+        self.mastered = 0
+        progress = progress or {}
+        if words and all(word.id in progress and progress[word.id][6] for word in words):
+            progress = {}
+        self.progress = progress
+
+    @property
+    def remaining(self) -> int:
+        """
+        Returns the number of words not yet mastered.
+
+        :return: The number of remaining words.
+        """
+        return self.total - self.mastered
+
+    def next_word(self) -> Optional[Word]:
+        """
+        Picks the word to ask next.
+
+        :return: The word, or None when every word is mastered.
+        """
+        raise NotImplementedError
+
+    def answer(self, word: Word, correct: bool) -> None:
+        """
+        Records the answer to the word last returned by next_word.
+
+        :param word: The word that was asked.
+        :param correct: Whether the answer was correct.
+        """
+        raise NotImplementedError
+
+    def is_reversed(self, word: Word) -> bool:
+        """
+        Returns whether the word should be asked from its definition instead of its term.
+
+        :param word: The word about to be asked.
+        :return: True to ask for the term.
+        """
+        return False
+
+    def state(self, word: Word) -> tuple:
+        """
+        Returns the word's scheduling state for saving.
+
+        :param word: The word.
+        :return: (result, box, easiness, repetitions, interval, due, mastered).
+        """
+        raise NotImplementedError
+
+
+class ClassicScheduler(Scheduler):
+    """
+    The original progression: Word.result counts correct answers, 0-3 asking for the
+    definition and 4-7 for the term; a word is mastered at 8. Words are picked at random,
+    without asking the same word twice in a row.
+    """
+
+    name = "Classic"
+
+    MASTERED = 8
+
+    def __init__(self, words: list[Word], progress: Optional[dict[int, tuple]] = None,
+                 rng: Optional[random.Random] = None) -> None:
+        super().__init__(words, progress)
+        self.rng = rng or random.Random()
+        self.last_index = -1
+        for word in words:
+            saved = self.progress.get(word.id)
+            word.result = saved[0] if saved else 0
+        self.words = [word for word in words if word.result < self.MASTERED]
+        self.mastered = self.total - len(self.words)
+
+    def next_word(self) -> Optional[Word]:
+        if not self.words:
+            return None
+        index = self.rng.randrange(len(self.words))
+        if index == self.last_index and len(self.words) > 1:
+            index = (index + 1 + self.rng.randrange(len(self.words) - 1)) % len(self.words)
+        self.last_index = index
+        return self.words[index]
+
+    def answer(self, word: Word, correct: bool) -> None:
+        if correct:
+            word.result += 1 if word.result % 4 != 0 else 4
+        elif word.result % 4 == 0:
+            word.result += 1
+        elif word.result % 4 != 1:
+            word.result -= 1
+        if word.result == self.MASTERED:
+            # Swap with the last word so that retiring a word is O(1).
+            index = self.last_index
+            self.words[index] = self.words[-1]
+            self.words.pop()
+            self.last_index = -1
+            self.mastered += 1
+
+    def is_reversed(self, word: Word) -> bool:
+        return word.result >= 4
+
+    def state(self, word: Word) -> tuple:
+        return word.result, 0, 2.5, 0, 0, 0, word.result >= self.MASTERED
+
+
+class CardState:
+    """
+    Per-word scheduling state of the queue-based schedulers.
+    """
+
+    __slots__ = ("box", "easiness", "repetitions", "interval", "due", "mastered")
+
+    def __init__(self, box: int = 0, easiness: float = 2.5, repetitions: int = 0, interval: int = 0,
+                 due: int = 0, mastered: bool = False) -> None:
+        self.box = box
+        self.easiness = easiness
+        self.repetitions = repetitions
+        self.interval = interval
+        self.due = due
+        self.mastered = bool(mastered)
+
+
+class QueueScheduler(Scheduler):
+    """
+    Keeps the unmastered words in a heap ordered by due time, then difficulty, so picking
+    and rescheduling a word costs O(log n). Time is counted in questions asked; saved
+    due times are relative to the end of the session that saved them.
+    """
+
+    def __init__(self, words: list[Word], progress: Optional[dict[int, tuple]] = None) -> None:
+        super().__init__(words, progress)
+        self.step = 0
+        self.counter = 0
+        self.heap: list = []
+        self.states: dict[int, CardState] = {}
+        self.current = None
+        self.last: Optional[Word] = None
+        for word in words:
+            saved = self.progress.get(word.id)
+            state = CardState(*saved[1:]) if saved else CardState()
+            self.states[id(word)] = state
+            if state.mastered:
+                self.mastered += 1
+            else:
+                self.push(word)
+
+    def push(self, word: Word) -> None:
+        state = self.states[id(word)]
+        self.counter += 1
+        heapq.heappush(self.heap, (state.due, self.difficulty(state), self.counter, word))
+
+    def difficulty(self, state: CardState) -> float:
+        """
+        Orders words that are due at the same time; lower comes first.
+        """
+        return 0
+
+    def next_word(self) -> Optional[Word]:
+        if self.current is not None:
+            heapq.heappush(self.heap, self.current)
+        if not self.heap:
+            return None
+        entry = heapq.heappop(self.heap)
+        if entry[3] is self.last and self.heap:
+            entry = heapq.heapreplace(self.heap, entry)
+        self.current = entry
+        self.last = entry[3]
+        return entry[3]
+
+    def answer(self, word: Word, correct: bool) -> None:
+        self.current = None
+        self.step += 1
+        state = self.states[id(word)]
+        if self.update(state, correct):
+            state.mastered = True
+            self.mastered += 1
+            return
+        state.due = self.step + state.interval
+        self.push(word)
+
+    def state(self, word: Word) -> tuple:
+        state = self.states[id(word)]
+        return (0, state.box, state.easiness, state.repetitions, state.interval, max(0, state.due - self.step),
+                state.mastered)
+
+    def update(self, state: CardState, correct: bool) -> bool:
+        """
+        Updates the state after an answer.
+
+        :return: True if the word is now mastered.
+        """
+        raise NotImplementedError
+
+
+class LeitnerScheduler(QueueScheduler):
+    """
+    Leitner boxes: a correct answer moves the word up one box, a wrong one back to the
+    first. Box n is asked again after 2**n questions; words in the upper boxes are asked
+    from their definition, and a correct answer in the last box masters the word.
+    """
+
+    name = "Leitner"
+
+    BOXES = 5
+
+    def update(self, state: CardState, correct: bool) -> bool:
+        if not correct:
+            state.box = 0
+        elif state.box == self.BOXES - 1:
+            return True
+        else:
+            state.box += 1
+        state.interval = 2 ** state.box
+        return False
+
+    def difficulty(self, state: CardState) -> float:
+        return state.box
+
+    def is_reversed(self, word: Word) -> bool:
+        return self.states[id(word)].box >= self.BOXES // 2
+
+
+class SM2Scheduler(QueueScheduler):
+    """
+    SuperMemo 2: every word has an easiness factor that shrinks with wrong answers and
+    stretches the interval after each correct one. Harder words come first among those
+    due together; a word is mastered after MASTERED correct answers in a row.
+    """
+
+    name = "SM-2"
+
+    MASTERED = 4
+    CORRECT_QUALITY = 4
+    WRONG_QUALITY = 1
+
+    def update(self, state: CardState, correct: bool) -> bool:
+        quality = self.CORRECT_QUALITY if correct else self.WRONG_QUALITY
+        if correct:
+            state.repetitions += 1
+            if state.repetitions == 1:
+                state.interval = 1
+            elif state.repetitions == 2:
+                state.interval = 6
+            else:
+                state.interval = round(state.interval * state.easiness)
+        else:
+            state.repetitions = 0
+            state.interval = 1
+        state.easiness = max(1.3, state.easiness + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        return state.repetitions >= self.MASTERED
+
+    def difficulty(self, state: CardState) -> float:
+        return state.easiness
+
+    def is_reversed(self, word: Word) -> bool:
+        return self.states[id(word)].repetitions % 2 == 1
+
+
+SCHEDULERS = {scheduler.name: scheduler for scheduler in (ClassicScheduler, LeitnerScheduler, SM2Scheduler)}
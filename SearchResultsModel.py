@@ -0,0 +1,40 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from Word import Word
+
+
+class SearchResultsModel(QAbstractTableModel):
+    """
+    Table model over the results of Database.search, replaced as a whole for each query.
+    """
+
+    HEADERS = ["List", "Term", "Definition"]
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.results: list[tuple[int, str, Word]] = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.results)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return None
+        _, title, word = self.results[index.row()]
+        return (title, word.term, word.definition)[index.column()]
+
+    def set_results(self, results: list[tuple[int, str, Word]]) -> None:
+        self.beginResetModel()
+        self.results = results
+        self.endResetModel()
+
+    def list_id(self, row: int) -> int:
+        return self.results[row][0]
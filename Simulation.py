@@ -0,0 +1,178 @@
+import argparse
+import inspect
+import math
+import random
+import statistics
+import time
+
+from Scheduler import SCHEDULERS, Scheduler
+from StudySession import StudySession
+from Word import Word
+
+try:
+    import numpy
+except ImportError:  # the simulation falls back to the random module
+    numpy = None
+
+# Memory model: a learner recalls a word with probability exp(-elapsed / stability), where
+# elapsed counts the questions since the word was last shown. Stability starts at
+# BASE_STABILITY * ability / difficulty, is multiplied by GROWTH after a correct answer and
+# by LAPSE after a wrong one, but never drops below its starting value because the correct
+# answer is shown either way. A word that was never shown is guessed with probability GUESS.
+BASE_STABILITY = 15.0
+GROWTH = 2.5
+LAPSE = 0.6
+GUESS = 0.05
+MAX_QUESTIONS_PER_WORD = 50
+
+
+class SimulationResult:
+    """
+    Aggregated outcome of all simulated learners of one scheduler.
+    """
+
+    def __init__(self, scheduler: str) -> None:
+        self.scheduler = scheduler
+        self.learners = 0
+        self.finished = 0
+        self.questions: list[int] = []  # per learner that mastered the deck
+        self.correct = 0
+        self.answered = 0
+        self.engine_seconds = 0.0
+
+    def summary(self) -> str:
+        questions = sorted(self.questions)
+        median = statistics.median(questions) if questions else 0
+        p90 = questions[int(len(questions) * 0.9)] if questions else 0
+        mean = statistics.fmean(questions) if questions else 0
+        return (f"{self.scheduler:>8} {self.learners:>9} {self.finished / max(1, self.learners):>9.1%} "
+                f"{mean:>9.1f} {median:>8.0f} {p90:>6} {self.correct / max(1, self.answered):>9.1%} "
+                f"{self.engine_seconds / max(1, self.answered) * 1e6:>12.2f}")
+
+
+def make_deck(word_count: int) -> list[Word]:
+    words = []
+    for index in range(word_count):
+        word = Word(f"term {index}", f"definition {index}")
+        word.id = index
+        words.append(word)
+    return words
+
+
+def simulate_batch(scheduler_class: type[Scheduler], learners: int, word_count: int,
+                   result: SimulationResult, seed: int) -> None:
+    """
+    Runs a batch of learners in lockstep: one question per learner per round. The sessions
+    pick questions in Python; the memory model is evaluated for the whole batch at once
+    with NumPy when it is installed.
+
+    :param scheduler_class: The scheduler under test.
+    :param learners: The number of learners in the batch.
+    :param word_count: The size of every learner's deck.
+    :param result: Receives the outcome.
+    :param seed: Seeds the learners, the words and the sessions.
+    """
+    rng = random.Random(seed)
+    seeded = "rng" in inspect.signature(scheduler_class).parameters
+    sessions = [StudySession(make_deck(word_count), scheduler_class,
+                             **({"rng": random.Random(rng.random())} if seeded else {}))
+                for _ in range(learners)]
+    if numpy is not None:
+        generator = numpy.random.default_rng(seed)
+        ability = generator.lognormal(0.0, 0.3, size=(learners, 1))
+        difficulty = generator.lognormal(0.0, 0.4, size=(1, word_count))
+        initial = BASE_STABILITY * ability / difficulty
+        stability = initial.copy()
+        last_seen = numpy.full((learners, word_count), -1, dtype=numpy.int64)
+    else:
+        ability = [rng.lognormvariate(0.0, 0.3) for _ in range(learners)]
+        difficulty = [rng.lognormvariate(0.0, 0.4) for _ in range(word_count)]
+        initial = [[BASE_STABILITY * a / d for d in difficulty] for a in ability]
+        stability = [row.copy() for row in initial]
+        last_seen = [[-1] * word_count for _ in range(learners)]
+
+    active = list(range(learners))
+    questions = [0] * learners
+    limit = MAX_QUESTIONS_PER_WORD * word_count
+    step = 0
+    while active:
+        start = time.perf_counter()
+        asked, words = [], []
+        for learner in active:
+            question = sessions[learner].next_question()
+            if question is None:
+                result.finished += 1
+                result.questions.append(questions[learner])
+            elif questions[learner] < limit:
+                asked.append(learner)
+                words.append(question.word.id)
+        result.engine_seconds += time.perf_counter() - start
+        if not asked:
+            break
+
+        if numpy is not None:
+            rows, columns = numpy.array(asked), numpy.array(words)
+            seen = last_seen[rows, columns]
+            elapsed = step - seen
+            recall = numpy.where(seen >= 0, numpy.exp(-elapsed / stability[rows, columns]), GUESS)
+            correct = generator.random(len(asked)) < recall
+            stability[rows, columns] = numpy.where(correct, stability[rows, columns] * GROWTH,
+                                                   numpy.maximum(initial[rows, columns], stability[rows, columns] * LAPSE))
+            last_seen[rows, columns] = step
+            correct = correct.tolist()
+        else:
+            correct = []
+            for learner, word in zip(asked, words):
+                seen = last_seen[learner][word]
+                recall = math.exp(-(step - seen) / stability[learner][word]) if seen >= 0 else GUESS
+                correct.append(rng.random() < recall)
+                if correct[-1]:
+                    stability[learner][word] *= GROWTH
+                else:
+                    stability[learner][word] = max(initial[learner][word], stability[learner][word] * LAPSE)
+                last_seen[learner][word] = step
+
+        start = time.perf_counter()
+        for learner, answer in zip(asked, correct):
+            sessions[learner].answer(answer)
+            questions[learner] += 1
+        result.engine_seconds += time.perf_counter() - start
+        result.answered += len(asked)
+        result.correct += sum(correct)
+        active = asked
+        step += 1
+    result.learners += learners
+
+
+def simulate(scheduler_class: type[Scheduler], learners: int, word_count: int, batch_size: int = 1000,
+             seed: int = 0) -> SimulationResult:
+    """
+    Simulates learners studying a deck until they master it, in batches of batch_size so
+    memory stays bounded however many learners there are.
+
+    :param scheduler_class: The scheduler under test.
+    :param learners: The total number of learners.
+    :param word_count: The number of words in the deck.
+    :param batch_size: The number of learners simulated together.
+    :param seed: The random seed; equal seeds give equal results.
+    :return: The aggregated outcome.
+    """
+    result = SimulationResult(scheduler_class.name)
+    for batch, first in enumerate(range(0, learners, batch_size)):
+        simulate_batch(scheduler_class, min(batch_size, learners - first), word_count, result, seed + batch)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate learners to compare the schedulers.")
+    parser.add_argument("--learners", type=int, default=10_000)
+    parser.add_argument("--words", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=1_000)
+    parser.add_argument("--scheduler", choices=list(SCHEDULERS), nargs="+", default=list(SCHEDULERS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(f"{args.learners} learners, {args.words} words each, {'NumPy' if numpy else 'pure Python'} memory model")
+    print(f"{'schedule':>8} {'learners':>9} {'mastered':>9} {'mean q':>9} {'median':>8} {'p90':>6} "
+          f"{'correct':>9} {'us/question':>12}")
+    for name in args.scheduler:
+        print(simulate(SCHEDULERS[name], args.learners, args.words, args.batch, args.seed).summary())
@@ -0,0 +1,105 @@
+from typing import NamedTuple, Optional
+
+from AnswerMatcher import AnswerMatcher
+from ReviewLog import ReviewLog
+from Scheduler import ClassicScheduler, Scheduler
+from Word import Word
+
+
+class Question(NamedTuple):
+    word: Word
+    prompt: str
+    answer: str
+    reversed: bool  # asked from the definition, answered with the term
+
+
+class StudySession:
+    """
+    The learning logic without any UI: asks the scheduler for questions, checks typed
+    answers, records results in the review log and keeps the session statistics.
+    LearningMode drives one of these; the simulation drives thousands.
+    """
+
+    def __init__(self, words: list[Word], scheduler_class: type[Scheduler] = ClassicScheduler,
+                 progress: Optional[dict[int, tuple]] = None, review_log: Optional[ReviewLog] = None,
+                 **scheduler_options) -> None:
+        """
+        Initializes a session and starts it.
+
+        :param words: The words to learn.
+        :param scheduler_class: Decides the order of the questions and when a word is mastered.
+        :param progress: Saved states by word id; only used by the first run of the session.
+        :param review_log: Receives every answer, or None to keep nothing.
+        :param scheduler_options: Extra arguments for the scheduler, e.g. rng.
+        """
+        self.words = words.copy()
+        self.scheduler_class = scheduler_class
+        self.scheduler_options = scheduler_options
+        self.review_log = review_log
+        self.progress = progress
+        self.matchers: dict[str, AnswerMatcher] = {}
+        self.scheduler: Optional[Scheduler] = None
+        self.current: Optional[Question] = None
+        self.correct_answers = 0
+        self.total_questions = 0
+        self.restart()
+
+    def restart(self) -> None:
+        """
+        Starts over with fresh statistics, continuing from the saved progress the first time.
+        """
+        self.correct_answers = 0
+        self.total_questions = 0
+        self.current = None
+        self.scheduler = self.scheduler_class(self.words, self.progress, **self.scheduler_options)
+        self.progress = None
+
+    @property
+    def accuracy(self) -> float:
+        return self.correct_answers / self.total_questions if self.total_questions else 0.0
+
+    def next_question(self) -> Optional[Question]:
+        """
+        Picks the next question.
+
+        :return: The question, or None when every word is mastered.
+        """
+        word = self.scheduler.next_word()
+        if word is None:
+            self.current = None
+            return None
+        if self.scheduler.is_reversed(word):
+            self.current = Question(word, f"What is the term for: {word.definition}", word.term, True)
+        else:
+            self.current = Question(word, f"Define: {word.term}", word.definition, False)
+        self.total_questions += 1
+        return self.current
+
+    def check(self, answer: str) -> bool:
+        """
+        Checks a typed answer to the current question without recording it.
+
+        :param answer: The answer given by the user.
+        :return: True if it is accepted.
+        """
+        matcher = self.matchers.get(self.current.answer)
+        if matcher is None:
+            matcher = self.matchers[self.current.answer] = AnswerMatcher(self.current.answer)
+        return matcher.matches(answer)
+
+    def answer(self, correct: bool) -> None:
+        """
+        Records the result of the current question.
+
+        :param correct: Whether it counts as answered correctly.
+        """
+        word = self.current.word
+        if correct:
+            self.correct_answers += 1
+        self.scheduler.answer(word, correct)
+        if self.review_log is not None and word.id is not None:
+            self.review_log.record(word.id, self.scheduler.name, correct, self.scheduler.state(word))
+
+    def flush(self) -> None:
+        if self.review_log is not None:
+            self.review_log.flush()
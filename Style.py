@@ -1,55 +1,108 @@
-from PyQt6.QtGui import QIcon
-
-
-def setColours(object):
-    object.setWindowIcon(QIcon("icon.png"))
-    object.setStyleSheet("""
-                                QWidget {
-                                    font-size: 14px;
-                                }
-
-                                QMainWindow {
-                                    background-color: #f0f0f0;
-                                }
-
-                                QTreeWidget {
-                                    background-color: #ffffff;
-                                    border: 1px solid #c0c0c0;
-                                    border-radius: 4px;
-                                    font-size: 14px;
-                                }
-
-                                QPushButton {
-                                    background-color: #007bff;
-                                    color: #ffffff;
-                                    border: none;
-                                    padding: 8px 16px;
-                                    border-radius: 4px;
-                                    font-size: 14px;
-                                }
-
-                                QPushButton:hover {
-                                    background-color: #0056b3;
-                                }
-
-                                QLineEdit {
-                                    border: 1px solid #c0c0c0;
-                                    border-radius: 4px;
-                                    padding: 4px;
-                                }
-
-                                QLabel {
-                                    font-size: 16px;
-                                    font-weight: bold;
-                                }
-
-                                QPushButton#editButton {
-                                    background-color: none;
-                                    color: none;
-                                    border: none;
-                                }
-
-                                QPushButton#editButton:hover {
-                                    background-color: #007bff;
-                                }
-                            """)
+import os
+from functools import lru_cache
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QGuiApplication, QIcon, QPixmap
+
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STYLESHEET = """
+QWidget {
+    font-size: 14px;
+}
+
+QMainWindow {
+    background-color: #f0f0f0;
+}
+
+QTreeView {
+    background-color: #ffffff;
+    border: 1px solid #c0c0c0;
+    border-radius: 4px;
+    font-size: 14px;
+}
+
+QPushButton {
+    background-color: #007bff;
+    color: #ffffff;
+    border: none;
+    padding: 8px 16px;
+    border-radius: 4px;
+    font-size: 14px;
+}
+
+QPushButton:hover {
+    background-color: #0056b3;
+}
+
+QLineEdit {
+    border: 1px solid #c0c0c0;
+    border-radius: 4px;
+    padding: 4px;
+}
+
+QLabel {
+    font-size: 16px;
+    font-weight: bold;
+}
+
+QPushButton#editButton {
+    background-color: none;
+    color: none;
+    border: none;
+}
+
+QPushButton#editButton:hover {
+    background-color: #007bff;
+}
+"""
+
+
+def asset_path(name: str) -> str:
+    """
+    Resolves an asset shipped next to the modules, whatever the working directory is.
+
+    :param name: The file name, e.g. "icon.png".
+    :return: The absolute path.
+    """
+    return os.path.join(ASSET_DIR, name)
+
+
+@lru_cache(maxsize=None)
+def pixmap(name: str, size: int) -> QPixmap:
+    """
+    Loads an image once, scaled to size x size logical pixels for the screen's pixel ratio.
+
+    :param name: The file name of the asset.
+    :param size: The display size in logical pixels.
+    :return: The shared, pre-scaled pixmap.
+    """
+    ratio = QGuiApplication.instance().devicePixelRatio()
+    scaled = QPixmap(asset_path(name)).scaled(round(size * ratio), round(size * ratio),
+                                              Qt.AspectRatioMode.KeepAspectRatio,
+                                              Qt.TransformationMode.SmoothTransformation)
+    scaled.setDevicePixelRatio(ratio)
+    return scaled
+
+
+@lru_cache(maxsize=None)
+def icon(name: str, size: int = 0) -> QIcon:
+    """
+    Returns a shared icon, pre-scaled when a display size is given.
+
+    :param name: The file name of the asset.
+    :param size: The display size in logical pixels, or 0 to keep the original image.
+    :return: The shared icon.
+    """
+    return QIcon(pixmap(name, size)) if size else QIcon(asset_path(name))
+
+
+def apply_style(app) -> None:
+    """
+    Sets the stylesheet and window icon once for the whole application; every window and
+    dialog inherits them.
+
+    :param app: The QApplication.
+    """
+    app.setStyleSheet(STYLESHEET)
+    app.setWindowIcon(icon("icon.png"))
@@ -3,6 +3,8 @@ class Word:
     Represents a word with its definition, selection status, and notes.
     """
 
+    __slots__ = ("id", "_term", "_definition", "_selected", "_notes", "result", "dirty")
+
     def __init__(self, term: str, definition: str, notes: str = "", selected: bool = False) -> None:
         """
         Initializes a new instance of the Word class.
@@ -17,7 +19,8 @@ class Word:
         self._definition = definition
         self._selected = selected
         self._notes = notes
-        self.result = 0  # not saved to the database
+        self.result = 0  # saved per scheduler through the review log, not with the word
+        self.dirty = False  # changed since it was last written to the database
 
     @property
     def term(self) -> str:
@@ -36,6 +39,7 @@ class Word:
         :param term: The new term.
         """
         self._term = term
+        self.dirty = True
 
     @property
     def definition(self) -> str:
@@ -54,6 +58,7 @@ class Word:
         :param definition: The new definition.
         """
         self._definition = definition
+        self.dirty = True
 
     @property
     def selected(self) -> bool:
@@ -72,6 +77,7 @@ class Word:
         :param selected: The new selection status.
         """
         self._selected = selected
+        self.dirty = True
 
     @property
     def notes(self) -> str:
@@ -90,3 +96,4 @@ class Word:
         :param notes: The new notes.
         """
         self._notes = notes
+        self.dirty = True
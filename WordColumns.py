@@ -0,0 +1,346 @@
+from array import array
+from typing import Iterable, Iterator, List, Union
+
+from Word import Word
+
+
+class Bitmap:
+    """
+    A growable array of booleans packed eight to a byte.
+    """
+
+    __slots__ = ("bits", "length")
+
+    def __init__(self, length: int = 0, set_bits: Iterable[int] = ()) -> None:
+        """
+        Initializes a bitmap.
+
+        :param length: The number of booleans, all False unless listed in set_bits.
+        :param set_bits: The indices that are True.
+        """
+        self.bits = bytearray((length + 7) // 8)
+        self.length = length
+        for index in set_bits:
+            self.bits[index >> 3] |= 1 << (index & 7)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: int) -> bool:
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def __setitem__(self, index: int, value: bool) -> None:
+        if value:
+            self.bits[index >> 3] |= 1 << (index & 7)
+        else:
+            self.bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+    def append(self, value: bool) -> None:
+        if self.length & 7 == 0:
+            self.bits.append(0)
+        self.length += 1
+        self[self.length - 1] = value
+
+    def __delitem__(self, index: int) -> None:
+        # Shifts every later bit down by one, as one big-integer operation.
+        value = int.from_bytes(self.bits, "little")
+        value = (value & ((1 << index) - 1)) | ((value >> (index + 1)) << index)
+        self.length -= 1
+        self.bits = bytearray(value.to_bytes((self.length + 7) // 8, "little"))
+
+    def count(self) -> int:
+        return int.from_bytes(self.bits, "little").bit_count()
+
+    def clone(self) -> "Bitmap":
+        bitmap = Bitmap()
+        bitmap.bits = bytearray(self.bits)
+        bitmap.length = self.length
+        return bitmap
+
+
+class TextColumn:
+    """
+    A list of strings stored back to back as UTF-8 in one buffer, with the end offset of
+    each. Appending and reading are cheap; replacing or deleting a string moves everything
+    after it, which is fine for the occasional edit. The offsets are kept per block of
+    BLOCK_SIZE strings, relative to a base offset of the block, so that an edit updates
+    the rest of one block and the later bases instead of every later offset.
+    """
+
+    __slots__ = ("data", "ends", "bases")
+
+    BLOCK_BITS = 10
+    BLOCK_SIZE = 1 << BLOCK_BITS
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.ends = array("q")
+        self.bases = array("q")
+
+    def __len__(self) -> int:
+        return len(self.ends)
+
+    def end(self, index: int) -> int:
+        return self.bases[index >> self.BLOCK_BITS] + self.ends[index]
+
+    def bounds(self, index: int) -> tuple[int, int]:
+        return (self.end(index - 1) if index else 0), self.end(index)
+
+    def __getitem__(self, index: int) -> str:
+        start, end = self.bounds(index)
+        return self.data[start:end].decode("utf-8")
+
+    def append(self, text: str) -> None:
+        if not len(self.ends) & (self.BLOCK_SIZE - 1):
+            self.bases.append(len(self.data))
+        self.data += text.encode("utf-8")
+        self.ends.append(len(self.data) - self.bases[-1])
+
+    def __setitem__(self, index: int, text: str) -> None:
+        start, end = self.bounds(index)
+        encoded = text.encode("utf-8")
+        self.data[start:end] = encoded
+        self.shift(index, len(encoded) - (end - start))
+
+    def __delitem__(self, index: int) -> None:
+        start, end = self.bounds(index)
+        del self.data[start:end]
+        ends, bases = self.ends, self.bases
+        del ends[index]
+        # The first string of every later block moved down into the block before it.
+        for block in range((index >> self.BLOCK_BITS) + 1, len(bases)):
+            last = (block << self.BLOCK_BITS) - 1
+            if last < len(ends):
+                ends[last] += bases[block] - bases[block - 1]
+        if len(bases) > (len(ends) + self.BLOCK_SIZE - 1) >> self.BLOCK_BITS:
+            bases.pop()
+        self.shift(index, start - end)
+
+    def clone(self) -> "TextColumn":
+        column = TextColumn()
+        column.data = bytearray(self.data)
+        column.ends = array("q", self.ends)
+        column.bases = array("q", self.bases)
+        return column
+
+    def nbytes(self) -> int:
+        return len(self.data) + self.ends.itemsize * (len(self.ends) + len(self.bases))
+
+    def shift(self, first: int, delta: int) -> None:
+        # Moves the end offsets from first onwards by delta: the rest of its block one by
+        # one, the later blocks through their bases.
+        if delta:
+            ends, bases = self.ends, self.bases
+            block = first >> self.BLOCK_BITS
+            for position in range(first, min(len(ends), (block + 1) << self.BLOCK_BITS)):
+                ends[position] += delta
+            for position in range(block + 1, len(bases)):
+                bases[position] += delta
+
+
+class WordView:
+    """
+    A Word-compatible handle on one row of a WordColumns store. Reads and writes go
+    straight to the columns, so a view holds nothing but its store and row.
+    """
+
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self, columns: "WordColumns", index: int) -> None:
+        self._columns = columns
+        self._index = index
+
+    @property
+    def id(self):
+        word_id = self._columns.ids[self._index]
+        return word_id if word_id >= 0 else None
+
+    @id.setter
+    def id(self, word_id) -> None:
+        self._columns.ids[self._index] = -1 if word_id is None else word_id
+
+    @property
+    def term(self) -> str:
+        return self._columns.terms[self._index]
+
+    @term.setter
+    def term(self, term: str) -> None:
+        self._columns.terms[self._index] = term
+        self.dirty = True
+
+    @property
+    def definition(self) -> str:
+        return self._columns.definitions[self._index]
+
+    @definition.setter
+    def definition(self, definition: str) -> None:
+        self._columns.definitions[self._index] = definition
+        self.dirty = True
+
+    @property
+    def notes(self) -> str:
+        return self._columns.notes[self._index]
+
+    @notes.setter
+    def notes(self, notes: str) -> None:
+        self._columns.notes[self._index] = notes or ""
+        self.dirty = True
+
+    @property
+    def selected(self) -> bool:
+        return self._columns.selected[self._index]
+
+    @selected.setter
+    def selected(self, selected: bool) -> None:
+        self._columns.selected[self._index] = selected
+        self.dirty = True
+
+    @property
+    def result(self) -> int:
+        return self._columns.results[self._index]
+
+    @result.setter
+    def result(self, result: int) -> None:
+        self._columns.results[self._index] = result
+
+    @property
+    def dirty(self) -> bool:
+        return self._columns.dirty[self._index]
+
+    @dirty.setter
+    def dirty(self, dirty: bool) -> None:
+        self._columns.dirty[self._index] = dirty
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, WordView) and other._columns is self._columns
+                and other._index == self._index)
+
+    def __hash__(self) -> int:
+        return hash((id(self._columns), self._index))
+
+
+class WordColumns:
+    """
+    Column-oriented storage for the words of a list: ids and results in typed arrays, the
+    texts in packed UTF-8 columns and the selected and dirty flags in packed bitmaps, so a
+    word costs a few dozen bytes instead of an object and three strings. It behaves like a
+    list of words, handing out WordView objects on demand; views address rows by position,
+    so they must not be kept across deletions.
+    """
+
+    __slots__ = ("ids", "terms", "definitions", "notes", "selected", "results", "dirty")
+
+    def __init__(self, words: Iterable[Word] = ()) -> None:
+        """
+        Initializes a store, copying the given words into it.
+
+        :param words: Word objects (or views) to copy.
+        """
+        self.ids = array("q")
+        self.terms = TextColumn()
+        self.definitions = TextColumn()
+        self.notes = TextColumn()
+        self.selected = Bitmap()
+        self.results = array("b")
+        self.dirty = Bitmap()
+        for word in words:
+            self.append(word)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> "WordColumns":
+        """
+        Builds a store straight from database rows, without creating Word objects.
+
+        :param rows: (id, selected, term, definition, notes) tuples.
+        :return: The new store.
+        """
+        columns = cls()
+        ids, terms, definitions, notes = columns.ids, columns.terms, columns.definitions, columns.notes
+        selected = []
+        for index, (word_id, is_selected, term, definition, note) in enumerate(rows):
+            ids.append(word_id)
+            terms.append(term)
+            definitions.append(definition)
+            notes.append(note or "")
+            if is_selected:
+                selected.append(index)
+        columns.results = array("b", bytes(len(ids)))
+        columns.selected = Bitmap(len(ids), selected)
+        columns.dirty = Bitmap(len(ids))
+        return columns
+
+    def add(self, word_id, selected: bool, term: str, definition: str, notes: str, result: int = 0) -> None:
+        self.ids.append(-1 if word_id is None else word_id)
+        self.terms.append(term)
+        self.definitions.append(definition)
+        self.notes.append(notes or "")  # NULL in the database
+        self.selected.append(selected)
+        self.results.append(result)
+        self.dirty.append(False)
+
+    def append(self, word: Word) -> None:
+        self.add(word.id, word.selected, word.term, word.definition, word.notes, word.result)
+
+    def extend(self, words: Iterable[Word]) -> None:
+        for word in words:
+            self.append(word)
+
+    def set_row(self, index: int, selected: bool, term: str, definition: str, notes: str) -> None:
+        # Overwrites a row without marking it dirty; unchanged texts are left in place.
+        for column, text in ((self.terms, term), (self.definitions, definition), (self.notes, notes or "")):
+            if column[index] != text:
+                column[index] = text
+        self.selected[index] = selected
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [WordView(self, position) for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("word index out of range")
+        return WordView(self, index)
+
+    def __delitem__(self, index: int) -> None:
+        if index < 0:
+            index += len(self)
+        for column in (self.ids, self.terms, self.definitions, self.notes, self.results):
+            del column[index]
+        del self.selected[index]
+        del self.dirty[index]
+
+    def __iter__(self) -> Iterator[WordView]:
+        for index in range(len(self)):
+            yield WordView(self, index)
+
+    def copy(self) -> List[WordView]:
+        # Like list.copy(): a list of the same words, here one view per row.
+        return list(self)
+
+    def selected_count(self) -> int:
+        return self.selected.count()
+
+    def clone(self) -> "WordColumns":
+        """
+        Copies the store; the copy shares nothing with it, so either can be changed (or
+        used on another thread) without affecting the other.
+
+        :return: The new store.
+        """
+        columns = WordColumns()
+        columns.ids = array("q", self.ids)
+        columns.terms = self.terms.clone()
+        columns.definitions = self.definitions.clone()
+        columns.notes = self.notes.clone()
+        columns.selected = self.selected.clone()
+        columns.results = array("b", self.results)
+        columns.dirty = self.dirty.clone()
+        return columns
+
+    def nbytes(self) -> int:
+        # The memory held by the columns themselves, a few hundred bytes of objects aside.
+        return (self.ids.itemsize * len(self.ids) + self.terms.nbytes() + self.definitions.nbytes()
+                + self.notes.nbytes() + len(self.selected.bits) + len(self.results) + len(self.dirty.bits))
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Callable, List
 
 import Word
 
@@ -7,6 +7,8 @@ class WordList:
     Represents a list of words with a title.
     """
 
+    __slots__ = ("id", "_title", "_words", "_listeners")
+
     def __init__(self, title: str, words: List[Word], id = None) -> None:
         """
         Initializes a new instance of the WordList class.
@@ -17,6 +19,7 @@ class WordList:
         self.id = id
         self._title = title
         self._words = words
+        self._listeners: List[Callable[["WordList"], None]] = []
 
     @property
     def title(self) -> str:
@@ -35,6 +38,7 @@ class WordList:
         :param title: The new title.
         """
         self._title = title
+        self.notify()
 
     @property
     def words(self) -> List[Word]:
@@ -52,4 +56,27 @@ class WordList:
 
         :param words: The new list of Word objects.
         """
-        self._words = words
\ No newline at end of file
+        self._words = words
+
+    def add_listener(self, listener: Callable[["WordList"], None]) -> None:
+        """
+        Registers a callback invoked with this list whenever its title changes.
+
+        :param listener: The callback.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[["WordList"], None]) -> None:
+        """
+        Unregisters a callback added with add_listener.
+
+        :param listener: The callback.
+        """
+        self._listeners.remove(listener)
+
+    def notify(self) -> None:
+        """
+        Tells every listener that this list changed.
+        """
+        for listener in self._listeners:
+            listener(self)
@@ -0,0 +1,174 @@
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+from WordColumns import WordColumns
+from WordList import WordList
+
+MAX_WORDS = 500_000
+MAX_BYTES = 64 << 20
+
+Row = Tuple[int, bool, str, str, str]  # (id, selected, term, definition, notes)
+
+
+class WordListCache:
+    """
+    The most recently used word lists, with their words in WordColumns stores, up to a
+    budget of words and of bytes; when it is exceeded the least recently used lists are
+    evicted. Database reports every write to it (write-through): single words added,
+    changed or deleted are applied to the cached store, and bulk changes drop the list so
+    that it is loaded again on next use. Like the connection, it belongs to the thread that
+    runs the Database.
+    """
+
+    def __init__(self, db, max_words: int = MAX_WORDS, max_bytes: int = MAX_BYTES) -> None:
+        """
+        Initializes an empty cache.
+
+        :param db: The Database the lists are loaded from.
+        :param max_words: The most words held over all cached lists.
+        :param max_bytes: The most bytes of word storage held over all cached lists.
+        """
+        self.db = db
+        self.max_words = max_words
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[int, WordList] = OrderedDict()  # least recently used first
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.oversized = 0  # lists larger than the whole budget, returned without caching
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, list_id: int) -> bool:
+        return list_id in self.entries
+
+    @property
+    def word_count(self) -> int:
+        return sum(len(word_list.words) for word_list in self.entries.values())
+
+    @property
+    def byte_size(self) -> int:
+        return sum(word_list.words.nbytes() for word_list in self.entries.values())
+
+    def get(self, list_id: int) -> Optional[WordList]:
+        """
+        Returns a word list with all its words, loading it on a miss.
+
+        :param list_id: The id of the word list.
+        :return: The cached list, or None if there is no such list. Its words must not be
+                 changed by the caller; clone them first.
+        """
+        self.db.detect_changes()  # drops lists another instance changed
+        word_list = self.entries.get(list_id)
+        if word_list is not None:
+            self.hits += 1
+            self.entries.move_to_end(list_id)
+            return word_list
+        self.misses += 1
+        word_list = self.db.load_word_list(list_id, columnar=True)
+        if word_list is None:
+            return None
+        if len(word_list.words) > self.max_words or word_list.words.nbytes() > self.max_bytes:
+            self.oversized += 1
+            return word_list
+        self.entries[list_id] = word_list
+        self.evict()
+        return word_list
+
+    def copy_words(self, list_id: int, selected_only: bool = False) -> Optional[WordColumns]:
+        """
+        Returns a private copy of a list's words, safe to hand to another thread.
+
+        :param list_id: The id of the word list.
+        :param selected_only: Copy only the selected words.
+        :return: The copy, or None if there is no such list.
+        """
+        word_list = self.get(list_id)
+        if word_list is None:
+            return None
+        if selected_only:
+            return WordColumns(word for word in word_list.words if word.selected)
+        return word_list.words.clone()
+
+    def evict(self) -> None:
+        # Drops the least recently used lists until the cache is within budget again.
+        words, size = self.word_count, self.byte_size
+        while self.entries and (words > self.max_words or size > self.max_bytes):
+            _, word_list = self.entries.popitem(last=False)
+            words -= len(word_list.words)
+            size -= word_list.words.nbytes()
+            self.evictions += 1
+
+    def invalidate(self, list_id: int) -> None:
+        """
+        Drops a list, e.g. after a bulk change to its words.
+
+        :param list_id: The id of the word list.
+        """
+        if self.entries.pop(list_id, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self.invalidations += len(self.entries)
+        self.entries.clear()
+
+    def retitle(self, list_id: int, title: str) -> None:
+        word_list = self.entries.get(list_id)
+        if word_list is not None:
+            word_list.title = title
+
+    def word_added(self, list_id: int, row: Row) -> None:
+        """
+        Appends a new word to its cached list.
+
+        :param list_id: The id of the word list.
+        :param row: The word as stored.
+        """
+        word_list = self.entries.get(list_id)
+        if word_list is None:
+            return
+        words = word_list.words
+        if words.ids and words.ids[-1] > row[0]:
+            # Stores are kept in id order for locate; this only happens with reused ids.
+            self.invalidate(list_id)
+            return
+        words.add(*row)
+        self.evict()
+
+    def words_changed(self, rows: Iterable[Row]) -> None:
+        """
+        Applies changed words to the cached lists that hold them.
+
+        :param rows: The words as stored.
+        """
+        if not self.entries:
+            return
+        for word_id, selected, term, definition, notes in rows:
+            found = self.locate(word_id)
+            if found is not None:
+                found[0].set_row(found[1], selected, term, definition, notes)
+
+    def word_deleted(self, word_id: int) -> None:
+        found = self.locate(word_id)
+        if found is not None:
+            del found[0][found[1]]
+
+    def locate(self, word_id: int) -> Optional[Tuple[WordColumns, int]]:
+        # The store and row holding a word. Stores are in id order, so a binary search on
+        # each cached list finds it without asking the database for the word's list.
+        for word_list in self.entries.values():
+            ids = word_list.words.ids
+            index = bisect_left(ids, word_id)
+            if index < len(ids) and ids[index] == word_id:
+                return word_list.words, index
+        return None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"lists": len(self.entries), "words": self.word_count, "bytes": self.byte_size,
+                "max_words": self.max_words, "max_bytes": self.max_bytes, "hits": self.hits,
+                "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions, "invalidations": self.invalidations, "oversized": self.oversized}
@@ -0,0 +1,94 @@
+from typing import Optional
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from WordList import WordList
+
+TITLE_COLUMN, LIST_EDIT_COLUMN = range(2)
+
+
+class WordListsModel(QAbstractTableModel):
+    """
+    Table model over the word lists shown in the main window. Lists are inserted and
+    removed row by row, and a renamed list only refreshes its own row. Rows are found by
+    list id through a map that is only rebuilt when a lookup finds it stale, so removing
+    a row never renumbers the others.
+    """
+
+    HEADERS = ["Title", "Edit"]
+
+    def __init__(self, word_lists: list[WordList]) -> None:
+        super().__init__()
+        self.word_lists = word_lists
+        self.rows: dict[int, int] = {}  # list id -> row, valid unless stale
+        self.stale = True
+        for word_list in word_lists:
+            word_list.add_listener(self.list_changed)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.word_lists)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if index.isValid() and index.column() == TITLE_COLUMN and role == Qt.ItemDataRole.DisplayRole:
+            return self.word_lists[index.row()].title
+        return None
+
+    def word_list(self, row: int) -> WordList:
+        return self.word_lists[row]
+
+    def find(self, list_id: int) -> Optional[int]:
+        """
+        Returns the row of a list.
+
+        :param list_id: The database id of the list.
+        :return: The row, or None if the model does not show the list.
+        """
+        if self.stale:
+            self.rows = {word_list.id: row for row, word_list in enumerate(self.word_lists)}
+            # New lists get their id from a queued job; until then the map cannot hold them.
+            self.stale = None in self.rows
+        return self.rows.get(list_id)
+
+    def append(self, word_list: WordList) -> None:
+        self.beginInsertRows(QModelIndex(), len(self.word_lists), len(self.word_lists))
+        self.word_lists.append(word_list)
+        self.rows[word_list.id] = len(self.word_lists) - 1
+        self.stale = self.stale or word_list.id is None
+        self.endInsertRows()
+        word_list.add_listener(self.list_changed)
+
+    def extend(self, word_lists: list[WordList]) -> None:
+        if not word_lists:
+            return
+        start = len(self.word_lists)
+        self.beginInsertRows(QModelIndex(), start, start + len(word_lists) - 1)
+        self.word_lists.extend(word_lists)
+        for row, word_list in enumerate(word_lists, start):
+            self.rows[word_list.id] = row
+            self.stale = self.stale or word_list.id is None
+        self.endInsertRows()
+        for word_list in word_lists:
+            word_list.add_listener(self.list_changed)
+
+    def remove(self, row: int) -> None:
+        word_list = self.word_lists[row]
+        word_list.remove_listener(self.list_changed)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.word_lists[row]
+        self.stale = True
+        self.endRemoveRows()
+
+    def list_changed(self, word_list: WordList) -> None:
+        row = self.find(word_list.id) if word_list.id is not None else None
+        if row is None or self.word_lists[row] is not word_list:
+            row = self.word_lists.index(word_list)
+        index = self.index(row, TITLE_COLUMN)
+        self.dataChanged.emit(index, index)
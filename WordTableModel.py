@@ -0,0 +1,325 @@
+from bisect import bisect_left
+from typing import Optional
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, QRect, QSize, pyqtSignal
+from PyQt6.QtWidgets import QStyledItemDelegate
+
+from AsyncDatabase import AsyncDatabase
+from Database import contains_text, nocase
+from Style import icon
+from Word import Word
+from WordList import WordList
+from WriteBehind import WriteBehind
+
+PAGE_SIZE = 200
+
+SELECTED_COLUMN, TERM_COLUMN, DEFINITION_COLUMN, NOTES_COLUMN, EDIT_COLUMN = range(5)
+SORT_ORDERS = {TERM_COLUMN: 'term', DEFINITION_COLUMN: 'definition'}  # other columns keep the id order
+
+
+class WordTableModel(QAbstractTableModel):
+    """
+    Table model over the words of one list, fetched from the database a page at a time
+    as the view scrolls, so opening a list costs the same whatever its size. Sorting and
+    filtering are done by the database, which pages through its indexes in the requested
+    order. Pages and writes go through the database thread; rows change as soon as the
+    user edits them, and edits are written behind in coalesced batches. Edited words find
+    their row through a map of word ids, rebuilt only after rows were inserted or removed
+    in the middle.
+    """
+
+    HEADERS = ["Selected", "Term", "Definition", "Notes", "Edit"]
+
+    def __init__(self, word_list: WordList, db: AsyncDatabase, writes: WriteBehind,
+                 page_size: int = PAGE_SIZE) -> None:
+        super().__init__()
+        self.word_list = word_list
+        self.db = db
+        self.writes = writes
+        self.page_size = page_size
+        self.words: list[Word] = []
+        self.rows: dict[int, int] = {}  # word id -> row, valid unless stale
+        self.stale = False
+        self.exhausted = False
+        self.fetching = False
+        self.order = 'id'
+        self.descending = False
+        self.prefix = ''
+        self.selected_filter = None
+        self.generation = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.words)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted or self.fetching:
+            return
+        self.fetching = True
+        # The query is fixed now; sorting or filtering before it runs makes its page stale.
+        list_id, order, descending, selected, prefix = (self.word_list.id, self.order, self.descending,
+                                                        self.selected_filter, self.prefix)
+        after = (self.sort_value(self.words[-1]), self.words[-1].id) if self.words else None
+        generation = self.generation
+        self.db.submit(lambda db: db.query_words(list_id, order, descending, after, selected, prefix,
+                                                 self.page_size),
+                       callback=lambda page: self.page_loaded(generation, page),
+                       errback=lambda error: self.page_failed(generation))
+
+    def page_failed(self, generation: int) -> None:
+        # The error has been shown; stop paging rather than asking again on every scroll.
+        if generation == self.generation:
+            self.fetching = False
+            self.exhausted = True
+
+    def page_loaded(self, generation: int, page: list[Word]) -> None:
+        if generation != self.generation:
+            return
+        self.fetching = False
+        if len(page) < self.page_size:
+            self.exhausted = True
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self.words), len(self.words) + len(page) - 1)
+            self.rows.update((word.id, row) for row, word in enumerate(page, len(self.words)))
+            self.words.extend(page)
+            self.endInsertRows()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.order = SORT_ORDERS.get(column, 'id')
+        self.descending = order == Qt.SortOrder.DescendingOrder
+        self.restart()
+
+    def set_filter(self, prefix: str, selected=None) -> None:
+        """
+        Shows only the words whose term starts with prefix.
+
+        :param prefix: The start of the term, matched case-insensitively; "" shows every term.
+        :param selected: True or False to show only selected or unselected words, None for all.
+        """
+        self.prefix = prefix
+        self.selected_filter = selected
+        self.restart()
+
+    def restart(self) -> None:
+        # Drops the fetched rows and pages again from the start. Pending edits are written
+        # first so that the new pages include them.
+        self.writes.flush()
+        self.generation += 1
+        self.beginResetModel()
+        self.words = []
+        self.rows = {}
+        self.stale = False
+        self.exhausted = False
+        self.fetching = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def refresh(self) -> None:
+        # Re-reads the fetched rows after another instance changed the list, in one query,
+        # and updates only the rows that differ; pages in flight are dropped.
+        self.writes.flush()
+        self.generation += 1
+        self.fetching = False
+        generation = self.generation
+        list_id, order, descending, selected, prefix = (self.word_list.id, self.order, self.descending,
+                                                        self.selected_filter, self.prefix)
+        limit = max(len(self.words), self.page_size)
+        self.db.submit(lambda db: db.query_words(list_id, order, descending, None, selected, prefix, limit),
+                       callback=lambda fresh: self.rows_refreshed(generation, fresh, limit))
+
+    def rows_refreshed(self, generation: int, fresh: list[Word], limit: int) -> None:
+        if generation != self.generation:
+            return
+        self.exhausted = len(fresh) < limit
+        fresh_ids = {word.id for word in fresh}
+        for row in reversed(range(len(self.words))):
+            if self.words[row].id not in fresh_ids:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.words[row]
+                self.stale = True
+                self.endRemoveRows()
+        kept_ids = {word.id for word in self.words}
+        if [word.id for word in self.words] != [word.id for word in fresh if word.id in kept_ids]:
+            self.restart()  # a change moved rows within the sort order
+            return
+        for row, word in enumerate(fresh):
+            if row == len(self.words) or self.words[row].id != word.id:
+                self.beginInsertRows(QModelIndex(), row, row)
+                self.words.insert(row, word)
+                self.stale = True
+                self.endInsertRows()
+            elif word_fields(self.words[row]) != word_fields(word):
+                self.words[row] = word
+                self.dataChanged.emit(self.index(row, SELECTED_COLUMN), self.index(row, EDIT_COLUMN))
+
+    def sort_value(self, word: Word):
+        return word.id if self.order == 'id' else getattr(word, self.order)
+
+    def sort_key(self, word: Word) -> tuple:
+        # The order of the query: NOCASE on the sort column, then the id.
+        if self.order == 'id':
+            return (word.id,)
+        return nocase(self.sort_value(word)), word.id
+
+    def accepts(self, word: Word) -> bool:
+        return ((self.selected_filter is None or word.selected == self.selected_filter)
+                and nocase(word.term).startswith(nocase(self.prefix)))
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        word = self.words[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.CheckStateRole and column == SELECTED_COLUMN:
+            return Qt.CheckState.Checked if word.selected else Qt.CheckState.Unchecked
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            if column == TERM_COLUMN:
+                return word.term
+            if column == DEFINITION_COLUMN:
+                return word.definition
+            if column == NOTES_COLUMN:
+                return word.notes
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.CheckStateRole or index.column() != SELECTED_COLUMN:
+            return False
+        word = self.words[index.row()]
+        word.selected = Qt.CheckState(value) == Qt.CheckState.Checked
+        self.writes.mark(word)
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.column() == SELECTED_COLUMN:
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def word(self, row: int) -> Word:
+        return self.words[row]
+
+    def find(self, word_id: Optional[int]) -> Optional[int]:
+        """
+        Returns the row of a word.
+
+        :param word_id: The database id of the word.
+        :return: The row, or None if the word is not among the fetched rows.
+        """
+        if self.stale:
+            self.rows = {word.id: row for row, word in enumerate(self.words)}
+            self.stale = False
+        return self.rows.get(word_id) if word_id is not None else None
+
+    def add_word(self, word: Word) -> None:
+        word.dirty = False
+        self.db.submit(lambda db: setattr(word, 'id', db.add_word(self.word_list.id, word.selected, word.term,
+                                                                 word.definition, word.notes)),
+                       callback=lambda _: self.word_added(word))
+
+    def word_added(self, word: Word) -> None:
+        # A word sorting after the fetched rows arrives with a later page; one sorting among
+        # them is inserted in place, as the pages after it would skip it.
+        if not self.accepts(word):
+            return
+        # The rows are in sort order, so the first one the new word goes before is found by
+        # bisecting on whether it does.
+        key = self.sort_key(word)
+        if self.descending:
+            goes_before = lambda row: self.sort_key(self.words[row]) < key
+        else:
+            goes_before = lambda row: key < self.sort_key(self.words[row])
+        row = bisect_left(range(len(self.words)), True, key=goes_before)
+        if row < len(self.words) or self.exhausted:
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.words.insert(row, word)
+            self.rows[word.id] = row
+            self.stale = self.stale or row < len(self.words) - 1
+            self.endInsertRows()
+
+    def update_word(self, word: Word) -> None:
+        # The word is written whatever row it is in now: a refresh while it was being edited
+        # may have moved it, or replaced it by a fresh copy that the edit supersedes.
+        self.writes.mark(word)
+        row = self.find(word.id)
+        if row is None:
+            return
+        if self.words[row] is not word:
+            self.words[row] = word
+        self.dataChanged.emit(self.index(row, SELECTED_COLUMN), self.index(row, EDIT_COLUMN))
+
+    def remove_word(self, row: int) -> None:
+        word = self.words[row]
+        self.writes.discard(word)
+        self.db.submit(lambda db: db.delete_word(word.id))
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.words[row]
+        self.stale = True
+        self.endRemoveRows()
+
+    def select_all(self, selected: bool) -> None:
+        self.update_selection(lambda db: db.set_words_selected(self.word_list.id, selected), lambda word: selected)
+
+    def invert_selection(self) -> None:
+        self.update_selection(lambda db: db.invert_words_selected(self.word_list.id), lambda word: not word.selected)
+
+    def select_matching(self, text: str) -> None:
+        self.update_selection(lambda db: db.select_matching_words(self.word_list.id, text),
+                              lambda word: word.selected or contains_text(word.term, text)
+                              or contains_text(word.definition, text))
+
+    def update_selection(self, job, rule) -> None:
+        # One set-based UPDATE for the whole list; the fetched rows apply the same rule.
+        # Pending writes go first so that they cannot overwrite the bulk change.
+        self.writes.flush()
+        self.db.submit(job)
+        if self.selected_filter is not None:
+            self.restart()  # the change moves words in or out of the filter
+            return
+        for word in self.words:
+            word.selected = rule(word)
+            word.dirty = False
+        if self.words:
+            self.dataChanged.emit(self.index(0, SELECTED_COLUMN), self.index(len(self.words) - 1, SELECTED_COLUMN),
+                                  [Qt.ItemDataRole.CheckStateRole])
+
+
+def word_fields(word: Word) -> tuple:
+    return word.selected, word.term, word.definition, word.notes
+
+
+class EditButtonDelegate(QStyledItemDelegate):
+    """
+    Paints the edit icon in a cell and reports clicks on it, instead of a QPushButton per row.
+    """
+
+    clicked = pyqtSignal(QModelIndex)
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.icon = icon("edit_icon.png", 16)
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        rect = QRect(0, 0, 16, 16)
+        rect.moveCenter(option.rect.center())
+        self.icon.paint(painter, rect)
+
+    def sizeHint(self, option, index):
+        return QSize(24, 24)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and option.rect.contains(event.position().toPoint()):
+            self.clicked.emit(index)
+            return True
+        return super().editorEvent(event, model, option, index)
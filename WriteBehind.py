@@ -0,0 +1,52 @@
+from PyQt6.QtCore import QObject, QTimer
+
+from AsyncDatabase import AsyncDatabase
+from Word import Word
+
+DEBOUNCE_MS = 500
+
+
+class WriteBehind(QObject):
+    """
+    Buffers changed words and writes them in one transaction once no change has been made
+    for DEBOUNCE_MS. A word changed several times before the flush is written once.
+    """
+
+    def __init__(self, db: AsyncDatabase, delay: int = DEBOUNCE_MS) -> None:
+        super().__init__()
+        self.db = db
+        self.pending: dict[int, Word] = {}
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.flush)
+
+    def mark(self, word: Word) -> None:
+        """
+        Schedules a changed word to be written, restarting the debounce timer.
+
+        :param word: The word; it must have been changed through its properties.
+        """
+        self.pending[id(word)] = word
+        self.timer.start()
+
+    def discard(self, word: Word) -> None:
+        """
+        Forgets a pending word, e.g. because it is being deleted.
+
+        :param word: The word.
+        """
+        self.pending.pop(id(word), None)
+
+    def flush(self) -> None:
+        """
+        Queues every pending change as a single write on the database thread.
+        """
+        self.timer.stop()
+        words = [word for word in self.pending.values() if word.dirty]
+        self.pending.clear()
+        if not words:
+            return
+        for word in words:
+            word.dirty = False
+        self.db.submit(lambda db: db.update_words(words))
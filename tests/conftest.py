@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the top of the repository rather than in a package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Database import Database  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / "words.db"))
+    yield database
+    database.conn.close()
@@ -0,0 +1,62 @@
+import itertools
+
+import pytest
+
+from AnswerMatcher import AnswerMatcher, normalize, within_distance
+
+
+def levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other)))
+        previous = current
+    return previous[-1]
+
+
+def test_normalize_ignores_case_accents_and_spacing():
+    assert normalize("  Crème   Brûlée ") == "creme brulee"
+    assert normalize("HELLO\tworld") == "hello world"
+
+
+@pytest.mark.parametrize("a, b, limit, expected", [
+    ("house", "house", 0, True),
+    ("house", "hous", 1, True),
+    ("house", "mouse", 1, True),
+    ("house", "horse", 0, False),
+    ("house", "hose", 1, True),
+    ("house", "ho", 2, False),
+    ("kitten", "sitting", 3, True),
+    ("kitten", "sitting", 2, False),
+])
+def test_within_distance(a, b, limit, expected):
+    assert within_distance(a, b, limit) is expected
+
+
+def test_within_distance_agrees_with_the_full_edit_distance():
+    strings = ["".join(letters) for length in range(6) for letters in itertools.product("ab", repeat=length)]
+    for a in strings:
+        for b in strings:
+            for limit in range(4):
+                assert within_distance(a, b, limit) is (levenshtein(a, b) <= limit), (a, b, limit)
+
+
+def test_answer_matcher_accepts_alternatives_and_parentheses():
+    matcher = AnswerMatcher("to run, to jog; (the) sprint")
+    assert matcher.matches("to run")
+    assert matcher.matches("TO JOG")
+    assert matcher.matches("sprint")
+    assert matcher.matches("the sprint")
+    assert not matcher.matches("to walk")
+
+
+def test_answer_matcher_tolerates_typos_only_in_longer_answers():
+    assert AnswerMatcher("house").matches("hous")
+    assert AnswerMatcher("house").matches("houses")
+    assert not AnswerMatcher("cat").matches("cut")
+    assert not AnswerMatcher("house", typos=0).matches("hous")
+    matcher = AnswerMatcher(", ".join(f"alternative number {index}" for index in range(50)))
+    assert matcher.matches("alternative numbr 7")
+    assert matcher.matches("alternative number 42x")
+    assert not matcher.matches("alternative numbr 77x")
@@ -0,0 +1,35 @@
+import pytest
+
+import Database as database_module
+from Word import Word
+
+
+def stored(db, list_id):
+    return db.conn.execute("SELECT id, term, definition, notes FROM words WHERE list_id = ? ORDER BY id",
+                           (list_id,)).fetchall()
+
+
+def test_add_words_assigns_the_stored_ids(db, monkeypatch):
+    monkeypatch.setattr(database_module, "BATCH_SIZE", 7)  # several batches
+    list_id = db.add_word_list("Numbers")
+    # Gaps and a deleted last row, so that the new ids are not simply 1..n.
+    ids = [db.add_word(list_id, False, f"old {index}", "old", "") for index in range(5)]
+    for word_id in (ids[1], ids[4]):
+        db.delete_word(word_id)
+    words = [Word(f"term {index}", f"definition {index}") for index in range(30)]
+    new_ids = db.add_words(list_id, iter(words))
+    assert new_ids == [word.id for word in words]
+    rows = {word_id: term for word_id, term, _, _ in stored(db, list_id)}
+    assert [rows[word.id] for word in words] == [word.term for word in words]
+
+
+def test_add_words_is_one_transaction(db):
+    list_id = db.add_word_list("Broken")
+
+    def words():
+        yield Word("one", "jeden")
+        raise ValueError("broken file")
+
+    with pytest.raises(ValueError):
+        db.add_words(list_id, words())
+    assert stored(db, list_id) == []
@@ -0,0 +1,30 @@
+from Database import Database
+
+
+def test_cache_drops_lists_changed_by_another_connection(tmp_path):
+    path = str(tmp_path / "words.db")
+    db, other = Database(path), Database(path)
+    list_id = db.add_word_list("Shared")
+    word_id = db.add_word(list_id, False, "term", "definition", "")
+    db.cache.get(list_id)
+    other.update_word(word_id, True, "term", "changed elsewhere", "")
+    assert db.cache.get(list_id).words[0].definition == "changed elsewhere"
+    assert db.take_changes() == ({list_id: "Shared"}, [])
+    other.delete_word_list(list_id)
+    assert db.cache.get(list_id) is None
+    assert db.take_changes() == ({}, [list_id])
+    db.conn.close()
+    other.conn.close()
+
+
+def test_own_writes_are_not_reported_as_changes(tmp_path):
+    path = str(tmp_path / "words.db")
+    db, other = Database(path), Database(path)
+    list_id = db.add_word_list("Mine")
+    db.add_word(list_id, False, "term", "definition", "")
+    assert db.take_changes() is None
+    other.update_word_list(list_id, "Renamed elsewhere")
+    assert db.take_changes() == ({list_id: "Renamed elsewhere"}, [])
+    assert db.take_changes() is None
+    db.conn.close()
+    other.conn.close()
@@ -0,0 +1,48 @@
+import Database as database_module
+import Importer
+from Duplicates import MERGE, SKIP
+from Word import Word
+
+
+def stored(db, list_id):
+    return db.conn.execute("SELECT id, term, definition, notes FROM words WHERE list_id = ? ORDER BY id",
+                           (list_id,)).fetchall()
+
+
+def test_add_words_skips_and_merges_duplicates(db, monkeypatch):
+    monkeypatch.setattr(database_module, "BATCH_SIZE", 3)
+    list_id = db.add_word_list("Words")
+    db.add_words(list_id, [Word("Cat", "kot"), Word("dog", "pies")])
+    words = [Word("cat", "kocur"), Word("bird", "ptak"), Word("BIRD", "ptaszek"), Word("fish", "ryba")]
+    ids = db.add_words(list_id, words, SKIP)
+    assert ids == [words[1].id, words[3].id]
+    assert [term for _, term, _, _ in stored(db, list_id)] == ["Cat", "dog", "bird", "fish"]
+    db.add_words(list_id, [Word("DOG", "psisko", "big")], MERGE)
+    assert stored(db, list_id)[1][1:] == ("dog", "pies, psisko", "big")
+
+
+def test_merge_duplicates_stays_within_a_list_by_default(db):
+    first = db.add_word_list("First")
+    second = db.add_word_list("Second")
+    db.add_words(first, [Word("cat", "kot"), Word("Cat", "kocur"), Word("dog", "pies")])
+    db.add_words(second, [Word("cat", "kot")])
+    assert db.merge_duplicates() == 1
+    assert [row[1:3] for row in stored(db, first)] == [("cat", "kot, kocur"), ("dog", "pies")]
+    assert [row[1:3] for row in stored(db, second)] == [("cat", "kot")]
+
+
+def test_merging_a_file_imported_twice_across_lists_leaves_one_list(db, tmp_path):
+    file_name = tmp_path / "animals.txt"
+    file_name.write_text("cat - kot\ndog - pies\n", encoding="utf-8")
+    first = db.add_word_list("Animals")
+    second = db.add_word_list("Animals again")
+    Importer.import_file(db, first, str(file_name))
+    Importer.import_file(db, second, str(file_name))
+    third = db.add_word_list("More animals")
+    db.add_words(third, [Word("DOG", "psisko"), Word("bird", "ptak")])
+    db.set_words_selected(second, True)
+    assert db.merge_duplicates(across_lists=True) == 3
+    assert [word_list.title for word_list in db.load_word_list_titles()] == ["Animals", "More animals"]
+    assert [row[1:3] for row in stored(db, first)] == [("cat", "kot"), ("dog", "pies, psisko")]
+    assert [word.selected for word in db.load_words(first)] == [True, True]
+    assert [row[1:3] for row in stored(db, third)] == [("bird", "ptak")]
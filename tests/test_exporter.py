@@ -0,0 +1,34 @@
+import zipfile
+
+import pytest
+
+import Exporter
+from Word import Word
+
+
+@pytest.fixture
+def lists(db):
+    for title in ("Animals", "Colours", "Numbers"):
+        list_id = db.add_word_list(title)
+        db.add_words(list_id, [Word(f"{title} {index}", "definition") for index in range(3)])
+
+
+def test_export_all_writes_one_member_per_list(db, lists, tmp_path):
+    file_name = tmp_path / "all.zip"
+    assert Exporter.export_all(db, str(file_name)) == 9
+    with zipfile.ZipFile(file_name) as archive:
+        assert archive.namelist() == ["Animals.txt", "Colours.txt", "Numbers.txt"]
+    assert [path.name for path in tmp_path.iterdir() if not path.name.startswith("words.db")] == ["all.zip"]
+
+
+@pytest.mark.parametrize("name", ["all.zip", "all.csv.gz"])
+def test_cancelled_export_leaves_no_file(db, lists, tmp_path, name):
+    file_name = tmp_path / name
+    file_name.write_bytes(b"previous export")
+    progress = []
+    count = Exporter.export_all(db, str(file_name), progress=lambda done, total: progress.append(done),
+                                cancelled=lambda: len(progress) == 1)
+    assert count is None
+    assert progress == [1]
+    assert file_name.read_bytes() == b"previous export"
+    assert sorted(path.name for path in tmp_path.iterdir() if not path.name.startswith("words.db")) == [name]
@@ -0,0 +1,45 @@
+import Importer
+
+
+def test_undecodable_lines_are_reported_and_skipped(db, tmp_path):
+    file_name = tmp_path / "words.txt"
+    file_name.write_bytes(b"\xef\xbb\xbfone - uno\ntwo - d\xffos\nthree - tres (numero)\n")
+    list_id = db.add_word_list("Numbers")
+    result = Importer.import_file(db, list_id, str(file_name))
+    assert result.rows == 2
+    assert [line_number for line_number, _ in result.errors] == [2]
+    assert [(word.term, word.notes) for word in db.load_words(list_id)] == [("one", ""), ("three", "numero")]
+
+
+def test_csv_header_rows_are_skipped(db, tmp_path):
+    for name, text in (("words.csv", "\nTerm,Definition,Notes\none,uno,\ntwo,dos,number\n"),
+                       ("words.tsv", "word\tmeaning\none\tuno\ntwo\tdos\n")):
+        file_name = tmp_path / name
+        file_name.write_text(text, encoding="utf-8")
+        list_id = db.add_word_list(name)
+        result = Importer.import_file(db, list_id, str(file_name))
+        assert result.rows == 2 and result.error_count == 0
+        assert [word.term for word in db.load_words(list_id)] == ["one", "two"]
+
+
+def test_only_the_first_row_can_be_a_header(db, tmp_path):
+    file_name = tmp_path / "words.csv"
+    file_name.write_text("one,uno\nterm,definition\n", encoding="utf-8")
+    list_id = db.add_word_list("Words")
+    assert Importer.import_file(db, list_id, str(file_name)).rows == 2
+
+
+def test_quizlet_exports_are_recognized_by_their_contents(tmp_path):
+    file_name = tmp_path / "export.txt"
+    file_name.write_text("dom\thouse\nkot\tcat, kitten\nbroken line\n", encoding="utf-8")
+    assert Importer.guess_format(str(file_name)) == "quizlet"
+    file_name.write_text("dom - house\nkot - cat\n", encoding="utf-8")
+    assert Importer.guess_format(str(file_name)) == "txt"
+
+
+def test_quizlet_exports_are_imported(db, tmp_path):
+    file_name = tmp_path / "export.txt"
+    file_name.write_text("dom\thouse\nkot\tcat, kitten\n", encoding="utf-8")
+    list_id = db.add_word_list("Quizlet")
+    assert Importer.import_file(db, list_id, str(file_name)).rows == 2
+    assert [(word.term, word.definition) for word in db.load_words(list_id)] == [("dom", "house"), ("kot", "cat, kitten")]
@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from Database import nocase
+from Word import Word
+
+
+def page_through(db, list_id, order, descending, selected=None, prefix="", limit=4):
+    words, after = [], None
+    while True:
+        page = db.query_words(list_id, order, descending, after, selected, prefix, limit)
+        words += page
+        if len(page) < limit:
+            return words
+        last = page[-1]
+        after = (last.id if order == "id" else getattr(last, order), last.id)
+
+
+@pytest.mark.parametrize("order", ["id", "term", "definition"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_keyset_pages_match_a_full_sort(db, order, descending):
+    rng = random.Random(order + str(descending))
+    list_id = db.add_word_list("Mixed")
+    other_id = db.add_word_list("Other")
+    texts = ["apple", "Apple", "APPLE", "banana", "b_nana", "b%", "Cherry", "cherry", "élan", "zebra", "Zoo"]
+    words = [Word(rng.choice(texts), rng.choice(texts), "", rng.random() < 0.5) for _ in range(60)]
+    db.add_words(list_id, words)
+    db.add_words(other_id, [Word("apple", "apple")])
+
+    def expected(selected=None, prefix=""):
+        kept = [word for word in words if (selected is None or word.selected == selected)
+                and nocase(word.term).startswith(nocase(prefix))]
+        if order == "id":
+            key = lambda word: word.id
+        else:
+            key = lambda word: (nocase(getattr(word, order)), word.id)
+        return [word.id for word in sorted(kept, key=key, reverse=descending)]
+
+    assert [word.id for word in page_through(db, list_id, order, descending)] == expected()
+    assert [word.id for word in page_through(db, list_id, order, descending, selected=True)] == expected(True)
+    for prefix in ("app", "B_", "b%", "z"):
+        assert [word.id for word in page_through(db, list_id, order, descending, prefix=prefix)] == expected(prefix=prefix)
+
+
+def test_query_words_rejects_unknown_orders(db):
+    with pytest.raises(ValueError):
+        db.query_words(1, "notes")
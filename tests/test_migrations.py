@@ -0,0 +1,45 @@
+import sqlite3
+
+import pytest
+
+import Migrations
+from Database import Database
+from Duplicates import term_key
+
+
+def test_new_database_is_at_the_latest_version(tmp_path):
+    db = Database(str(tmp_path / "words.db"))
+    assert db.conn.execute("PRAGMA user_version").fetchone()[0] == Migrations.SCHEMA_VERSION
+    db.conn.close()
+
+
+def test_upgrade_from_the_first_version_keeps_the_words(tmp_path):
+    path = str(tmp_path / "words.db")
+    conn = sqlite3.connect(path)
+    Migrations.migrate(conn, target=1)
+    conn.execute("INSERT INTO word_lists (id, title) VALUES (1, 'Animals')")
+    conn.executemany("INSERT INTO words (list_id, selected, term, definition, notes) VALUES (?, ?, ?, ?, ?)",
+                     [(1, True, "Cat", "kot", None), (1, False, "dog", "pies", "loyal"),
+                      (2, False, "orphan", "without a list", "")])
+    conn.commit()
+    assert Migrations.migrate(conn) == 1
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == Migrations.SCHEMA_VERSION
+    conn.close()
+
+    db = Database(path)
+    rows = db.conn.execute("SELECT list_id, selected, term, definition, notes, term_key FROM words ORDER BY id").fetchall()
+    # The word whose list did not exist is dropped by the foreign key rebuild.
+    assert rows == [(1, 1, "Cat", "kot", None, term_key("Cat")), (1, 0, "dog", "pies", "loyal", term_key("dog"))]
+    assert [word.term for _, _, word in db.search("cat")] == ["Cat"]
+    assert [word.term for _, _, word in db.search("loyal")] == ["dog"]
+    assert db.conn.execute("SELECT revision FROM word_lists").fetchone()[0] == 0
+    db.conn.close()
+
+
+def test_migrate_refuses_a_newer_schema(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "words.db"))
+    conn.execute(f"PRAGMA user_version = {Migrations.SCHEMA_VERSION + 1}")
+    with pytest.raises(RuntimeError):
+        Migrations.migrate(conn)
+    conn.close()
+
@@ -0,0 +1,50 @@
+import pytest
+
+import Database as database_module
+from Database import SEARCH_CANDIDATES
+from Word import Word
+
+
+def terms(results):
+    return [word.term for _, _, word in results]
+
+
+def test_search_finds_words_in_every_column_and_list(db):
+    fruit, colours = db.add_word_list("Fruit"), db.add_word_list("Colours")
+    db.add_words(fruit, [Word("apple", "pomme", "red or green"), Word("pear", "gruszka"), Word("cream", "crème")])
+    db.add_words(colours, [Word("green", "zielony")])
+    assert sorted(terms(db.search("green"))) == ["apple", "green"]
+    assert terms(db.search("creme")) == ["cream"]  # diacritics are ignored
+    assert [title for _, title, _ in db.search("gru")] == ["Fruit"]  # the last word is a prefix
+    assert db.search("  ") == []
+
+
+def test_search_index_follows_text_changes_only(db):
+    list_id = db.add_word_list("Fruit")
+    word_id = db.add_word(list_id, False, "apple", "jablko", "")
+    changes = db.conn.total_changes
+    db.update_word(word_id, True, "apple", "jablko", "")
+    # The word and its list's revision; the unchanged text is not reindexed.
+    assert db.conn.total_changes - changes == 2
+    db.update_word(word_id, True, "pear", "gruszka", "")
+    assert db.search("apple") == []
+    assert terms(db.search("pear")) == ["pear"]
+    db.delete_word(word_id)
+    assert db.search("pear") == []
+    db.conn.execute("INSERT INTO words_fts (words_fts) VALUES ('integrity-check')")
+
+
+def test_search_ranks_exact_and_prefix_terms_first(db, monkeypatch):
+    monkeypatch.setattr(database_module, "SEARCH_CANDIDATES", 20)
+    list_id = db.add_word_list("Search")
+    # Many words matching "sun" only in the definition, and more than the candidate cap.
+    db.add_words(list_id, [Word(f"word {index}", "under the sun") for index in range(50)])
+    db.add_words(list_id, [Word("sunflower", "flower"), Word("Sun", "star"), Word("sunny", "bright")])
+    assert terms(db.search("sun", limit=3)) == ["Sun", "sunny", "sunflower"]
+    with pytest.raises(ValueError):
+        db.search("sun", limit=10, offset=15)
+
+
+def test_search_offset_is_limited_to_the_candidates(db):
+    with pytest.raises(ValueError):
+        db.search("anything", limit=50, offset=SEARCH_CANDIDATES)
@@ -0,0 +1,19 @@
+def test_select_matching_adds_to_the_selection(db):
+    list_id = db.add_word_list("Words")
+    for term, definition, selected in (("cat", "kot", True), ("dog", "pies", False),
+                                       ("catfish", "sum", False), ("bird", "ptak", False)):
+        db.add_word(list_id, selected, term, definition, "")
+    db.select_matching_words(list_id, "CAT")
+    db.select_matching_words(list_id, "pta")
+    assert [(word.term, word.selected) for word in db.load_words(list_id)] == [
+        ("cat", True), ("dog", False), ("catfish", True), ("bird", True)]
+
+
+def test_bulk_selection_changes(db):
+    list_id = db.add_word_list("Words")
+    ids = [db.add_word(list_id, False, f"term {index}", "definition", "") for index in range(4)]
+    db.set_words_selected(list_id, True, ids[:2])
+    db.invert_words_selected(list_id)
+    assert [word.selected for word in db.load_words(list_id)] == [False, False, True, True]
+    db.set_words_selected(list_id, False)
+    assert not any(word.selected for word in db.load_words(list_id))
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from ReviewLog import ReviewLog
+from Scheduler import SCHEDULERS, ClassicScheduler, LeitnerScheduler, SM2Scheduler
+from StudySession import StudySession
+from Word import Word
+
+
+def make_words(count):
+    words = []
+    for index in range(count):
+        word = Word(f"term {index}", f"definition {index}")
+        word.id = index + 1
+        words.append(word)
+    return words
+
+
+@pytest.mark.parametrize("scheduler_class", SCHEDULERS.values())
+def test_scheduler_masters_every_word_when_always_correct(scheduler_class):
+    words = make_words(10)
+    options = {"rng": random.Random(1)} if scheduler_class is ClassicScheduler else {}
+    scheduler = scheduler_class(words, **options)
+    last = None
+    for _ in range(1000):
+        word = scheduler.next_word()
+        if word is None:
+            break
+        if scheduler.remaining > 1:
+            assert word is not last  # never the same word twice in a row
+        last = word
+        scheduler.answer(word, True)
+    assert scheduler.next_word() is None
+    assert scheduler.remaining == 0
+
+
+def test_classic_scheduler_progression():
+    word = make_words(1)[0]
+    scheduler = ClassicScheduler([word], rng=random.Random(0))
+    scheduler.next_word()
+    scheduler.answer(word, False)
+    assert word.result == 1  # a first wrong answer still counts as seen
+    scheduler.next_word()
+    scheduler.answer(word, True)
+    assert word.result == 2
+    assert not scheduler.is_reversed(word)
+    for _ in range(2):
+        scheduler.next_word()
+        scheduler.answer(word, True)
+    assert word.result == 4
+    assert scheduler.is_reversed(word)
+
+
+def test_leitner_scheduler_sends_wrong_answers_back_to_the_first_box():
+    words = make_words(2)
+    scheduler = LeitnerScheduler(words)
+    word = scheduler.next_word()
+    scheduler.answer(word, True)
+    assert scheduler.state(word)[1] == 1
+    while scheduler.next_word() is not word:
+        scheduler.answer(scheduler.current[3], True)
+    scheduler.answer(word, False)
+    assert scheduler.state(word)[1] == 0
+
+
+def test_sm2_scheduler_lowers_easiness_after_wrong_answers():
+    word = make_words(1)[0]
+    scheduler = SM2Scheduler([word])
+    scheduler.next_word()
+    scheduler.answer(word, False)
+    assert scheduler.state(word)[2] < 2.5
+    assert scheduler.state(word)[3] == 0
+
+
+@pytest.mark.parametrize("scheduler_class", SCHEDULERS.values())
+def test_saved_progress_resumes_and_mastered_decks_start_over(scheduler_class):
+    words = make_words(3)
+    scheduler = scheduler_class(words)
+    while (word := scheduler.next_word()) is not None:
+        scheduler.answer(word, True)
+    mastered = {word.id: scheduler.state(word) for word in words}
+    partial = {word_id: state for word_id, state in mastered.items() if word_id != words[0].id}
+    assert scheduler_class(words, partial).remaining == 1
+    assert scheduler_class(words, mastered).remaining == 3
+
+
+def test_study_session_asks_until_mastered_and_logs_reviews():
+    words = make_words(5)
+    batches = []
+    session = StudySession(words, LeitnerScheduler, review_log=ReviewLog(batches.append, flush_size=10))
+    while (question := session.next_question()) is not None:
+        assert question.prompt.endswith(question.word.term if not question.reversed else question.word.definition)
+        correct = session.check(question.answer.upper())
+        assert correct
+        session.answer(correct)
+    session.flush()
+    reviews = [review for batch in batches for review in batch]
+    assert len(reviews) == session.total_questions
+    assert session.accuracy == 1.0
+    assert {review.word_id for review in reviews} == {word.id for word in words}
+    assert all(review.scheduler == "Leitner" for review in reviews)
+
+
+def test_study_session_restart_resets_statistics():
+    session = StudySession(make_words(3), ClassicScheduler, rng=random.Random(2))
+    session.next_question()
+    session.answer(False)
+    assert session.accuracy == 0.0 and session.total_questions == 1
+    session.restart()
+    assert session.total_questions == 0
+    assert session.scheduler.remaining == 3
@@ -0,0 +1,28 @@
+import random
+
+from WordColumns import TextColumn
+
+
+def test_text_column_matches_a_list_through_edits(monkeypatch):
+    # Blocks of four strings, so that edits cross many block boundaries.
+    monkeypatch.setattr(TextColumn, "BLOCK_BITS", 2)
+    monkeypatch.setattr(TextColumn, "BLOCK_SIZE", 4)
+    rng = random.Random(0)
+    column, expected = TextColumn(), []
+    for index in range(30):
+        column.append(f"słowo {index}")
+        expected.append(f"słowo {index}")
+    for step in range(300):
+        index = rng.randrange(len(expected)) if expected else None
+        if index is not None and step % 3 == 0:
+            del column[index]
+            del expected[index]
+        elif index is not None and step % 3 == 1:
+            column[index] = expected[index] = "ż" * rng.randrange(5)
+        else:
+            column.append(f"nowe {step}")
+            expected.append(f"nowe {step}")
+        assert [column[position] for position in range(len(column))] == expected
+    assert bytes(column.data) == "".join(expected).encode("utf-8")
+    clone = column.clone()
+    assert [clone[position] for position in range(len(clone))] == expected
@@ -0,0 +1,72 @@
+import random
+
+from Database import Database
+from Word import Word
+
+
+def rows(words):
+    return [(word.id, bool(word.selected), word.term, word.definition, word.notes or "") for word in words]
+
+
+def assert_coherent(db, list_id):
+    cached = db.cache.get(list_id)
+    fresh = db.load_word_list(list_id)
+    assert (cached is None) == (fresh is None)
+    if fresh is not None:
+        assert cached.title == fresh.title
+        assert rows(cached.words) == rows(fresh.words)
+
+
+def test_cache_follows_every_write(db):
+    rng = random.Random(7)
+    list_ids = [db.add_word_list(f"List {index}") for index in range(3)]
+    for list_id in list_ids:
+        db.add_words(list_id, [Word(f"term {list_id}.{index}", "definition") for index in range(20)])
+    for step in range(300):
+        list_id = rng.choice(list_ids)
+        db.cache.get(list_id)  # keep it cached, so that writes go through it
+        words = db.load_words(list_id)
+        action = rng.randrange(7)
+        if action == 0:
+            db.add_word(list_id, rng.random() < 0.5, f"new {step}", "added", rng.choice(["", None, "note"]))
+        elif action == 1 and words:
+            word = rng.choice(words)
+            word.selected = not word.selected
+            word.definition = f"changed {step}"
+            db.update_words([word])
+        elif action == 2 and words:
+            word = rng.choice(words)
+            db.update_word(word.id, word.selected, word.term, word.definition, None)
+        elif action == 3 and words:
+            db.delete_word(rng.choice(words).id)
+        elif action == 4:
+            db.add_words(list_id, [Word(f"bulk {step}.{index}", "bulk") for index in range(3)])
+        elif action == 5:
+            db.set_words_selected(list_id, rng.random() < 0.5)
+        else:
+            db.update_word_list(list_id, f"Renamed {step}")
+        for other in list_ids:
+            assert_coherent(db, other)
+
+
+def test_cache_evicts_the_least_recently_used_lists(tmp_path):
+    db = Database(str(tmp_path / "words.db"), cache_words=25)
+    list_ids = [db.add_word_list(f"List {index}") for index in range(3)]
+    for list_id in list_ids:
+        db.add_words(list_id, [Word(f"term {index}", "definition") for index in range(10)])
+    for list_id in list_ids:
+        db.cache.get(list_id)
+    assert list_ids[0] not in db.cache
+    assert list_ids[1] in db.cache and list_ids[2] in db.cache
+    assert db.cache.word_count <= 25
+    db.conn.close()
+
+
+def test_copy_words_of_a_deleted_list_is_none(db):
+    list_id = db.add_word_list("Gone")
+    db.add_words(list_id, [Word("term", "definition")])
+    assert len(db.cache.copy_words(list_id)) == 1
+    assert len(db.cache.copy_words(list_id, selected_only=True)) == 0
+    db.delete_word_list(list_id)
+    assert db.cache.copy_words(list_id, selected_only=True) is None
+    assert db.cache.copy_words(list_id) is None